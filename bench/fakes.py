@@ -0,0 +1,208 @@
+"""
+Fake host for the benchmarks.
+FakeHost builds a synthetic /proc tree (net/tcp{,6} with listeners and
+established sockets, /proc/<pid>/fd socket links), puts fake `systemctl`
+and `journalctl` executables first on PATH and swaps the psutil calls the
+bot makes for deterministic ones. psutil.net_connections() stays real but
+reads the fake tree, so the legacy and /proc port scanners parse the same
+files and every figure reflects a host of the chosen size rather than the
+machine running it.
+"""
+import json
+import os
+import random
+import shutil
+import socket
+import tempfile
+import time
+from collections import namedtuple
+
+import psutil
+
+from bot.telegram import fanout
+
+svmem  = namedtuple("svmem",  "total available percent used free")
+sdisk  = namedtuple("sdisk",  "total used free percent")
+snetio = namedtuple("snetio", "bytes_sent bytes_recv packets_sent packets_recv errin errout dropin dropout")
+pmem   = namedtuple("pmem",   "rss vms")
+spart  = namedtuple("spart",  "device mountpoint fstype opts")
+sdio   = namedtuple("sdio",   "read_count write_count read_bytes write_bytes")
+
+GB = 1024**3
+
+_SYSTEMCTL  = '#!/bin/sh\nexec cat "{root}/units.txt"\n'
+_JOURNALCTL = ('#!/bin/sh\ncase " $* " in *" -o json "*) exec cat "{root}/journal.json";; esac\n'
+               'exec cat "{root}/journal.txt"\n')
+
+
+class FakeProcess:
+    """psutil.Process look-alike: name, cpu_percent, memory_info, oneshot."""
+
+    def __init__(self, host, pid):
+        if pid not in host.names:
+            raise psutil.NoSuchProcess(pid)
+        self.pid   = pid
+        self._host = host
+
+    def name(self):
+        return self._host.names[self.pid]
+
+    def cpu_percent(self, interval=None):
+        return (self.pid * 7 + self._host.tick) % 100 / 10
+
+    def memory_info(self):
+        return pmem(self.pid * 4096 % GB, 0)
+
+    def oneshot(self):
+        return _Null()
+
+
+class _Null:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeHost:
+
+    def __init__(self, services=2000, ports=500, sockets=20000, procs=500, log_lines=5000, seed=1):
+        self.size  = {"services": services, "ports": ports, "sockets": sockets,
+                      "procs": procs, "log_lines": log_lines}
+        self.rng   = random.Random(seed)
+        self.root  = tempfile.mkdtemp(prefix="tgca-bench-")
+        self.proc  = os.path.join(self.root, "proc")
+        self.bin   = os.path.join(self.root, "bin")
+        self.names = {pid: f"worker-{pid}" for pid in range(1000, 1000 + procs)}
+        self.tick  = 0
+        self._saved = {}
+        self._build()
+
+    # ── building ──────────────────────────────────────────────────────────────
+
+    def _build(self):
+        os.makedirs(os.path.join(self.proc, "net"))
+        os.makedirs(self.bin)
+        for c in "abcd":
+            os.makedirs(os.path.join(self.root, "mnt", c))
+        pids  = list(self.names)
+        ino   = 100000
+        rows  = {"tcp": [], "tcp6": []}
+        owned = {pid: [] for pid in pids}
+        ports = self.rng.sample(range(1024, 65535), self.size["ports"])
+        for i, port in enumerate(ports):
+            ino += 1
+            six  = i % 3 == 2
+            pid  = self.rng.choice(pids)
+            ip   = "::" if six else "0.0.0.0"
+            rows["tcp6" if six else "tcp"].append(self._row(ip, port, "::" if six else "0.0.0.0", 0, "0A", ino))
+            owned[pid].append(ino)
+        for i in range(self.size["sockets"]):
+            ino += 1
+            pid  = self.rng.choice(pids)
+            lp, rp = self.rng.choice(ports), self.rng.randrange(1024, 65535)
+            peer = f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+            rows["tcp"].append(self._row("10.0.0.1", lp, peer, rp, "01", ino))
+            owned[pid].append(ino)
+        header = "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+        rows["udp"] = rows["udp6"] = []
+        for name, lines in rows.items():
+            with open(os.path.join(self.proc, "net", name), "w") as f:
+                f.write(header + "".join(f"{i:4d}: {r}\n" for i, r in enumerate(lines)))
+        for pid, inodes in owned.items():
+            fd = os.path.join(self.proc, str(pid), "fd")
+            os.makedirs(fd)
+            links = ["/dev/null", "pipe:[1]", "anon_inode:[eventpoll]"] + [f"socket:[{n}]" for n in inodes]
+            for i, target in enumerate(links):
+                os.symlink(target, os.path.join(fd, str(i)))
+
+        with open(os.path.join(self.root, "units.txt"), "w") as f:
+            for i in range(self.size["services"]):
+                f.write(f"app-{i:05d}.service loaded active running Fake service {i}\n")
+        base = int(time.time() * 1e6) - self.size["log_lines"] * 1000000
+        with open(os.path.join(self.root, "journal.json"), "w") as fj, \
+             open(os.path.join(self.root, "journal.txt"), "w") as ft:
+            for i in range(self.size["log_lines"]):
+                msg = f"request {i} handled in {self.rng.randrange(1, 900)} ms status={self.rng.choice((200, 200, 404, 500))}"
+                fj.write(json.dumps({"__CURSOR": f"s=fake;i={i:x}", "__REALTIME_TIMESTAMP": str(base + i * 1000000),
+                                     "_HOSTNAME": "bench", "SYSLOG_IDENTIFIER": "app", "_PID": "1234",
+                                     "MESSAGE": msg}) + "\n")
+                ft.write(f"Jan 01 00:00:00 bench app[1234]: {msg}\n")
+        for name, body in (("systemctl", _SYSTEMCTL), ("journalctl", _JOURNALCTL)):
+            path = os.path.join(self.bin, name)
+            with open(path, "w") as f:
+                f.write(body.format(root=self.root))
+            os.chmod(path, 0o755)
+
+    @staticmethod
+    def _hex(ip):
+        family = socket.AF_INET6 if ":" in ip else socket.AF_INET
+        raw    = socket.inet_pton(family, ip)
+        if family == socket.AF_INET:
+            return raw[::-1].hex().upper()
+        return b"".join(raw[i:i + 4][::-1] for i in range(0, 16, 4)).hex().upper()
+
+    def _row(self, lip, lport, rip, rport, st, ino):
+        return (f"{self._hex(lip)}:{lport:04X} {self._hex(rip)}:{rport:04X} {st} "
+                f"00000000:00000000 00:00000000 00000000     0        0 {ino} 1 0000000000000000 100 0 0 10 0")
+
+    # ── psutil stand-ins ──────────────────────────────────────────────────────
+
+    def _cpu_percent(self, interval=None, percpu=False):
+        self.tick += 1
+        return 20 + self.tick * 7 % 60
+
+    def _virtual_memory(self):
+        used = (8 + self.tick % 5) * GB
+        return svmem(32 * GB, 32 * GB - used, used / (32 * GB) * 100, used, 32 * GB - used)
+
+    def _disk_usage(self, path):
+        return sdisk(500 * GB, 210 * GB, 290 * GB, 42.0)
+
+    def _net_io_counters(self, pernic=False):
+        n = self.tick * 1500000
+        return snetio(n, 2 * n, n // 1500, n // 750, 0, 0, 0, 0)
+
+    def _disk_partitions(self, all=False):
+        # directories of the fake root: statvfs() stays real, the bench measures the walk
+        return [spart(f"/dev/vd{c}", os.path.join(self.root, "mnt", c), "ext4", "rw") for c in "abcd"]
+
+    def _disk_io_counters(self, perdisk=False):
+        n = self.tick
+        return {f"vd{c}": sdio(n * 50, n * 80, n * 4 * 2**20, n * 9 * 2**20) for c in "abcd"}
+
+    # ── lifecycle ─────────────────────────────────────────────────────────────
+
+    def __enter__(self):
+        patches = {
+            (psutil, "cpu_percent"):      self._cpu_percent,
+            (psutil, "virtual_memory"):   self._virtual_memory,
+            (psutil, "disk_usage"):       self._disk_usage,
+            (psutil, "net_io_counters"):  self._net_io_counters,
+            (psutil, "disk_partitions"):  self._disk_partitions,
+            (psutil, "disk_io_counters"): self._disk_io_counters,
+            # real net_connections(), parsing the fake tree like the legacy monitor would
+            (psutil, "PROCFS_PATH"):      self.proc,
+            (psutil, "getloadavg"):       lambda: (1.25, 0.8, 0.5),
+            (psutil, "boot_time"):        lambda: time.time() - 12 * 86400,
+            (psutil, "pids"):             lambda: list(self.names),
+            (psutil, "Process"):          lambda pid=None: FakeProcess(self, pid),
+            # lift Telegram rate limits: the push benchmark measures the bot, not the buckets
+            (fanout, "PRIVATE"):          (1e9, 10**9),
+            (fanout, "GROUP"):            (1e9, 10**9),
+        }
+        for (mod, name), value in patches.items():
+            self._saved[mod, name] = getattr(mod, name)
+            setattr(mod, name, value)
+        self._saved["PATH"] = os.environ.get("PATH", "")
+        os.environ["PATH"]  = self.bin + os.pathsep + self._saved["PATH"]
+        return self
+
+    def __exit__(self, *exc):
+        os.environ["PATH"] = self._saved.pop("PATH")
+        for (mod, name), value in self._saved.items():
+            setattr(mod, name, value)
+        self._saved.clear()
+        shutil.rmtree(self.root, ignore_errors=True)
+        return False
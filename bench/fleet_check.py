@@ -0,0 +1,123 @@
+"""
+End-to-end fleet check on localhost: a FleetHub and N in-process agents.
+
+    python -m bench.fleet_check                    # 10 agents
+    python -m bench.fleet_check --agents 50 --port 17070
+
+Agents stream changing fake snapshots and run actions on a recording
+controller, so nothing on the host is touched. Checks that every agent
+passes the handshake, full and delta frames converge to the agent's last
+snapshot, actions reach exactly the named agent, an agent with the wrong
+token is rejected and an agent refuses a hub with the wrong token.
+Exits 1 on the first failed check.
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from bot.fleet import protocol
+from bot.fleet.agent import Agent
+from bot.fleet.hub import FleetHub
+from bot.monitor.snapshot import MetricsSnapshot
+
+TOKEN = "fleet-check-secret"
+
+
+class FakeMonitor:
+    """A snapshot whose cpu/net change every collect() and whose uptime doesn't."""
+
+    def __init__(self, i):
+        self.i, self.n, self.last = i, 0, None
+
+    async def collect(self):
+        self.n += 1
+        self.last = MetricsSnapshot(time.time(), float(self.n % 100), {"percent": 40.0 + self.i % 10},
+                                    {"percent": 50.0}, {"sent": self.n * 1000, "recv": self.n * 2000},
+                                    [0.1, 0.2, 0.3], 3600 * self.i)
+        return self.last
+
+
+class FakeController:
+
+    def __init__(self):
+        self.calls = []
+
+    async def service_action(self, action, name):
+        self.calls.append((action, name))
+        return True, f"{action} {name}"
+
+
+def check(ok, what):
+    print(f"{'ok  ' if ok else 'FAIL'} {what}")
+    if not ok:
+        sys.exit(1)
+
+
+async def wait_for(pred, timeout):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if pred():
+            return True
+        await asyncio.sleep(0.05)
+    return pred()
+
+
+async def main(args):
+    addr = f"127.0.0.1:{args.port}"
+    hub  = FleetHub(addr, TOKEN, stale_after=30)
+    await hub.start()
+    agents = [Agent(f"agent-{i}", FakeMonitor(i), FakeController(), addr, TOKEN, args.interval)
+              for i in range(args.agents)]
+    tasks  = [asyncio.create_task(a.run()) for a in agents]
+    try:
+        names = {a.name for a in agents}
+        check(await wait_for(lambda: names <= {n for n, _, on in hub.rows() if on}, 10),
+              f"{args.agents} agents authenticated and online")
+
+        # a few frames past the first full one, so deltas are applied too
+        await asyncio.sleep(args.interval * 4)
+        def converged():
+            snaps = {n: s for n, s, _ in hub.rows()}
+            return all(snaps.get(a.name) and snaps[a.name].as_dict() == a.monitor.last.as_dict() for a in agents)
+        check(await wait_for(converged, args.interval * 3), "hub snapshots match the agents' latest")
+
+        res = await asyncio.gather(*(hub.action(a.name, "restart", [f"svc-{i}"], timeout=10)
+                                     for i, a in enumerate(agents)))
+        check(all(r == (True, f"restart svc-{i}") for i, r in enumerate(res)), "every action answered")
+        check(all(a.controller.calls == [("restart", f"svc-{i}")] for i, a in enumerate(agents)),
+              "each action ran on the named agent only")
+        check((await hub.action("nobody", "restart", ["x"]))[0] is False, "unknown agent refused")
+
+        intruder = Agent("intruder", FakeMonitor(0), FakeController(), addr, "wrong-token", args.interval)
+        try:
+            await asyncio.wait_for(intruder._session(), 5)
+            rejected = False
+        except (ConnectionError, asyncio.TimeoutError):
+            rejected = True
+        check(rejected and "intruder" not in hub.agents, "agent with a wrong token rejected")
+
+        fake_hub = FleetHub(f"127.0.0.1:{args.port + 1}", "other-token")
+        await fake_hub.start()
+        victim = Agent("victim", FakeMonitor(0), FakeController(), f"127.0.0.1:{args.port + 1}", TOKEN, args.interval)
+        try:
+            await asyncio.wait_for(victim._session(), 5)
+            refused = False
+        except (ConnectionError, asyncio.TimeoutError):
+            refused = True
+        await fake_hub.stop()
+        check(refused and not victim.controller.calls, "agent refuses a hub with a wrong token")
+        check(protocol.valid_name("web-1.prod_a") and not protocol.valid_name("a:b"), "agent name rules")
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await hub.stop()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--agents",   type=int,   default=10)
+    p.add_argument("--port",     type=int,   default=17070)
+    p.add_argument("--interval", type=float, default=0.2)
+    asyncio.run(main(p.parse_args()))
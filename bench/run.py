@@ -0,0 +1,325 @@
+"""
+Benchmarks for the collect → render → store → deliver path on a fake host.
+
+    python -m bench.run                                  # JSON to stdout
+    python -m bench.run --services 5000 --sockets 50000 --out before.json
+    python -m bench.run --compare before.json            # exit 1 on regression
+    python -m bench.run -k ports                         # only matching names
+
+Each benchmark runs `--warmup` untimed and `--repeat` timed iterations;
+min/median/p95/mean are reported in milliseconds. `--compare` matches
+results by name and fails when a median grew by more than `--threshold`.
+Names ending in `.cold` empty the caches before every iteration; the plain
+ones time the cached steady state.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from bench.fakes import FakeHost
+from bot.core.pacer import Pacer
+from bot.monitor import server as legacy
+from bot.monitor.disks import DiskMonitor
+from bot.monitor.journal import read_page
+from bot.monitor.ports import PortScanner
+from bot.monitor.server_optimized import ServerMonitor
+from bot.monitor.snapshot import MetricsSnapshot
+from bot.storage.metric_store import MetricStore
+from bot.storage.status_store import StatusStore
+from bot.telegram import formatter
+from bot.telegram.dedup import EditDeduper
+from bot.telegram.fanout import FanOut
+from bot.telegram.formatter_optimized import SECTIONS, format_status
+from bot.telegram.handlers import _push_status
+
+BENCHES = []
+
+
+def bench(name):
+    def reg(fn):
+        BENCHES.append((name, fn))
+        return fn
+    return reg
+
+
+class FakeBot:
+    """Just enough of telegram.Bot for _push_status."""
+
+    def __init__(self):
+        self.edits = 0
+
+    async def edit_message_text(self, **kw):
+        self.edits += 1
+
+    async def send_message(self, chat_id, text, **kw):
+        return SimpleNamespace(message_id=1)
+
+
+# ── benchmarks: each gets the Env and returns the callable to time ───────────
+
+@bench("ports.legacy")
+def _(env):
+    mon = legacy.ServerMonitor()
+    return mon.get_open_ports
+
+
+@bench("ports.scanner.cold")
+def _(env):
+    return lambda: PortScanner(env.host.proc).scan()   # includes the /proc/*/fd walk
+
+
+@bench("ports.scanner.warm")
+def _(env):
+    return PortScanner(env.host.proc).scan
+
+
+@bench("services.legacy")
+def _(env):
+    return legacy.ServerMonitor().get_running_services
+
+
+@bench("services.list")
+def _(env):
+    return env.monitor._list_services
+
+
+@bench("disks.sample")
+def _(env):
+    dm = DiskMonitor()
+    return dm.sample   # mount list cached; one statvfs per mount + /proc/diskstats
+
+
+@bench("collect")
+def _(env):
+    return env.monitor.collect   # warm: collectors inside their TTL serve cached values
+
+
+def _cold_monitor(env):
+    mon = ServerMonitor()
+    mon.ports = PortScanner(env.host.proc)
+    return mon
+
+
+@bench("collect.cold")
+def _(env):
+    mon = _cold_monitor(env)
+
+    def cold():
+        mon.services.invalidate()
+        mon.registry.invalidate()   # every collector runs, as after its TTL
+        return mon.collect()
+    return cold
+
+
+@bench("format_status.legacy")
+def _(env):
+    mon = legacy.ServerMonitor()   # the old formatter collected everything itself
+    return lambda: formatter.format_status(mon, env.settings)
+
+
+@bench("format_status.cold")
+def _(env):
+    def cold():
+        SECTIONS.clear()
+        return format_status(env.snap, env.settings)
+    return cold
+
+
+@bench("format_status")
+def _(env):
+    return lambda: format_status(env.snap, env.settings)   # section cache warm
+
+
+@bench("metric_store.record")
+def _(env):
+    store = MetricStore(os.path.join(env.tmp, "metrics.db"))
+    snap  = MetricsSnapshot.from_dict(env.snap.as_dict())
+
+    def record():
+        snap.ts += 1
+        store.record(snap)
+    return record
+
+
+@bench("status_store.flush")
+def _(env):
+    store = StatusStore(os.path.join(env.tmp, "status.json"), flush_delay=0)
+    for i in range(env.args.channels):
+        store.add_channel(-1000000 - i, i + 1)
+
+    def flush():
+        store.update_settings(max_ports=store.get_settings()["max_ports"] % 30 + 1)
+        store.flush()
+    return flush
+
+
+@bench("journal.read_page")
+def _(env):
+    return lambda: read_page("app", 50)
+
+
+def _push_ctx(env, profiles=()):
+    store = StatusStore(os.path.join(env.tmp, f"push{len(profiles)}.json"), flush_delay=0)
+    for name, over in profiles:
+        store.set_profile(name, **over)
+    for i in range(env.args.channels):
+        store.add_channel(-1000000 - i, i + 1)
+        if profiles:
+            store.assign_profile(-1000000 - i, profiles[i % len(profiles)][0])
+    return SimpleNamespace(bot=FakeBot(), bot_data={
+        "store":   store,
+        "monitor": env.monitor,
+        "metrics": MetricStore(os.path.join(env.tmp, "push.db")),
+        "dedup":   EditDeduper(),
+        "fanout":  FanOut(env.args.channels, 1e9),
+        "pacer":   Pacer(),
+    })
+
+
+@bench("push_status")
+def _(env):
+    ctx = _push_ctx(env)
+    return lambda: _push_status(ctx)   # warm: TTL caches hit, the deduplicator skips unchanged edits
+
+
+@bench("push_status.cold")
+def _(env):
+    ctx = _push_ctx(env)
+    mon = ctx.bot_data["monitor"] = _cold_monitor(env)
+
+    def cold():   # full cycle: every collector, every section rendered, every channel edited
+        mon.services.invalidate()
+        mon.registry.invalidate()
+        SECTIONS.clear()
+        ctx.bot_data["dedup"] = EditDeduper()
+        return _push_status(ctx)
+    return cold
+
+
+@bench("push_status.profiles")
+def _(env):
+    ctx = _push_ctx(env, [("ops",     {"show_top": True, "services_mode": "all", "max_ports": 50}),
+                          ("compact", {"show_services": False, "show_ports": False, "compact": True}),
+                          ("en",      {"lang": "en"})])   # one render per profile, not per channel
+    return lambda: _push_status(ctx)
+
+
+# ── runner ────────────────────────────────────────────────────────────────────
+
+async def _time(fn, warmup, repeat):
+    async def call():
+        r = fn()
+        if asyncio.iscoroutine(r):
+            await r
+    for _ in range(warmup):
+        await call()
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await call()
+        out.append((time.perf_counter() - t0) * 1000)
+    out.sort()
+    return {
+        "n":      repeat,
+        "min":    round(out[0], 4),
+        "median": round(statistics.median(out), 4),
+        "p95":    round(out[min(len(out) - 1, int(len(out) * 0.95))], 4),
+        "mean":   round(statistics.fmean(out), 4),
+    }
+
+
+def _commit():
+    try:
+        r = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                           cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        return r.stdout.strip() or None
+    except OSError:
+        return None
+
+
+async def run(args):
+    results = {}
+    with FakeHost(args.services, args.ports, args.sockets, args.procs, args.log_lines) as host, \
+         tempfile.TemporaryDirectory(prefix="tgca-bench-") as tmp:
+        monitor = ServerMonitor()
+        monitor.ports = PortScanner(host.proc)
+        settings = StatusStore(os.path.join(tmp, "settings.json")).get_settings()
+        env = SimpleNamespace(args=args, host=host, tmp=tmp, monitor=monitor, settings=settings,
+                              snap=await monitor.collect())
+        for name, make in BENCHES:
+            if args.k and args.k not in name:
+                continue
+            results[name] = await _time(make(env), args.warmup, args.repeat)
+            print(f"{name:24} {results[name]['median']:10.3f} ms", file=sys.stderr)
+    return {
+        "meta": {
+            "commit":  _commit(),
+            "python":  platform.python_version(),
+            "machine": platform.machine(),
+            "time":    int(time.time()),
+            "host":    host.size | {"channels": args.channels},
+            "repeat":  args.repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(base, cur, threshold):
+    """Print a median comparison to stderr; return names that regressed."""
+    worse = []
+    print(f"\n{'benchmark':24} {'base ms':>10} {'now ms':>10} {'ratio':>7}", file=sys.stderr)
+    for name, r in cur["results"].items():
+        b = base["results"].get(name)
+        if not b:
+            continue
+        ratio = r["median"] / b["median"] if b["median"] else float("inf")
+        flag  = ""
+        if ratio > 1 + threshold:
+            worse.append(name)
+            flag = "  ← slower"
+        print(f"{name:24} {b['median']:10.3f} {r['median']:10.3f} {ratio:7.2f}{flag}", file=sys.stderr)
+    if base["meta"].get("host") != cur["meta"].get("host"):
+        print("note: host sizes differ from the baseline", file=sys.stderr)
+    return worse
+
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m bench.run", description=__doc__.split("\n")[1])
+    p.add_argument("--services",  type=int, default=2000)
+    p.add_argument("--ports",     type=int, default=500)
+    p.add_argument("--sockets",   type=int, default=20000, help="established TCP sockets")
+    p.add_argument("--procs",     type=int, default=500)
+    p.add_argument("--log-lines", type=int, default=5000)
+    p.add_argument("--channels",  type=int, default=50, help="status channels for push_status")
+    p.add_argument("--repeat",    type=int, default=20)
+    p.add_argument("--warmup",    type=int, default=2)
+    p.add_argument("-k",          default="", help="only benchmarks whose name contains this")
+    p.add_argument("--out",       help="write JSON here instead of stdout")
+    p.add_argument("--compare",   help="baseline JSON from an earlier run")
+    p.add_argument("--threshold", type=float, default=0.2, help="allowed median growth (0.2 = 20%%)")
+    args = p.parse_args()
+
+    res  = asyncio.run(run(args))
+    data = json.dumps(res, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(data + "\n")
+    else:
+        print(data)
+    if args.compare:
+        with open(args.compare) as f:
+            worse = compare(json.load(f), res, args.threshold)
+        if worse:
+            sys.exit(f"regressed: {', '.join(worse)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,3 +6,32 @@ load_dotenv()
 BOT_TOKEN       = os.getenv("BOT_TOKEN", "")
 ADMIN_IDS       = [int(x) for x in os.getenv("ADMIN_IDS", "").split(",") if x.strip().isdigit()]
 UPDATE_INTERVAL = int(os.getenv("UPDATE_INTERVAL", "30"))
+TIMEZONE        = os.getenv("TIMEZONE", "")   # daily report / auto-reboot; empty = system zone
+
+SAMPLE_INTERVAL     = float(os.getenv("SAMPLE_INTERVAL", "1"))
+HISTORY_RETENTION   = int(os.getenv("HISTORY_RETENTION", str(6 * 3600)))
+DISK_IGNORE         = [x.strip() for x in os.getenv("DISK_IGNORE", "/snap,/boot/efi").split(",") if x.strip()]
+SERVICES_TTL        = float(os.getenv("SERVICES_TTL", "60"))
+COLLECT_BUDGET      = float(os.getenv("COLLECT_BUDGET", "0.2"))     # CPU sec per collection pass
+COLLECT_HIGH_LOAD   = float(os.getenv("COLLECT_HIGH_LOAD", "85"))   # host CPU % that throttles collectors
+
+METRICS_DB          = os.getenv("METRICS_DB", "metrics.db")
+METRICS_RAW_HOURS   = int(os.getenv("METRICS_RAW_HOURS", "48"))
+METRICS_MINUTE_DAYS = int(os.getenv("METRICS_MINUTE_DAYS", "14"))
+METRICS_HOUR_DAYS   = int(os.getenv("METRICS_HOUR_DAYS", "365"))
+STORE_FLUSH_DELAY   = float(os.getenv("STORE_FLUSH_DELAY", "5"))
+
+FANOUT_CONCURRENCY  = int(os.getenv("FANOUT_CONCURRENCY", "8"))
+FANOUT_GLOBAL_RATE  = float(os.getenv("FANOUT_GLOBAL_RATE", "25"))
+
+METRICS_LISTEN      = os.getenv("METRICS_LISTEN", "")       # Prometheus /metrics, e.g. 127.0.0.1:9101
+
+LOG_FOLLOW_INTERVAL = float(os.getenv("LOG_FOLLOW_INTERVAL", "3"))
+LOG_FOLLOW_TTL      = float(os.getenv("LOG_FOLLOW_TTL", "600"))
+
+# fleet: central bot listens on FLEET_LISTEN, agents connect to FLEET_CONNECT
+FLEET_LISTEN        = os.getenv("FLEET_LISTEN", "")        # private address, e.g. 10.0.0.1:7070 or unix:/run/tgca.sock
+FLEET_CONNECT       = os.getenv("FLEET_CONNECT", "")
+FLEET_TOKEN         = os.getenv("FLEET_TOKEN", "")
+AGENT_NAME          = os.getenv("AGENT_NAME", "")
+AGENT_INTERVAL      = float(os.getenv("AGENT_INTERVAL", "10"))
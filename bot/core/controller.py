@@ -1,49 +1,69 @@
 import os
+import signal
 import subprocess
 
+from bot.core import proc
+
 
 class SystemController:
 
-    @staticmethod
-    def service_action(action, name):
+    def __init__(self, on_change=None):
+        # called after actions that change the unit list (e.g. ServiceInventory.invalidate)
+        self.on_change = on_change
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change()
+
+    async def service_action(self, action, name):
         if action not in {"start", "stop", "restart", "status"}:
             return False, f"Invalid action: {action}"
         try:
-            r = subprocess.run(["systemctl", action, name],
-                               capture_output=True, text=True, timeout=30)
+            r = await proc.run(["systemctl", action, name], timeout=30)
+            if action != "status":
+                self._changed()
+            if r.timed_out:
+                return False, f"Timeout: {action} {name}"
             return (True, f"{name}: {action} done") if r.returncode == 0 \
                    else (False, r.stderr.strip() or f"Error: {action} {name}")
         except Exception as e:
             return False, str(e)
 
-    @staticmethod
-    def ssh_disable():
+    async def ssh_disable(self):
         """Stop SSH service AND socket so it doesn't restart via socket activation."""
         try:
             for unit in ["ssh.socket", "ssh"]:
-                subprocess.run(["systemctl", "stop",    unit], timeout=10)
-                subprocess.run(["systemctl", "disable", unit], timeout=10)
+                await proc.run(["systemctl", "stop",    unit], timeout=10)
+                await proc.run(["systemctl", "disable", unit], timeout=10)
+            self._changed()
             return True, "SSH stopped (service + socket)"
         except Exception as e:
             return False, str(e)
 
-    @staticmethod
-    def ssh_enable():
+    async def ssh_enable(self):
         try:
             for unit in ["ssh.socket", "ssh"]:
-                subprocess.run(["systemctl", "enable", unit], timeout=10)
-            subprocess.run(["systemctl", "start", "ssh.socket"], timeout=10)
+                await proc.run(["systemctl", "enable", unit], timeout=10)
+            await proc.run(["systemctl", "start", "ssh.socket"], timeout=10)
+            self._changed()
             return True, "SSH started (service + socket)"
         except Exception as e:
             return False, str(e)
 
     @staticmethod
-    def get_autostart_services():
+    async def ssh_active():
+        try:
+            r = await proc.run(["systemctl", "is-active", "ssh"], timeout=5)
+            return r.stdout.strip() == "active"
+        except Exception:
+            return False
+
+    @staticmethod
+    async def get_autostart_services():
         try:
-            r = subprocess.run(
+            r = await proc.run(
                 ["systemctl", "list-unit-files", "--type=service",
-                 "--state=enabled", "--no-pager", "--no-legend"],
-                capture_output=True, text=True, timeout=15)
+                 "--state=enabled", "--no-pager", "--no-legend"], timeout=15)
             return [l.split()[0].replace(".service", "")
                     for l in r.stdout.strip().splitlines() if l.split()]
         except Exception:
@@ -58,24 +78,27 @@ class SystemController:
             return False, str(e)
 
     @staticmethod
-    def clear_journal():
+    async def clear_journal():
         try:
-            r = subprocess.run(["journalctl", "--vacuum-time=1d"],
-                               capture_output=True, text=True, timeout=60)
-            return True, r.stdout.strip() or "Logs cleared"
+            r = await proc.run(["journalctl", "--vacuum-time=1d"], timeout=60, low=True)
+            if r.timed_out:
+                return False, "journalctl timeout"
+            return True, r.stdout.strip() or r.stderr.strip() or "Logs cleared"
         except Exception as e:
             return False, str(e)
 
     @staticmethod
-    def close_port(port):
+    async def close_port(port):
         try:
-            r = subprocess.run(["lsof", "-ti", f":{port}"],
-                               capture_output=True, text=True, timeout=10)
-            pids = [p for p in r.stdout.strip().splitlines() if p]
+            r = await proc.run(["lsof", "-ti", f":{port}"], timeout=10, low=True)
+            pids = [p for p in r.stdout.strip().splitlines() if p.isdigit()]
             if not pids:
                 return False, f"Port {port} not in use"
             for pid in pids:
-                subprocess.run(["kill", "-9", pid], timeout=5)
+                try:
+                    os.kill(int(pid), signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
             return True, f"Port {port} closed ({len(pids)} processes killed)"
         except Exception as e:
             return False, str(e)
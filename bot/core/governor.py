@@ -0,0 +1,109 @@
+"""
+Resource governor for the bot's own footprint.
+Every few seconds it adds up the CPU time of this process, of reaped
+children (os.times) and of children still running (journalctl -f, ...),
+and the RSS of all of them. Running children are the pids bot.core.proc
+started (proc.LIVE_PIDS), so no tick walks the whole process table.
+CPU is averaged over `window` seconds and compared with the budget from
+`limits()`. While over budget the collector registry degrades optional
+collectors; each crossing in either direction is queued as an event for
+admins (the "over" notice at most once per cooldown).
+"""
+import os
+import time
+from collections import deque
+
+import psutil
+
+from bot.core import proc
+
+MB = 1024**2
+
+
+class Governor:
+
+    def __init__(self, limits, interval=5.0, window=60.0, cooldown=1800):
+        self.limits   = limits      # () → (cpu % of one core, rss MB); 0 = no limit
+        self.interval = interval
+        self.window   = window
+        self.cooldown = cooldown
+        self.cpu      = 0.0         # % of one core, averaged over `window`
+        self.rss      = 0.0         # MB, process + live children
+        self.children = 0
+        self.samples  = 0
+        self.over     = False
+        self.since    = None        # when the current violation started
+        self.peak     = (0.0, 0.0)  # worst (cpu, rss) of the current violation
+        self.events   = deque(maxlen=20)   # (kind, cpu, rss, budget, ts)
+        self._proc    = psutil.Process()
+        self._kids    = {}          # pid → psutil.Process, mirrors proc.LIVE_PIDS
+        self._last    = None        # (monotonic, cumulative CPU seconds)
+        self._ts      = 0.0
+        self._notified = float("-inf")
+
+    def _totals(self):
+        t   = os.times()
+        cpu = t.user + t.system + t.children_user + t.children_system
+        rss = self._proc.memory_info().rss
+        kids = self._children()
+        for k in kids:
+            try:
+                with k.oneshot():
+                    ct   = k.cpu_times()
+                    cpu += ct.user + ct.system
+                    rss += k.memory_info().rss
+            except psutil.Error:
+                pass
+        return cpu, rss / MB, len(kids)
+
+    def _children(self):
+        """Process objects are kept per pid so cpu_times() stays a single /proc read."""
+        live = proc.LIVE_PIDS
+        for pid in self._kids.keys() - live:
+            del self._kids[pid]
+        for pid in live - self._kids.keys():
+            try:
+                self._kids[pid] = psutil.Process(pid)
+            except psutil.Error:
+                pass
+        return list(self._kids.values())
+
+    def tick(self, ts=None, *_):
+        """Sampler listener: measure every `interval` seconds."""
+        now = time.monotonic()
+        if now - self._ts < self.interval:
+            return
+        self._ts = now
+        try:
+            total, self.rss, self.children = self._totals()
+        except psutil.Error:
+            return
+        if self._last:
+            dt  = now - self._last[0]
+            pct = (total - self._last[1]) / dt * 100 if dt > 0 else 0.0
+            a   = 1.0 if not self.samples else min(1.0, dt / self.window)
+            self.cpu      = self.cpu + a * (pct - self.cpu)
+            self.samples += 1
+        self._last = (now, total)
+        self._check(time.time())
+
+    def _check(self, ts):
+        cpu_max, rss_max = self.limits()
+        over = bool((cpu_max and self.cpu > cpu_max) or (rss_max and self.rss > rss_max))
+        if over:
+            self.peak = (max(self.peak[0], self.cpu), max(self.peak[1], self.rss))
+        if over and not self.over:
+            self.since, self.peak = ts, (self.cpu, self.rss)
+            if ts - self._notified >= self.cooldown:
+                self._notified = ts
+                self.events.append(("over", self.cpu, self.rss, (cpu_max, rss_max), ts))
+        elif self.over and not over:
+            if self._notified >= self.since:   # only close violations we reported
+                self.events.append(("ok", *self.peak, (cpu_max, rss_max), ts))
+            self.since = None
+        self.over = over
+
+    def drain(self):
+        out = list(self.events)
+        self.events.clear()
+        return out
@@ -0,0 +1,55 @@
+"""
+Adaptive interval for the channel status push.
+After every push the next delay is picked from how far the displayed
+metrics moved since the previous push: alerts firing or a big jump go
+straight to the minimum, a visible move halves the interval, a quiet tick
+stretches it by half up to the maximum. The bot's own CPU use caps how
+fast it may go: above the budget the interval grows in proportion.
+"""
+
+FLOOR   = 5     # sec; below this channel edits run into Telegram's 20/min limit
+PRESETS = (5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300, 600)
+
+
+def step(value, up):
+    """Next preset above / below `value`."""
+    if up:
+        return next((p for p in PRESETS if p > value), PRESETS[-1])
+    return next((p for p in reversed(PRESETS) if p < value), PRESETS[0])
+
+
+class Pacer:
+
+    def __init__(self, interval=30, fast=10.0, slow=2.0, grow=1.5):
+        self.interval = interval
+        self.fast     = fast      # max metric move (points) that jumps to the minimum
+        self.slow     = slow      # smallest move that still counts as "moving"
+        self.grow     = grow
+        self.prev     = None      # displayed metric values at the last push
+        self.change   = 0.0
+        self.bot_cpu  = None
+        self.reason   = "start"
+
+    def fixed(self, interval):
+        self.interval, self.reason = max(FLOOR, interval), "fixed"
+        return self.interval
+
+    def next(self, values, firing, bot_cpu, lo, hi, budget):
+        """Delay before the next push; values are dedup.metric_values() of this push."""
+        lo, hi = max(FLOOR, lo), max(FLOOR, lo, hi)
+        prev, self.prev = self.prev, values
+        self.change  = max((abs(v - prev[k]) for k, v in values.items()
+                            if k in prev), default=0.0) if prev else 0.0
+        self.bot_cpu = bot_cpu
+        if firing:
+            iv, self.reason = lo, "alerts"
+        elif self.change >= self.fast:
+            iv, self.reason = lo, "fast"
+        elif self.change >= self.slow:
+            iv, self.reason = self.interval / 2, "moving"
+        else:
+            iv, self.reason = self.interval * self.grow, "quiet"
+        if budget and bot_cpu is not None and bot_cpu > budget:
+            iv, self.reason = max(iv, self.interval * bot_cpu / budget), "cpu budget"
+        self.interval = round(min(hi, max(lo, iv)), 1)
+        return self.interval
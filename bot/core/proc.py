@@ -0,0 +1,127 @@
+"""
+Async subprocess layer: every systemctl/journalctl/ping/lsof call goes through
+here so slow system commands never block the event loop.
+Background reads pass low=True and run under nice/ionice (idle I/O class),
+so the bot's children yield to the services it is watching.
+Pids of children that are still running are kept in LIVE_PIDS, so the
+Governor can account for them without scanning the process table.
+"""
+import asyncio
+import shutil
+from typing import NamedTuple
+
+OUTPUT_LIMIT = 256 * 1024   # bytes kept per stream
+_CHUNK       = 64 * 1024
+_LOW         = None         # nice/ionice prefix, resolved on first use
+LIVE_PIDS    = set()        # children started here and not yet reaped
+
+
+def _prefix(low):
+    global _LOW
+    if not low:
+        return []
+    if _LOW is None:
+        _LOW = []
+        if shutil.which("nice"):
+            _LOW += ["nice", "-n", "10"]
+        if shutil.which("ionice"):
+            _LOW += ["ionice", "-c", "3"]
+    return _LOW
+
+
+class ProcResult(NamedTuple):
+    returncode: int
+    stdout:     str
+    stderr:     str
+    timed_out:  bool = False
+    truncated:  bool = False
+
+    @property
+    def ok(self):
+        return self.returncode == 0 and not self.timed_out
+
+
+async def _drain(stream, limit, keep):
+    """Read a pipe to EOF keeping at most `limit` bytes from the head or tail."""
+    buf, truncated = bytearray(), False
+    while True:
+        chunk = await stream.read(_CHUNK)
+        if not chunk:
+            break
+        buf += chunk
+        if len(buf) > limit:
+            truncated = True
+            if keep == "tail":
+                del buf[:len(buf) - limit]
+            else:
+                del buf[limit:]
+    return bytes(buf), truncated
+
+
+async def _kill(p):
+    if p.returncode is None:
+        try:
+            p.kill()
+        except ProcessLookupError:
+            pass
+    try:
+        await p.wait()
+    except Exception:
+        pass
+
+
+async def run(args, timeout=10, limit=OUTPUT_LIMIT, keep="head", low=False):
+    """
+    Run a command without blocking the loop (at low priority with low=True).
+    On timeout the process is killed and `timed_out` is set; on cancellation
+    the process is killed and CancelledError propagates. Raises OSError if the
+    binary cannot be started.
+    """
+    p = await asyncio.create_subprocess_exec(
+        *_prefix(low), *args,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE)
+    LIVE_PIDS.add(p.pid)
+    io = asyncio.gather(_drain(p.stdout, limit, keep), _drain(p.stderr, limit, "tail"))
+    io.add_done_callback(lambda f: f.cancelled() or f.exception())
+    try:
+        (out, t1), (err, t2) = await asyncio.wait_for(io, timeout)
+        rc = await p.wait()
+    except asyncio.TimeoutError:
+        await _kill(p)
+        return ProcResult(-1, "", "timeout", timed_out=True)
+    except BaseException:
+        await _kill(p)
+        raise
+    finally:
+        LIVE_PIDS.discard(p.pid)
+    return ProcResult(rc, out.decode(errors="replace"), err.decode(errors="replace"),
+                      truncated=t1 or t2)
+
+
+async def stream_lines(args, limit=1024 * 1024, low=True):
+    """
+    Async generator over a long-running command's stdout lines
+    (e.g. `journalctl -f`). The process is killed when the consumer stops
+    iterating or is cancelled.
+    """
+    p = await asyncio.create_subprocess_exec(
+        *_prefix(low), *args,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+        limit=limit)
+    LIVE_PIDS.add(p.pid)
+    try:
+        while True:
+            try:
+                line = await p.stdout.readline()
+            except ValueError:   # line longer than `limit` — skip it
+                continue
+            if not line:
+                break
+            yield line.decode(errors="replace").rstrip("\n")
+    finally:
+        await _kill(p)
+        LIVE_PIDS.discard(p.pid)
@@ -0,0 +1,180 @@
+"""
+Calendar scheduler for daily jobs (report, auto-reboot).
+Each job has a 5-field cron expression (min hour dom mon dow) evaluated in a
+zoneinfo timezone. Its task computes the next fire time, sleeps until then
+and runs the job. The last-run time is persisted in the StatusStore before
+the job runs, so a run missed while the bot was down or the loop was blocked
+is caught up once if it is still inside the job's grace window.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+
+def zone(name=""):
+    """ZoneInfo for `name`; the system zone (/etc/localtime) when empty."""
+    if name:
+        return ZoneInfo(name)
+    try:
+        with open("/etc/localtime", "rb") as f:
+            return ZoneInfo.from_file(f)
+    except OSError:
+        return timezone.utc
+
+
+def _field(spec, lo, hi):
+    out = set()
+    for part in spec.split(","):
+        rng, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if rng == "*":
+            a, b = lo, hi
+        elif "-" in rng:
+            a, b = map(int, rng.split("-", 1))
+        else:
+            a = b = int(rng)
+            if step > 1:
+                b = hi
+        if not (lo <= a <= b <= hi) or step < 1:
+            raise ValueError(f"bad cron field: {spec}")
+        out.update(range(a, b + 1, step))
+    return out
+
+
+class Cron:
+    """min hour day-of-month month day-of-week (0/7 = Sunday)."""
+
+    def __init__(self, expr):
+        f = expr.split()
+        if len(f) != 5:
+            raise ValueError("cron needs 5 fields: min hour dom mon dow")
+        self.expr    = expr
+        self.minutes = sorted(_field(f[0], 0, 59))
+        self.hours   = sorted(_field(f[1], 0, 23))
+        self.dom     = _field(f[2], 1, 31)
+        self.months  = _field(f[3], 1, 12)
+        self.dow     = {d % 7 for d in _field(f[4], 0, 7)}
+        self._dom_any, self._dow_any = f[2] == "*", f[4] == "*"
+
+    def _day_ok(self, d):
+        if d.month not in self.months:
+            return False
+        dom, dow = d.day in self.dom, d.isoweekday() % 7 in self.dow
+        if self._dom_any or self._dow_any:
+            return dom and dow
+        return dom or dow   # both restricted: cron matches either
+
+    def next(self, after):
+        """First fire time strictly after the aware datetime `after`."""
+        tz  = after.tzinfo
+        day = after.astimezone(tz).replace(tzinfo=None, second=0, microsecond=0)
+        for _ in range(4 * 366):
+            if self._day_ok(day):
+                for h in self.hours:
+                    for m in self.minutes:
+                        t = day.replace(hour=h, minute=m).replace(tzinfo=tz)
+                        if t > after:
+                            return t
+            day = (day + timedelta(days=1)).replace(hour=0, minute=0)
+        raise ValueError(f"{self.expr}: no fire time within 4 years")
+
+    def latest(self, after, until):
+        """Last fire time in (after, until], or None."""
+        out = None
+        while (t := self.next(after)) <= until:
+            out = after = t
+        return out
+
+
+def to_cron(spec):
+    """
+    '09:00' → '0 9 * * *'; a 5-field expression is returned as is.
+    Raises ValueError if it does not parse or never fires (e.g. '0 9 31 2 *').
+    """
+    if ":" in spec and len(spec.split()) == 1:
+        h, m = map(int, spec.split(":"))
+        spec = f"{m} {h} * * *"
+    Cron(spec).next(datetime.now(timezone.utc))
+    return spec
+
+
+class _Job:
+    __slots__ = ("name", "cron", "fn", "grace", "task")
+
+    def __init__(self, name, cron, fn, grace):
+        self.name  = name
+        self.cron  = cron
+        self.fn    = fn
+        self.grace = grace
+        self.task  = None
+
+
+class Scheduler:
+
+    def __init__(self, store, tz=None):
+        self.store = store
+        self.tz    = tz or timezone.utc
+        self.jobs  = {}
+
+    def add(self, name, expr, fn, grace=3600):
+        """fn() is called at every fire time; runs missed by up to `grace` seconds are caught up."""
+        self.jobs[name] = _Job(name, Cron(to_cron(expr)), fn, grace)
+
+    def start(self):
+        for job in self.jobs.values():
+            if job.task is None:
+                job.task = asyncio.get_running_loop().create_task(self._loop(job))
+
+    async def stop(self):
+        tasks = [j.task for j in self.jobs.values() if j.task]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for j in self.jobs.values():
+            j.task = None
+
+    def reschedule(self, name, expr):
+        """New expression takes effect now; nothing is caught up for the old one."""
+        job      = self.jobs[name]
+        job.cron = Cron(to_cron(expr))
+        self.store.set_last_run(name, time.time())
+        if job.task:
+            job.task.cancel()
+            job.task = asyncio.get_running_loop().create_task(self._loop(job))
+        return self.next_run(name)
+
+    def next_run(self, name):
+        return self.jobs[name].cron.next(datetime.now(self.tz))
+
+    async def _loop(self, job):
+        while True:
+            now  = datetime.now(self.tz)
+            last = self.store.get_last_run(job.name)
+            if last is None:   # first start: schedule from now, don't back-fill
+                self.store.set_last_run(job.name, now.timestamp())
+                last = now.timestamp()
+            due = job.cron.next(datetime.fromtimestamp(last, self.tz))
+            if due > now:
+                # capped so wall-clock jumps (suspend, NTP) are noticed within the hour
+                await asyncio.sleep(min((due - now).total_seconds(), 3600))
+                continue
+            # record first: a job that reboots the host must not run again on start
+            self.store.set_last_run(job.name, now.timestamp())
+            self.store.flush()
+            # only the newest missed run can be caught up; older ones are outside grace anyway
+            since  = max(due - timedelta(minutes=1), now - timedelta(seconds=job.grace))
+            newest = job.cron.latest(since, now)
+            if newest is None:
+                late = (now - due).total_seconds()
+                print(f"scheduler: {job.name} missed {due:%Y-%m-%d %H:%M} ({late:.0f}s late), skipped")
+                continue
+            due, late = newest, (now - newest).total_seconds()
+            if late > 60:
+                print(f"scheduler: {job.name} catching up {due:%Y-%m-%d %H:%M} ({late:.0f}s late)")
+            try:
+                res = job.fn()
+                if asyncio.iscoroutine(res):
+                    await res
+            except Exception as e:
+                print(f"scheduler: {job.name}: {e}")
@@ -0,0 +1,117 @@
+"""
+Bot self-telemetry: latency histograms and error/RetryAfter counters for
+handlers, jobs and outgoing Bot API calls, plus sampled queue-depth gauges.
+Histograms use fixed log-spaced buckets (×√2 from 0.5 ms), so recording is a
+bisect and an increment, memory per name is constant and it can stay on.
+"""
+import bisect
+import time
+from functools import wraps
+
+from telegram.error import RetryAfter
+from telegram.request import HTTPXRequest
+
+BOUNDS = [0.0005 * 2 ** (i / 2) for i in range(44)]   # 0.5 ms … ~33 min
+
+
+class Histogram:
+    __slots__ = ("counts", "n", "total", "max", "errors", "retries")
+
+    def __init__(self):
+        self.counts  = [0] * (len(BOUNDS) + 1)
+        self.n       = 0
+        self.total   = 0.0
+        self.max     = 0.0
+        self.errors  = 0
+        self.retries = 0
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(BOUNDS, seconds)] += 1
+        self.n     += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (at most √2 high), capped at max."""
+        rank, acc = q * self.n, 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if c and acc >= rank:
+                return min(BOUNDS[i] if i < len(BOUNDS) else self.max, self.max)
+        return self.max
+
+
+class Telemetry:
+
+    def __init__(self):
+        self.stats   = {}   # name → Histogram
+        self.gauges  = {}   # name → fn() returning the current depth
+        self.peaks   = {}
+        self.started = time.time()
+
+    def record(self, name, seconds, error=False, retry=False):
+        h = self.stats.get(name)
+        if h is None:
+            h = self.stats[name] = Histogram()
+        h.add(seconds)
+        h.errors  += error
+        h.retries += retry
+
+    def wrap(self, name, fn, key=None):
+        """Time an async handler/job; `key(update)` may refine the name (e.g. callback prefix)."""
+        @wraps(fn)
+        async def timed(*args, **kw):
+            label = f"{name}:{key(args[0])}" if key else name
+            t0, err, retry = time.perf_counter(), False, False
+            try:
+                return await fn(*args, **kw)
+            except RetryAfter:
+                retry = True
+                raise
+            except Exception:
+                err = True
+                raise
+            finally:
+                self.record(label, time.perf_counter() - t0, err, retry)
+        return timed
+
+    def gauge(self, name, fn):
+        self.gauges[name] = fn
+
+    def sample(self, *_):
+        """Poll gauges and keep their peaks (hooked to the 1 s sampler)."""
+        for name, fn in self.gauges.items():
+            try:
+                v = fn()
+            except Exception:
+                continue
+            if v > self.peaks.get(name, 0):
+                self.peaks[name] = v
+
+    def rows(self, prefix=""):
+        """[(name, Histogram)] sorted by total time spent, busiest first."""
+        return sorted(((k, h) for k, h in self.stats.items() if k.startswith(prefix)),
+                      key=lambda kv: kv[1].total, reverse=True)
+
+
+class TimedRequest(HTTPXRequest):
+    """HTTPXRequest that records every Bot API call as `api:<method>`."""
+
+    def __init__(self, telemetry, **kw):
+        super().__init__(**kw)
+        self.telemetry = telemetry
+
+    async def post(self, url, *args, **kw):   # typing-@final upstream; overridden only to time it
+        t0, err, retry = time.perf_counter(), False, False
+        try:
+            return await super().post(url, *args, **kw)
+        except RetryAfter:
+            retry = True
+            raise
+        except Exception:
+            err = True
+            raise
+        finally:
+            self.telemetry.record("api:" + url.rsplit("/", 1)[-1],
+                                  time.perf_counter() - t0, err, retry)
@@ -0,0 +1,131 @@
+"""
+Headless agent: streams MetricsSnapshot deltas to a central bot and runs
+the SystemController actions the hub routes to it.
+Started with `python -m bot.main --agent` (see FLEET_* in .env).
+"""
+import asyncio
+import time
+
+from bot.fleet import protocol
+
+# action name → (controller method, number of string args)
+ACTIONS = {
+    "start":         ("service_action", 1),
+    "stop":          ("service_action", 1),
+    "restart":       ("service_action", 1),
+    "status":        ("service_action", 1),
+    "ssh_enable":    ("ssh_enable", 0),
+    "ssh_disable":   ("ssh_disable", 0),
+    "close_port":    ("close_port", 1),
+    "clear_journal": ("clear_journal", 0),
+}
+
+
+async def run_action(controller, action, args):
+    if action not in ACTIONS:
+        return False, f"Unknown action: {action}"
+    method, nargs = ACTIONS[action]
+    if len(args) != nargs:
+        return False, f"{action} expects {nargs} argument(s)"
+    fn = getattr(controller, method)
+    if method == "service_action":
+        return await fn(action, args[0])
+    if method == "close_port":
+        if not str(args[0]).isdigit():
+            return False, f"Invalid port: {args[0]}"
+        return await fn(int(args[0]))
+    return await fn()
+
+
+class Agent:
+
+    def __init__(self, name, monitor, controller, target, token, interval=10):
+        self.name       = name
+        self.monitor    = monitor
+        self.controller = controller
+        self.target     = target
+        self.token      = token
+        self.interval   = interval
+        self._tasks     = set()   # running _act()s — the loop only keeps weak references
+
+    async def run(self):
+        """Connect, stream, reconnect with backoff — forever."""
+        backoff = 1
+        while True:
+            started = time.monotonic()
+            try:
+                await self._session()
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+                print(f"agent: {self.target}: {e}")   # ValueError: malformed or overlong frame
+            except Exception as e:   # collect() or anything else — reconnect rather than die
+                print(f"agent: {self.target}: {type(e).__name__}: {e}")
+            if time.monotonic() - started > 60:
+                backoff = 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+
+    async def _session(self):
+        reader, writer = await protocol.open_connection(self.target)
+        lock = asyncio.Lock()
+
+        async def send(frame):
+            async with lock:
+                writer.write(protocol.encode(frame))
+                await writer.drain()
+
+        try:
+            await self._handshake(reader, send)
+        except BaseException:
+            writer.close()
+            raise
+        print(f"agent: connected to {self.target} as {self.name}")
+        # the session ends when either side stops: EOF from the hub or a failing collect()
+        tasks = {asyncio.create_task(self._read(reader, send)), asyncio.create_task(self._push(send))}
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                t.result()   # re-raise what stopped it
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    async def _read(self, reader, send):
+        while True:
+            frame = await protocol.read_frame(reader)
+            if frame is None:
+                return
+            if frame.get("t") == "act":
+                task = asyncio.create_task(self._act(send, frame))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _handshake(self, reader, send):
+        """Prove we know the token and make the hub prove it too — before any action is accepted."""
+        mine = protocol.nonce()
+        await send({"t": "hello", "name": self.name, "nonce": mine, "v": protocol.VERSION})
+        ch = await asyncio.wait_for(protocol.read_frame(reader), 10)
+        if not ch:
+            raise ConnectionError("hub closed the connection (name or version rejected)")
+        if (ch.get("t") != "challenge" or not isinstance(ch.get("nonce"), str)
+                or not protocol.verify(ch.get("mac"), self.token, "hub", self.name, mine, ch["nonce"])):
+            raise ConnectionError("hub failed authentication")
+        await send({"t": "auth", "mac": protocol.sign(self.token, "agent", self.name, mine, ch["nonce"])})
+
+    async def _push(self, send):
+        prev, seq = None, 0
+        while True:
+            cur  = (await self.monitor.collect()).as_dict()
+            full = seq % protocol.FULL_EVERY == 0
+            d    = protocol.delta(None if full else prev, cur)
+            await send({"t": "snap", "seq": seq, "full": full, "d": d})
+            prev, seq = cur, seq + 1
+            await asyncio.sleep(self.interval)
+
+    async def _act(self, send, frame):
+        try:
+            ok, msg = await run_action(self.controller, frame.get("action"), frame.get("args") or [])
+        except Exception as e:
+            ok, msg = False, str(e)
+        await send({"t": "res", "id": frame.get("id"), "ok": ok, "msg": msg})
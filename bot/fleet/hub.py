@@ -0,0 +1,143 @@
+"""
+Central side of the fleet: accepts agent connections, keeps the latest
+snapshot of every agent (applying delta frames in place) and routes
+SystemController actions to a named agent.
+"""
+import asyncio
+import itertools
+import time
+
+from bot.fleet import protocol
+from bot.monitor.journal import Cursors
+from bot.monitor.snapshot import MetricsSnapshot
+
+
+class AgentState:
+    __slots__ = ("name", "data", "seq", "seen", "writer", "pending", "connected")
+
+    def __init__(self, name):
+        self.name      = name
+        self.data      = {}
+        self.seq       = -1
+        self.seen      = 0.0
+        self.writer    = None
+        self.pending   = {}
+        self.connected = False
+
+    @property
+    def snapshot(self):
+        return MetricsSnapshot.from_dict(self.data) if self.data.get("ts") else None
+
+
+class FleetHub:
+
+    def __init__(self, listen, token, stale_after=60):
+        self.listen      = listen
+        self.token       = token
+        self.stale_after = stale_after
+        self.agents      = {}
+        self.pending     = Cursors(size=200)   # confirm-button token → (agent, (action, arg))
+        self._ids        = itertools.count(1)
+        self._server     = None
+
+    async def start(self):
+        self._server = await protocol.start_server(self.listen, self._handle)
+        print(f"fleet: listening on {self.listen}")
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def online(self, a):
+        return a.connected and time.time() - a.seen < self.stale_after
+
+    async def _handle(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        name = await self._handshake(reader, writer)
+        if name is None:
+            print(f"fleet: rejected {peer}")
+            writer.close()
+            return
+        a = self.agents.get(name) or AgentState(name)
+        self.agents[a.name] = a
+        if a.writer is not None:
+            a.writer.close()   # newer connection wins; its actions will never be answered
+            self._fail_pending(a, "agent reconnected")
+        a.writer, a.connected, a.seq = writer, True, -1
+        try:
+            while True:
+                frame = await protocol.read_frame(reader)
+                if frame is None:
+                    break
+                t = frame.get("t")
+                if t == "snap":
+                    d = frame.get("d")
+                    if not isinstance(d, dict):
+                        raise ValueError("snap frame without a 'd' object")
+                    if frame.get("full"):
+                        a.data = d
+                    elif frame.get("seq") == a.seq + 1 and a.data:
+                        a.data.update(d)
+                    else:
+                        a.data = {}   # gap in the stream — wait for the next full frame
+                    a.seq, a.seen = frame.get("seq", -1), time.time()
+                elif t == "res":
+                    fut = a.pending.pop(frame.get("id"), None)
+                    if fut and not fut.done():
+                        fut.set_result((bool(frame.get("ok")), str(frame.get("msg", ""))))
+        except (ConnectionError, ValueError) as e:
+            print(f"fleet: {a.name}: {e}")
+        finally:
+            if a.writer is writer:
+                a.writer, a.connected = None, False
+                self._fail_pending(a, "agent disconnected")
+            writer.close()
+
+    @staticmethod
+    def _fail_pending(a, msg):
+        for fut in a.pending.values():
+            if not fut.done():
+                fut.set_result((False, msg))
+        a.pending.clear()
+
+    async def _handshake(self, reader, writer):
+        """Challenge-response on hello; the agent name once both sides proved the token, else None."""
+        try:
+            hello = await asyncio.wait_for(protocol.read_frame(reader), 10)
+            if (not hello or hello.get("t") != "hello" or hello.get("v") != protocol.VERSION
+                    or not protocol.valid_name(hello.get("name")) or not isinstance(hello.get("nonce"), str)):
+                return None
+            name, theirs, mine = hello.get("name"), hello["nonce"], protocol.nonce()
+            writer.write(protocol.encode({"t": "challenge", "nonce": mine,
+                                          "mac": protocol.sign(self.token, "hub", name, theirs, mine)}))
+            await writer.drain()
+            auth = await asyncio.wait_for(protocol.read_frame(reader), 10)
+        except Exception:
+            return None
+        if not auth or auth.get("t") != "auth" or not protocol.verify(auth.get("mac"), self.token, "agent", name, theirs, mine):
+            return None
+        return name
+
+    def rows(self):
+        """[(name, MetricsSnapshot | None, online), ...] for rendering."""
+        return [(a.name, a.snapshot, self.online(a)) for a in self.agents.values()]
+
+    async def action(self, name, action, args=(), timeout=60):
+        """Run an action on agent `name`; returns (ok, msg) like SystemController."""
+        a = self.agents.get(name)
+        if a is None or a.writer is None:
+            return False, f"Agent {name} not connected"
+        rid = next(self._ids)
+        fut = asyncio.get_running_loop().create_future()
+        a.pending[rid] = fut
+        a.writer.write(protocol.encode({"t": "act", "id": rid, "action": action, "args": list(args)}))
+        try:
+            await a.writer.drain()
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            return False, f"{name}: {action} timeout"
+        except ConnectionError as e:
+            return False, str(e)
+        finally:
+            a.pending.pop(rid, None)
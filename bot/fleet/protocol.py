@@ -0,0 +1,93 @@
+"""
+Wire format between agents and the central bot.
+Newline-delimited compact JSON frames over TCP or a Unix socket:
+
+    agent → hub   {"t": "hello", "name": ..., "nonce": ..., "v": 2}
+    hub → agent   {"t": "challenge", "nonce": ..., "mac": sign(token, "hub", ...)}
+    agent → hub   {"t": "auth", "mac": sign(token, "agent", ...)}
+                  {"t": "snap", "seq": n, "full": bool, "d": {changed fields}}
+                  {"t": "res", "id": ..., "ok": bool, "msg": ...}
+    hub → agent   {"t": "act", "id": ..., "action": ..., "args": [...]}
+
+The shared token never goes on the wire: each side sends a fresh nonce and
+proves it knows the token with an HMAC over both nonces and the agent name,
+so the agent also authenticates the hub before it runs any action.
+The link itself is not encrypted — keep FLEET_LISTEN on a private address,
+a VPN or a Unix socket.
+
+Snapshots are delta-encoded: only top-level MetricsSnapshot fields that
+changed since the previous frame are sent, with a full frame every
+FULL_EVERY frames so a reconnecting hub converges quickly.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import re
+import secrets
+
+VERSION    = 2
+FULL_EVERY = 30
+MAX_FRAME  = 1024 * 1024
+NAME_RE    = re.compile(r"[A-Za-z0-9_.-]{1,32}")
+
+
+def encode(obj):
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode() + b"\n"
+
+
+async def read_frame(reader):
+    """Next decoded frame, or None on EOF. Raises ValueError on a malformed or overlong line."""
+    line = await reader.readline()
+    if not line:
+        return None
+    frame = json.loads(line)
+    if not isinstance(frame, dict):
+        raise ValueError(f"frame is not an object: {line[:40]!r}")
+    return frame
+
+
+def nonce():
+    return secrets.token_hex(16)
+
+
+def sign(token, role, name, agent_nonce, hub_nonce):
+    """HMAC-SHA256 proof of `token`; `role` keeps the two directions distinct."""
+    msg = "|".join((role, name, agent_nonce, hub_nonce)).encode()
+    return hmac.new(token.encode(), msg, hashlib.sha256).hexdigest()
+
+
+def verify(mac, token, role, name, agent_nonce, hub_nonce):
+    return hmac.compare_digest(str(mac or ""), sign(token, role, name, agent_nonce, hub_nonce))
+
+
+def valid_name(name):
+    return isinstance(name, str) and NAME_RE.fullmatch(name) is not None
+
+
+def delta(prev, cur):
+    if prev is None:
+        return dict(cur)
+    return {k: v for k, v in cur.items() if prev.get(k) != v}
+
+
+def parse_address(addr):
+    """'host:port' → ('tcp', host, port); 'unix:/path' → ('unix', path, None)."""
+    if addr.startswith("unix:"):
+        return "unix", addr[5:], None
+    host, _, port = addr.rpartition(":")
+    return "tcp", host or "0.0.0.0", int(port)
+
+
+async def open_connection(addr):
+    kind, host, port = parse_address(addr)
+    if kind == "unix":
+        return await asyncio.open_unix_connection(host, limit=MAX_FRAME)
+    return await asyncio.open_connection(host, port, limit=MAX_FRAME)
+
+
+async def start_server(addr, handler):
+    kind, host, port = parse_address(addr)
+    if kind == "unix":
+        return await asyncio.start_unix_server(handler, host, limit=MAX_FRAME)
+    return await asyncio.start_server(handler, host, port, limit=MAX_FRAME)
@@ -1,31 +1,170 @@
+import asyncio
+import socket
+import sys
+from functools import partial
+
 from telegram import Update
 from telegram.ext import Application
 
-from bot.config import BOT_TOKEN, UPDATE_INTERVAL
+from bot.config import (
+    AGENT_INTERVAL, AGENT_NAME, BOT_TOKEN, COLLECT_BUDGET, COLLECT_HIGH_LOAD, DISK_IGNORE,
+    FANOUT_CONCURRENCY, FANOUT_GLOBAL_RATE,
+    FLEET_CONNECT, FLEET_LISTEN, FLEET_TOKEN, HISTORY_RETENTION,
+    LOG_FOLLOW_INTERVAL, LOG_FOLLOW_TTL,
+    METRICS_DB, METRICS_HOUR_DAYS, METRICS_LISTEN, METRICS_MINUTE_DAYS, METRICS_RAW_HOURS,
+    SAMPLE_INTERVAL, SERVICES_TTL, STORE_FLUSH_DELAY, TIMEZONE, UPDATE_INTERVAL,
+)
 from bot.core.controller import SystemController
+from bot.core.governor import Governor
+from bot.core.pacer import Pacer
+from bot.core.scheduler import Scheduler, to_cron, zone
+from bot.core.telemetry import Telemetry, TimedRequest
+from bot.fleet import protocol
+from bot.fleet.agent import Agent
+from bot.fleet.hub import FleetHub
+from bot.monitor.alerts import AlertEngine, rules_from_settings
+from bot.monitor.journal import JournalFollower
+from bot.monitor.prometheus import MetricsServer
+from bot.monitor.sampler import Sampler
 from bot.monitor.server_optimized import ServerMonitor
-from bot.storage.status_store import StatusStore
+from bot.storage.metric_store import MetricStore
+from bot.storage.status_store import DEFAULT_SETTINGS, StatusStore
+from bot.telegram.charts import ChartCache
+from bot.telegram.dedup import EditDeduper
+from bot.telegram.fanout import FanOut
 from bot.telegram.handlers import (
-    job_alerts, job_auto_reboot, job_daily_report,
+    flush_log_follow, job_alerts, job_auto_reboot, job_daily_report, job_governor,
     job_on_startup, job_update_status, register_handlers,
 )
 
 
+def _schedule_spec(settings, key):
+    """Stored time/cron for `key`, falling back to the default if it no longer parses."""
+    try:
+        return to_cron(settings[key])
+    except ValueError:
+        print(f"scheduler: bad {key} {settings[key]!r}, using {DEFAULT_SETTINGS[key]}")
+        return DEFAULT_SETTINGS[key]
+
+
+async def _post_init(app):
+    app.bot_data["sampler"].start()
+    app.bot_data["scheduler"].start()
+    if app.bot_data["fleet"]:
+        await app.bot_data["fleet"].start()
+    if app.bot_data["exporter"]:
+        await app.bot_data["exporter"].start()
+
+
+async def _post_shutdown(app):
+    await app.bot_data["sampler"].stop()
+    await app.bot_data["scheduler"].stop()
+    await app.bot_data["journal"].stop()
+    if app.bot_data["fleet"]:
+        await app.bot_data["fleet"].stop()
+    if app.bot_data["exporter"]:
+        await app.bot_data["exporter"].stop()
+    app.bot_data["metrics"].close()
+    app.bot_data["store"].flush()
+
+
+def _bot_limits(store):
+    s = store.get_settings()
+    return s["bot_cpu_budget"], s["bot_rss_budget"]
+
+
+def run_agent():
+    """Headless mode: no Telegram, just stream snapshots to FLEET_CONNECT."""
+    if not FLEET_CONNECT or not FLEET_TOKEN:
+        sys.exit("Agent mode needs FLEET_CONNECT and FLEET_TOKEN in .env")
+    name = AGENT_NAME or socket.gethostname().split(".")[0]
+    if not protocol.valid_name(name):
+        sys.exit(f"AGENT_NAME {name!r} must match {protocol.NAME_RE.pattern}")
+
+    async def _run():
+        sampler = Sampler(SAMPLE_INTERVAL, HISTORY_RETENTION, disk_ignore=DISK_IGNORE)
+        monitor = ServerMonitor(sampler, SERVICES_TTL, COLLECT_BUDGET, COLLECT_HIGH_LOAD)
+        agent   = Agent(name, monitor,
+                        SystemController(on_change=monitor.invalidate),
+                        FLEET_CONNECT, FLEET_TOKEN, AGENT_INTERVAL)
+        sampler.start()
+        print(f"Agent {agent.name} → {FLEET_CONNECT}, interval {AGENT_INTERVAL}s")
+        await agent.run()
+
+    asyncio.run(_run())
+
+
 def main():
-    app = Application.builder().token(BOT_TOKEN).build()
+    if "--agent" in sys.argv:
+        run_agent(); return
+    if FLEET_LISTEN and not FLEET_TOKEN:
+        sys.exit("FLEET_LISTEN needs FLEET_TOKEN in .env")
+    tm  = Telemetry()
+    # handlers await slow systemctl/journalctl calls — let other updates run meanwhile
+    app = (Application.builder().token(BOT_TOKEN).concurrent_updates(True)
+           .request(TimedRequest(tm, connection_pool_size=256))   # times every Bot API call
+           .post_init(_post_init).post_shutdown(_post_shutdown).build())
+    sampler = Sampler(SAMPLE_INTERVAL, HISTORY_RETENTION, disk_ignore=DISK_IGNORE)
+    store   = StatusStore(flush_delay=STORE_FLUSH_DELAY)
+    gov     = Governor(partial(_bot_limits, store))
+    monitor = ServerMonitor(sampler, SERVICES_TTL, COLLECT_BUDGET, COLLECT_HIGH_LOAD, gov)
+    metrics = MetricStore(METRICS_DB, METRICS_RAW_HOURS, METRICS_MINUTE_DAYS, METRICS_HOUR_DAYS)
+    legacy  = store.legacy_daily_stats()
+    if legacy:   # pre-MetricStore per-day stats: import, then drop from the JSON
+        print(f"metrics: imported {metrics.import_daily(legacy)} day(s) of legacy daily stats")
+        store.drop_legacy_daily_stats()
+    if not store.get_settings()["update_interval"]:   # .env value seeds the runtime setting
+        store.update_settings(update_interval=UPDATE_INTERVAL)
+    alerts  = AlertEngine(rules_from_settings(store.get_settings()))
+    sampler.listeners.append(alerts.observe)
+    sampler.listeners.append(tm.sample)
+    sampler.listeners.append(gov.tick)
+    # calendar jobs run through the job queue so they get a normal CallbackContext
+    s     = store.get_settings()
+    sched = Scheduler(store, zone(TIMEZONE))
+    sched.add("daily_report", _schedule_spec(s, "daily_report_time"),
+              lambda: app.job_queue.run_once(tm.wrap("job:daily_report", job_daily_report), 0),
+              grace=6 * 3600)
+    sched.add("auto_reboot", _schedule_spec(s, "auto_reboot_time"),
+              lambda: app.job_queue.run_once(tm.wrap("job:auto_reboot", job_auto_reboot), 0),
+              grace=15 * 60)
+    fanout  = FanOut(FANOUT_CONCURRENCY, FANOUT_GLOBAL_RATE)
+    journal = JournalFollower(partial(flush_log_follow, app), LOG_FOLLOW_INTERVAL, LOG_FOLLOW_TTL)
+    tm.gauge("update_queue",    app.update_queue.qsize)
+    tm.gauge("fanout_inflight", lambda: fanout.inflight)
+    tm.gauge("log_streams",     lambda: len(journal))
+    tm.gauge("bot_cpu_pct",     lambda: round(gov.cpu, 1))
+    tm.gauge("bot_rss_mb",      lambda: round(gov.rss))
     app.bot_data.update({
-        "monitor":    ServerMonitor(),
-        "controller": SystemController(),
-        "store":      StatusStore(),
+        "sampler":    sampler,
+        "monitor":    monitor,
+        "controller": SystemController(on_change=monitor.invalidate),
+        "store":      store,
+        "alerts":     alerts,
+        "scheduler":  sched,
+        "fanout":     fanout,
+        "dedup":      EditDeduper(),
+        "journal":    journal,
+        "log_search": {},   # chat_id → /logsearch state with the last cursor
+        "fleet":      FleetHub(FLEET_LISTEN, FLEET_TOKEN, max(30, 3 * AGENT_INTERVAL)) if FLEET_LISTEN else None,
+        "metrics":    metrics,
+        "charts":     ChartCache(metrics),
+        "telemetry":  tm,
+        "pacer":      Pacer(UPDATE_INTERVAL),
+        "governor":   gov,
+        # scrapes read the snapshot cached by the status push — never a fresh collection
+        "exporter":   MetricsServer(METRICS_LISTEN, lambda: app.bot_data.get("snapshot")) if METRICS_LISTEN else None,
     })
     register_handlers(app)
     jq = app.job_queue
-    jq.run_repeating(job_update_status, interval=UPDATE_INTERVAL, first=20)
-    jq.run_repeating(job_alerts,        interval=60,  first=40)
-    jq.run_repeating(job_daily_report,  interval=60,  first=60)
-    jq.run_repeating(job_auto_reboot,   interval=60,  first=60)
-    jq.run_once(job_on_startup, when=12)
-    print(f"Bot started. Interval: {UPDATE_INTERVAL}s")
+    # reschedules itself after every push (fixed or adaptive interval)
+    jq.run_once(tm.wrap("job:update_status", job_update_status), when=20, name="update_status")
+    jq.run_repeating(tm.wrap("job:alerts", job_alerts),               interval=10,  first=40)
+    jq.run_repeating(tm.wrap("job:governor", job_governor),           interval=30,  first=90)
+    jq.run_once(tm.wrap("job:startup", job_on_startup), when=12)
+    mode = (f"{s['update_min']}-{s['update_max']}s adaptive" if s["update_adaptive"]
+            else f"{s['update_interval']}s")
+    print(f"Bot started. Interval: {mode}")
     app.run_polling(allowed_updates=Update.ALL_TYPES)
 
 
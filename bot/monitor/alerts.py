@@ -0,0 +1,167 @@
+"""
+Alert rule engine.
+A rule reads like "cpu > 80 for 5m, clear at 75, cooldown 30m". The sampler
+feeds every sample through AlertEngine.observe(); each rule only remembers
+when the current run of breaching (or recovered) samples began, so a check
+is O(1) per rule per sample whatever the window length. Fire and clear
+transitions are queued as events for the alert job to deliver.
+"""
+from collections import deque
+
+from bot.monitor.sampler import METRICS, format_window, parse_window
+
+OK, PENDING, FIRING = "ok", "pending", "firing"
+
+# built-in rules driven by /set_alerts: metric → settings key
+BUILTIN = {"cpu": "alert_cpu", "ram": "alert_ram", "disk": "alert_disk"}
+
+
+class Rule:
+    __slots__ = ("metric", "op", "fire", "clear", "duration", "cooldown",
+                 "state", "run_start", "since", "fired_at", "value", "muted")
+
+    def __init__(self, metric, op=">", fire=80.0, clear=None, duration=0, cooldown=0):
+        self.metric    = metric
+        self.op        = op
+        self.fire      = fire
+        self.clear     = fire if clear is None else clear
+        self.duration  = duration
+        self.cooldown  = cooldown
+        self.state     = OK
+        self.run_start = None    # start of the current breaching / recovered run
+        self.since     = None    # when the rule entered FIRING
+        self.fired_at  = float("-inf")
+        self.value     = None
+        self.muted     = False   # fired inside cooldown — no fire/clear notices
+
+    @property
+    def key(self):
+        return (self.metric, self.op, self.fire, self.clear, self.duration)
+
+    def _breach(self, v):
+        return v > self.fire if self.op == ">" else v < self.fire
+
+    def _recovered(self, v):
+        return v <= self.clear if self.op == ">" else v >= self.clear
+
+    def observe(self, ts, v):
+        """Feed one sample; returns "fire", "clear" or None."""
+        self.value = v
+        if self.state != FIRING:
+            if not self._breach(v):
+                self.state, self.run_start = OK, None
+                return None
+            if self.run_start is None:
+                self.state, self.run_start = PENDING, ts
+            if ts - self.run_start < self.duration:
+                return None
+            self.state, self.run_start, self.since = FIRING, None, ts
+            self.muted = ts - self.fired_at < self.cooldown
+            if self.muted:
+                return None
+            self.fired_at = ts
+            return "fire"
+        if not self._recovered(v):   # still inside the hysteresis band or above
+            self.run_start = None
+            return None
+        if self.run_start is None:
+            self.run_start = ts
+        if ts - self.run_start < self.duration:
+            return None
+        self.state, self.run_start = OK, None
+        return None if self.muted else "clear"
+
+    def describe(self):
+        s = f"{self.metric} {self.op} {self.fire:g}"
+        if self.duration:
+            s += f" for {format_window(self.duration)}"
+        if self.clear != self.fire:
+            s += f", clear {'≤' if self.op == '>' else '≥'} {self.clear:g}"
+        if self.cooldown:
+            s += f", cooldown {format_window(self.cooldown)}"
+        return s
+
+    def as_dict(self):
+        return {"metric": self.metric, "op": self.op, "fire": self.fire, "clear": self.clear,
+                "duration": self.duration, "cooldown": self.cooldown}
+
+
+def _window(text):
+    w = parse_window(text)
+    if w is None:
+        raise ValueError(f"bad duration: {text}")
+    return w
+
+
+def parse_rule(text):
+    """'cpu>80 5m clear=70 cooldown=30m' → rule dict, or None."""
+    parts = text.split()
+    if not parts:
+        return None
+    head = parts[0]
+    op   = ">" if ">" in head else "<" if "<" in head else None
+    if op is None:
+        return None
+    metric, _, fire = head.partition(op)
+    if metric not in METRICS:
+        return None
+    try:
+        r = {"metric": metric, "op": op, "fire": float(fire), "clear": float(fire),
+             "duration": 0, "cooldown": 0}
+        for p in parts[1:]:
+            k, _, v = p.partition("=")
+            if not v:
+                r["duration"] = _window(k)
+            elif k == "clear":
+                r["clear"] = float(v)
+            elif k == "cooldown":
+                r["cooldown"] = _window(v)
+            else:
+                return None
+    except ValueError:
+        return None
+    return r
+
+
+def rules_from_settings(s):
+    """Built-in cpu/ram/disk rules from /set_alerts plus the custom ones."""
+    h, d, c = s["alert_hysteresis"], s["alert_for"], s["alert_cooldown"]
+    rules = [Rule(m, ">", float(s[k]), float(s[k]) - h, d, c) for m, k in BUILTIN.items()]
+    return rules + [Rule(**r) for r in s["alert_rules"]]
+
+
+class AlertEngine:
+
+    def __init__(self, rules=(), max_events=100):
+        self.rules  = list(rules)
+        self.events = deque(maxlen=max_events)   # (kind, rule, value, ts)
+
+    def load(self, rules):
+        """Swap the rule set; unchanged rules keep their run state."""
+        old = {r.key: r for r in self.rules}
+        new = []
+        for r in rules:
+            cur = old.pop(r.key, None)
+            if cur is not None:
+                cur.cooldown = r.cooldown
+                r = cur
+            new.append(r)
+        self.rules = new
+
+    def observe(self, ts, values):
+        for r in self.rules:
+            v = values.get(r.metric)
+            if v is None:
+                continue
+            kind = r.observe(ts, v)
+            if kind:
+                self.events.append((kind, r, v, ts))
+
+    def drain(self):
+        out = list(self.events)
+        self.events.clear()
+        return out
+
+    @property
+    def firing(self):
+        return [r for r in self.rules if r.state == FIRING]
@@ -0,0 +1,132 @@
+"""
+Collector registry.
+Each metric source (cpu, mem, disk, net, services, ports, ...) is a Collector
+with a TTL, a cost estimate and dependencies. refresh() runs the collectors
+that are due, in dependency order and cheapest first, within a CPU-time
+budget per pass; a collector that does not fit keeps serving its last value.
+Cost is measured on every run (own + child CPU time, EWMA), so the estimate
+follows the real host. When the host is busy (pressure() ≥ high) or the
+bot itself is over its budget (throttle()) the pass budget shrinks and
+optional collectors' TTLs stretch by `degrade`, so the expensive ones are
+the first to back off.
+"""
+import asyncio
+import os
+import time
+
+
+def cpu_time():
+    """CPU seconds used by this process and its reaped children (systemctl, ...)."""
+    t = os.times()
+    return time.process_time() + t.children_user + t.children_system
+
+
+class Collector:
+    __slots__ = ("name", "fn", "ttl", "cost", "deps", "essential",
+                 "value", "ts", "runs", "errors", "skipped", "deferred")
+
+    def __init__(self, name, fn, ttl=0.0, cost=0.001, deps=(), essential=False):
+        self.name      = name
+        self.fn        = fn          # fn(*dep_values) → value, sync or async
+        self.ttl       = ttl
+        self.cost      = cost        # CPU seconds per run; seeded, then measured
+        self.deps      = tuple(deps)
+        self.essential = essential   # always runs when due, whatever the budget
+        self.value     = None
+        self.ts        = 0.0         # monotonic time of the last successful run
+        self.runs      = 0
+        self.errors    = 0
+        self.skipped   = 0           # consecutive passes deferred by the budget
+        self.deferred  = 0           # total
+
+    @property
+    def age(self):
+        return time.monotonic() - self.ts if self.ts else None
+
+
+class CollectorRegistry:
+
+    def __init__(self, budget=0.2, high=85.0, degrade=4, max_skips=10, alpha=0.3):
+        self.budget    = budget      # CPU seconds per refresh pass
+        self.high      = high        # pressure() at or above this = host under load
+        self.degrade   = degrade
+        self.max_skips = max_skips   # a deferred collector runs anyway after this many passes
+        self.alpha     = alpha
+        self.pressure  = lambda: None   # () → host CPU % or None
+        self.throttle  = lambda: False  # () → True while the bot is over its own budget
+        self.collectors = {}
+        self.spent     = 0.0         # CPU seconds of the last pass
+        self.loaded    = False
+
+    def add(self, name, fn, ttl=0.0, cost=0.001, deps=(), essential=False):
+        for d in deps:
+            if d not in self.collectors:
+                raise ValueError(f"collector {name}: unknown dependency {d}")
+            if essential:   # an essential collector cannot wait on an optional one
+                self.collectors[d].essential = True
+        self.collectors[name] = Collector(name, fn, ttl, cost, deps, essential)
+
+    def get(self, name, default=None):
+        c = self.collectors.get(name)
+        return default if c is None or c.value is None else c.value
+
+    def invalidate(self, *names):
+        """Make collectors due on the next pass (all when no names)."""
+        for n in names or self.collectors:
+            self.collectors[n].ts = 0.0
+
+    def _wanted(self, names):
+        out, stack = {}, list(names)
+        while stack:
+            c = self.collectors[stack.pop()]
+            if c.name not in out:
+                out[c.name] = c
+                stack.extend(c.deps)
+        return out.values()
+
+    def _chain(self, c):
+        """Own cost plus the deps' — always larger than any dep's, so sorting keeps deps first."""
+        return max(c.cost, 1e-6) + sum(self._chain(self.collectors[d]) for d in c.deps)
+
+    def _due(self, c, now):
+        ttl = c.ttl * self.degrade if self.loaded and not c.essential else c.ttl
+        return c.value is None or now - c.ts >= ttl
+
+    async def refresh(self, names=None):
+        """Run the due collectors among `names` (all by default) and their deps."""
+        now = time.monotonic()
+        p   = self.pressure()
+        self.loaded = (p is not None and p >= self.high) or self.throttle()
+        left  = self.budget / self.degrade if self.loaded else self.budget
+        spent = 0.0
+        for c in sorted(self._wanted(names or self.collectors),
+                        key=lambda c: (not c.essential, self._chain(c))):
+            if not self._due(c, now):
+                continue
+            args = [self.collectors[d].value for d in c.deps]
+            if any(a is None for a in args):
+                continue
+            if (not c.essential and c.value is not None and spent + c.cost > left
+                    and c.skipped < self.max_skips):
+                c.skipped  += 1
+                c.deferred += 1
+                continue
+            t0 = cpu_time()
+            try:
+                v = c.fn(*args)
+                if asyncio.iscoroutine(v):
+                    v = await v
+                c.value, c.ts = v, now
+            except Exception as e:
+                c.errors += 1
+                print(f"collector {c.name}: {e}")
+            used      = cpu_time() - t0
+            c.cost    = used if not c.runs else c.cost + self.alpha * (used - c.cost)
+            c.runs   += 1
+            c.skipped = 0
+            spent    += used
+        self.spent = spent
+
+    def rows(self):
+        """[(name, Collector)] in registration order."""
+        return list(self.collectors.items())
@@ -0,0 +1,157 @@
+"""
+All-mount disk monitoring.
+The mount list comes from psutil.disk_partitions() and is kept until the
+kernel reports a change to the mount table (poll() on /proc/self/mounts
+wakes with POLLPRI on every mount/umount; elsewhere it is re-read every
+`ttl` seconds). Usage and inode counts then cost one statvfs per mount.
+Per-device read/write MB/s and IOPS are deltas of
+disk_io_counters(perdisk=True) between two sample() calls, so whoever
+calls sample() regularly (the background Sampler) sets the rate window.
+statvfs on a dead mount blocks uninterruptibly, so the bot only calls
+sample() through refresh(): in a worker thread, one at a time, serving
+the last rows while it hangs. Network filesystems are left out entirely.
+"""
+import asyncio
+import os
+import select
+import time
+
+import psutil
+
+GB       = 1024**3
+MB       = 1024**2
+SKIP_FS  = {"squashfs", "iso9660", "udf"}   # read-only images: always 100% full
+NET_FS   = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "ceph", "glusterfs", "lustre",
+            "afs", "davfs", "fuse.sshfs", "fuse.s3fs", "fuse.rclone", "fuse.glusterfs"}
+
+
+class MountWatch:
+    """True from changed() once after each mount table change (None = can't tell here)."""
+
+    def __init__(self, path="/proc/self/mounts"):
+        try:
+            self._f    = open(path)
+            self._poll = select.poll()
+            self._poll.register(self._f, select.POLLPRI | select.POLLERR)
+        except (OSError, AttributeError):   # no procfs / no poll()
+            self._f = None
+
+    def changed(self):
+        if self._f is None:
+            return None
+        return bool(self._poll.poll(0))   # the kernel re-arms on each poll
+
+
+class DiskMonitor:
+
+    def __init__(self, ignore=(), ttl=60.0):
+        self.ignore  = tuple(p.rstrip("/") for p in ignore if p.strip("/"))   # mount prefixes to leave out
+        self.ttl     = ttl
+        self.rows    = []          # latest sample(), one dict per mount
+        self.rates   = {}          # device → (read MB/s, write MB/s, read IOPS, write IOPS)
+        self.version = 0           # bumped when the mount list is re-read
+        self._watch  = MountWatch()
+        self._parts  = None        # [(mount, device, fstype, io device)]
+        self._ts     = 0.0
+        self._io     = None        # (monotonic, {device: counters})
+        self._job    = None        # sample() running in a worker thread
+        self._since  = 0.0         # when _job started
+        self._warned = False
+
+    # ── mount table ───────────────────────────────────────────────────────────
+
+    def _ignored(self, mount):
+        return any(mount == p or mount.startswith(p + "/") for p in self.ignore)
+
+    def partitions(self):
+        """Real filesystems, one mount per device, re-read only after the table changed."""
+        changed = self._watch.changed()
+        if self._parts is None or changed or (changed is None and time.monotonic() - self._ts > self.ttl):
+            seen, parts = set(), []
+            for p in sorted(psutil.disk_partitions(all=False), key=lambda p: len(p.mountpoint)):
+                if (p.fstype in SKIP_FS or p.fstype in NET_FS or p.device in seen
+                        or self._ignored(p.mountpoint)):
+                    continue
+                seen.add(p.device)   # bind mounts repeat the device: keep the shortest path
+                dev = os.path.basename(os.path.realpath(p.device)) if p.device.startswith("/dev/") else p.device
+                parts.append((p.mountpoint, p.device, p.fstype, dev))
+            self._parts   = sorted(parts)
+            self._ts      = time.monotonic()
+            self.version += 1
+        return self._parts
+
+    # ── sampling ──────────────────────────────────────────────────────────────
+
+    def _sample_io(self):
+        try:
+            cur = psutil.disk_io_counters(perdisk=True) or {}
+        except Exception:
+            return
+        now  = time.monotonic()
+        prev = self._io
+        self._io = (now, cur)
+        if prev is None or now <= prev[0]:
+            return
+        dt, old = now - prev[0], prev[1]
+        self.rates = {
+            d: (max(0, c.read_bytes  - o.read_bytes)  / dt / MB,
+                max(0, c.write_bytes - o.write_bytes) / dt / MB,
+                max(0, c.read_count  - o.read_count)  / dt,
+                max(0, c.write_count - o.write_count) / dt)
+            for d, c in cur.items() if (o := old.get(d)) is not None
+        }
+
+    def sample(self):
+        """Usage, inodes and I/O rates of every mount: [{mount, device, fstype, total, ...}]."""
+        self._sample_io()
+        rows = []
+        for mount, device, fstype, dev in self.partitions():
+            try:
+                st = os.statvfs(mount)
+            except OSError:
+                continue
+            used  = (st.f_blocks - st.f_bfree) * st.f_frsize
+            avail = st.f_bavail * st.f_frsize
+            files = st.f_files
+            iused = files - st.f_ffree
+            r_mb, w_mb, r_io, w_io = self.rates.get(dev, (0.0, 0.0, 0.0, 0.0))
+            rows.append({
+                "mount":    mount,
+                "device":   dev,
+                "fstype":   fstype,
+                "total":    st.f_blocks * st.f_frsize / GB,
+                "used":     used / GB,
+                "free":     avail / GB,
+                "percent":  round(used / (used + avail) * 100, 1) if used + avail else 0.0,
+                "inodes":   round(iused / files * 100, 1) if files else 0.0,   # btrfs & co. report 0
+                "read_mb":  r_mb,
+                "write_mb": w_mb,
+                "iops":     r_io + w_io,
+            })
+        self.rows = rows
+        return rows
+
+    async def refresh(self, timeout=5.0):
+        """sample() off the event loop; the last rows if it has not returned within `timeout`."""
+        if self._job is None or self._job.done():
+            self._job    = asyncio.ensure_future(asyncio.to_thread(self.sample))
+            self._since  = time.monotonic()
+            self._warned = False
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._job), timeout)
+        except asyncio.TimeoutError:
+            if not self._warned:   # once per stuck sample, not on every tick
+                self._warned = True
+                print(f"disks: statvfs blocked for {time.monotonic() - self._since:.1f}s, serving the last sample")
+            return self.rows
+
+
+def summary(rows):
+    """Sampler / alert values over all mounts: fullest disk and inode table, summed I/O."""
+    return {
+        "disk":   max((r["percent"] for r in rows), default=0.0),
+        "inodes": max((r["inodes"]  for r in rows), default=0.0),
+        "io_r":   sum(r["read_mb"]  for r in rows),
+        "io_w":   sum(r["write_mb"] for r in rows),
+        "iops":   sum(r["iops"]     for r in rows),
+    }
@@ -0,0 +1,228 @@
+"""
+journalctl pages and shared follow streams.
+Entries are read with `-o json` so each line carries its __CURSOR and is
+rendered like `-o short`. Older/newer pages are fetched relative to a
+cursor, so a big journal is never re-read to reach earlier output.
+search() pushes --grep/--since into journalctl and pages the same way.
+JournalFollower keeps one `journalctl -f` process per service, shared by
+every message following it, and hands new lines to a flush callback in
+batches every few seconds.
+"""
+import asyncio
+import json
+import secrets
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+
+from bot.core import proc
+
+FIELDS = "__CURSOR,__REALTIME_TIMESTAMP,_HOSTNAME,SYSLOG_IDENTIFIER,_COMM,_PID,MESSAGE"
+
+
+def command(service):
+    return ["journalctl", "-u", service, "-o", "json", "--no-pager", f"--output-fields={FIELDS}"]
+
+
+def _message(v):
+    if isinstance(v, list):   # non-UTF-8 payloads are exported as byte arrays
+        return bytes(v).decode(errors="replace")
+    return v or ""
+
+
+def parse(raw):
+    """One `-o json` line → (cursor, text in `-o short` layout), or None."""
+    try:
+        e = json.loads(raw)
+        ts = datetime.fromtimestamp(int(e.get("__REALTIME_TIMESTAMP", 0)) / 1e6)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    if not e.get("__CURSOR"):
+        return None
+    ident = e.get("SYSLOG_IDENTIFIER") or e.get("_COMM") or "?"
+    pid   = f"[{e['_PID']}]" if e.get("_PID") else ""
+    return e["__CURSOR"], f"{ts:%b %d %H:%M:%S} {e.get('_HOSTNAME', '')} {ident}{pid}: {_message(e.get('MESSAGE'))}"
+
+
+async def _read(args, n, skip, timeout, label):
+    """Stream `-o json` lines into entries; journalctl is killed after n."""
+    out = []
+
+    async def read():
+        lines = proc.stream_lines(args)
+        try:
+            async for raw in lines:
+                e = parse(raw)
+                if e and e[0] != skip:
+                    out.append(e)
+                    if len(out) >= n:
+                        break
+        finally:
+            await lines.aclose()
+
+    try:
+        await asyncio.wait_for(read(), timeout)
+    except (asyncio.TimeoutError, OSError) as e:
+        print(f"journal {label}: {e or 'timeout'}")
+    return out
+
+
+async def read_page(service, n=50, before=None, after=None, timeout=10):
+    """
+    Up to n entries, oldest first: the newest n, the n right before cursor
+    `before`, or the n right after cursor `after`. The cursor entry itself
+    is excluded. Reading stops (and journalctl is killed) after n entries.
+    """
+    args, cursor = command(service), before or after
+    if cursor:
+        args += ["--cursor", cursor, "-n", str(n + 1)] + (["--reverse"] if before else [])
+    else:
+        args += ["-n", str(n)]
+    out = await _read(args, n, cursor, timeout, service)
+    return out[::-1] if before else out
+
+
+async def search(service, pattern, n=20, cursor=None, since=None, forward=False, timeout=15):
+    """
+    Up to n entries matching `pattern` (journalctl --grep), oldest first.
+    forward=False walks back from the newest match (or from `cursor`);
+    forward=True walks on from `since` (or from `cursor`). Only matches are
+    read, so the next page costs one seek instead of a rescan.
+    """
+    args = command(service) + ["--grep", pattern]
+    if cursor:
+        args += ["--cursor", cursor]
+    elif since:
+        args += ["--since", since]
+    if not forward:
+        args.append("--reverse")
+    out = await _read(args, n, cursor, timeout, f"{service} grep")
+    return out if forward else out[::-1]
+
+
+def fit(entries, budget=3800, keep="tail"):
+    """The longest run of entries whose text fits in `budget` chars — newest ("tail") or oldest ("head")."""
+    seq  = reversed(entries) if keep == "tail" else iter(entries)
+    out, used = [], 0
+    for e in seq:
+        used += len(e[1]) + 1
+        if used > budget and out:
+            break
+        out.append(e)
+    return out[::-1] if keep == "tail" else out
+
+
+class Cursors:
+    """Short tokens for journal cursors — callback_data is capped at 64 bytes."""
+
+    def __init__(self, size=1000):
+        self._map = OrderedDict()
+        self.size = size
+
+    def put(self, service, cursor):
+        tok = secrets.token_urlsafe(6)
+        self._map[tok] = (service, cursor)
+        while len(self._map) > self.size:
+            self._map.popitem(last=False)
+        return tok
+
+    def get(self, tok):
+        return self._map.get(tok)
+
+
+class _Stream:
+    __slots__ = ("service", "tail", "subs", "task", "dirty")
+
+    def __init__(self, service, keep):
+        self.service = service
+        self.tail    = deque(maxlen=keep)
+        self.subs    = {}     # (chat_id, message_id) → expiry (monotonic)
+        self.task    = None
+        self.dirty   = False
+
+
+class JournalFollower:
+
+    def __init__(self, flush, interval=3.0, ttl=600, keep=200):
+        self.flush    = flush      # async flush(service, entries, targets, live)
+        self.interval = interval
+        self.ttl      = ttl
+        self.keep     = keep
+        self.cursors  = Cursors()
+        self._streams = {}
+        self._task    = None
+
+    def __len__(self):
+        return len(self._streams)
+
+    def following(self, chat_id, message_id):
+        return any((chat_id, message_id) in st.subs for st in self._streams.values())
+
+    def subscribe(self, service, chat_id, message_id, seed=()):
+        """Follow `service` in this message; `seed` is the page it already shows."""
+        st = self._streams.get(service)
+        if st is None:
+            st = self._streams[service] = _Stream(service, self.keep)
+            st.tail.extend(seed)
+            st.task = asyncio.get_running_loop().create_task(
+                self._follow(st, seed[-1][0] if seed else None))
+        st.subs[(chat_id, message_id)] = time.monotonic() + self.ttl
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return st
+
+    def unsubscribe(self, chat_id, message_id):
+        for st in list(self._streams.values()):
+            if st.subs.pop((chat_id, message_id), None) is not None and not st.subs:
+                self._close(st)
+
+    async def release(self, chat_id, message_id):
+        """Stop following in one message, rendering it a last time as a static page."""
+        for st in list(self._streams.values()):
+            if (chat_id, message_id) in st.subs:
+                await self._emit(st, [(chat_id, message_id)], False)
+        self.unsubscribe(chat_id, message_id)
+
+    def _close(self, st):
+        st.task.cancel()
+        self._streams.pop(st.service, None)
+
+    async def stop(self):
+        tasks = [st.task for st in self._streams.values()] + ([self._task] if self._task else [])
+        for st in list(self._streams.values()):
+            self._close(st)
+        if self._task:
+            self._task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)   # let journalctl be killed
+
+    async def _follow(self, st, cursor):
+        args = command(st.service) + ["-f"] + (["--after-cursor", cursor] if cursor else ["-n", "0"])
+        async for raw in proc.stream_lines(args):
+            e = parse(raw)
+            if e:
+                st.tail.append(e)
+                st.dirty = True
+
+    async def _emit(self, st, targets, live):
+        try:
+            await self.flush(st.service, list(st.tail), targets, live)
+        except Exception as e:
+            print(f"journal flush {st.service}: {e}")
+
+    async def _run(self):
+        while self._streams:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            for st in list(self._streams.values()):
+                ended = st.task.done()
+                gone  = [k for k, exp in st.subs.items() if ended or exp < now]
+                live  = [k for k in st.subs if k not in gone]
+                if st.dirty and live:
+                    st.dirty = False
+                    await self._emit(st, live, True)
+                if gone:
+                    await self._emit(st, gone, False)
+                    for k in gone:
+                        st.subs.pop(k, None)
+                if not st.subs and self._streams.get(st.service) is st:
+                    self._close(st)
@@ -0,0 +1,75 @@
+"""
+Incremental top-N process tracker.
+psutil.Process objects are kept between samples so cpu_percent() is a cheap
+delta against the previous sample. Each sample only constructs objects for
+new pids and drops vanished ones; names are read once per process.
+sample() reads /proc for every process, so the Sampler runs it in a worker
+thread; it fills a copy of the table and swaps it in, so top() on the
+event loop never sees a dict changing size under it.
+"""
+import heapq
+import time
+
+import psutil
+
+
+class _Entry:
+    __slots__ = ("proc", "name", "cpu", "rss")
+
+    def __init__(self, proc):
+        self.proc = proc
+        self.name = None
+        self.cpu  = 0.0
+        self.rss  = 0
+
+
+class ProcessTracker:
+
+    def __init__(self):
+        self._procs = {}     # pid → _Entry
+        self.ts     = 0.0    # time of the last sample
+        self.added  = self.removed = 0
+
+    def sample(self):
+        pids  = set(psutil.pids())
+        procs = dict(self._procs)
+        known = procs.keys()
+        gone  = known - pids
+        new   = pids - known
+        for pid in gone:
+            del procs[pid]
+        for pid in new:
+            try:
+                e = _Entry(psutil.Process(pid))
+                e.proc.cpu_percent(None)   # prime: first call has no delta yet
+                procs[pid] = e
+            except psutil.Error:
+                pass
+        dead = []
+        for pid, e in procs.items():
+            try:
+                with e.proc.oneshot():
+                    if pid in new:
+                        e.name = e.proc.name()
+                    else:
+                        e.cpu = e.proc.cpu_percent(None)
+                    e.rss = e.proc.memory_info().rss
+            except psutil.NoSuchProcess:
+                dead.append(pid)
+            except psutil.Error:
+                pass
+        for pid in dead:
+            procs.pop(pid, None)
+        self._procs = procs
+        self.added, self.removed = len(new), len(gone) + len(dead)
+        self.ts = time.time()
+
+    def top(self, n=10, by="cpu"):
+        """[{pid, name, cpu, rss_mb}, ...] sorted by cpu or rss."""
+        key  = (lambda kv: kv[1].cpu) if by == "cpu" else (lambda kv: kv[1].rss)
+        rows = heapq.nlargest(n, self._procs.items(), key=key)
+        return [{"pid": pid, "name": e.name or "?", "cpu": e.cpu, "rss_mb": e.rss / 1024**2}
+                for pid, e in rows]
+
+    def __len__(self):
+        return len(self._procs)
@@ -0,0 +1,128 @@
+"""
+Prometheus text-format endpoint (asyncio, no deps).
+Scrapes are served from the latest cached MetricsSnapshot (the one the
+status push already collected); nothing here calls psutil or systemctl,
+so scrape frequency cannot add host load. The rendered body is cached per
+snapshot timestamp.
+"""
+import asyncio
+import time
+
+import psutil
+
+from bot.fleet import protocol
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+GB, MB       = 1024**3, 1024**2
+
+
+def _esc(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**kw):
+    return "{" + ",".join(f'{k}="{_esc(v)}"' for k, v in kw.items()) + "}" if kw else ""
+
+
+def exposition(snap, boot_time):
+    out = []
+
+    def metric(name, kind, help_, samples):
+        out.append(f"# HELP {name} {help_}")
+        out.append(f"# TYPE {name} {kind}")
+        for labels, v in samples:
+            out.append(f"{name}{_labels(**labels)} {float(v)!r}")
+
+    metric("tgca_cpu_percent", "gauge", "Host CPU utilisation.", [({}, snap.cpu)])
+    metric("tgca_memory_bytes", "gauge", "Host memory.",
+           [({"kind": "total"}, snap.mem["total"] * GB), ({"kind": "used"}, snap.mem["used"] * GB)])
+    metric("tgca_memory_percent", "gauge", "Host memory utilisation.", [({}, snap.mem["percent"])])
+    disks = snap.disks or [dict(snap.disk, mount=snap.disk.get("mount", "/"))]
+    metric("tgca_disk_bytes", "gauge", "Filesystem usage per mount.",
+           [({"mount": d["mount"], "kind": k}, d[k] * GB) for d in disks for k in ("total", "used", "free")])
+    metric("tgca_disk_percent", "gauge", "Filesystem utilisation per mount.",
+           [({"mount": d["mount"]}, d["percent"]) for d in disks])
+    if snap.disks:
+        metric("tgca_disk_inodes_percent", "gauge", "Inode utilisation per mount.",
+               [({"mount": d["mount"]}, d["inodes"]) for d in disks])
+        metric("tgca_disk_io_bytes_per_second", "gauge", "Device throughput, averaged over the sampler interval.",
+               [({"device": d["device"], "direction": k}, d[f"{k}_mb"] * MB) for d in disks for k in ("read", "write")])
+        metric("tgca_disk_iops", "gauge", "Device read+write operations per second.",
+               [({"device": d["device"]}, d["iops"]) for d in disks])
+    metric("tgca_network_bytes_total", "counter", "Bytes through all interfaces since boot.",
+           [({"direction": "recv"}, snap.net["recv"] * MB), ({"direction": "sent"}, snap.net["sent"] * MB)])
+    try:
+        load = [float(x) for x in snap.load.split()]
+        metric("tgca_load", "gauge", "Load average.",
+               [({"period": p}, v) for p, v in zip(("1m", "5m", "15m"), load)])
+    except (AttributeError, ValueError):
+        pass
+    if boot_time:
+        metric("tgca_boot_time_seconds", "gauge", "Host boot time (unix).", [({}, boot_time)])
+    if snap.services is not None:
+        metric("tgca_service_running", "gauge", "Running systemd services.",
+               [({"service": s["name"]}, 1) for s in snap.services])
+    if snap.ports is not None:
+        metric("tgca_port_listening", "gauge", "Listening TCP ports.",
+               [({"port": p["port"], "address": p["address"], "process": p["process"]}, 1) for p in snap.ports])
+    metric("tgca_snapshot_timestamp_seconds", "gauge", "When the served snapshot was collected.",
+           [({}, snap.ts)])
+    return "\n".join(out) + "\n"
+
+
+class MetricsServer:
+
+    def __init__(self, listen, source):
+        self.listen  = listen
+        self.source  = source    # () → latest MetricsSnapshot or None
+        self.scrapes = 0
+        self._server = None
+        self._cache  = (None, b"")
+        try:
+            self._boot = psutil.boot_time()   # constant; read once
+        except Exception:
+            self._boot = None
+
+    async def start(self):
+        self._server = await protocol.start_server(self.listen, self._handle)
+        print(f"metrics: serving /metrics on {self.listen}")
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def body(self):
+        snap = self.source()
+        if snap is None:
+            return None
+        ts, data = self._cache
+        if ts != snap.ts:
+            data = exposition(snap, self._boot).encode()
+            self._cache = (snap.ts, data)
+        age = (f"# HELP tgca_snapshot_age_seconds Age of the served snapshot.\n"
+               f"# TYPE tgca_snapshot_age_seconds gauge\n"
+               f"tgca_snapshot_age_seconds {time.time() - snap.ts:.3f}\n")
+        return data + age.encode()
+
+    async def _handle(self, reader, writer):
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+            parts = head.split(b" ", 2)
+            path  = parts[1].split(b"?")[0] if len(parts) > 2 else b""
+            if parts[0] != b"GET" or path not in (b"/metrics", b"/"):
+                status, ctype, data = "404 Not Found", "text/plain", b"not found\n"
+            else:
+                data = self.body()
+                if data is None:
+                    status, ctype, data = "503 Service Unavailable", "text/plain", b"no snapshot yet\n"
+                else:
+                    status, ctype = "200 OK", CONTENT_TYPE
+                    self.scrapes += 1
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {ctype}\r\n"
+                         f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
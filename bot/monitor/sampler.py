@@ -0,0 +1,230 @@
+"""
+Background high-resolution sampler.
+Records CPU, RAM, disk (fullest mount, inodes, I/O) and network every
+SAMPLE_INTERVAL seconds into fixed-size ring buffers so spikes between
+status pushes are not lost.
+Memory is bounded: one array('d') slot per metric per sample of retention.
+Every `process_interval` seconds it also refreshes the top-N ProcessTracker
+in a worker thread (a full /proc walk), at most one refresh in flight.
+Each sample is also passed to `listeners` (e.g. the alert engine).
+"""
+import asyncio
+import time
+from array import array
+
+import psutil
+
+from bot.monitor.disks import DiskMonitor, summary
+from bot.monitor.processes import ProcessTracker
+
+METRICS = {
+    "cpu":    "CPU %",
+    "ram":    "RAM %",
+    "disk":   "Disk % (fullest mount)",
+    "inodes": "Inodes % (fullest mount)",
+    "io_r":   "Disk read MB/s",
+    "io_w":   "Disk write MB/s",
+    "iops":   "Disk IOPS",
+    "rx":     "Net ↓ MB/s",
+    "tx":     "Net ↑ MB/s",
+}
+
+
+class RingBuffer:
+    """Fixed-capacity float ring backed by array('d')."""
+    __slots__ = ("_buf", "_cap", "_head", "_len")
+
+    def __init__(self, capacity):
+        self._buf  = array("d", bytes(8 * capacity))
+        self._cap  = capacity
+        self._head = 0   # next write position
+        self._len  = 0
+
+    def __len__(self):
+        return self._len
+
+    def append(self, v):
+        self._buf[self._head] = v
+        self._head = (self._head + 1) % self._cap
+        if self._len < self._cap:
+            self._len += 1
+
+    def __getitem__(self, i):
+        """Logical index: 0 = oldest, len-1 = newest."""
+        if not 0 <= i < self._len:
+            raise IndexError(i)
+        return self._buf[(self._head - self._len + i) % self._cap]
+
+    def last(self, n):
+        """The newest n values, oldest first."""
+        n = min(n, self._len)
+        if n <= 0:
+            return []
+        start = (self._head - n) % self._cap
+        if start + n <= self._cap:
+            return self._buf[start:start + n].tolist()
+        return self._buf[start:].tolist() + self._buf[:self._head].tolist()
+
+
+def _log_error(fut):
+    if not fut.cancelled() and fut.exception():
+        print(f"sampler: processes: {fut.exception()}")
+
+
+def percentile(sorted_vals, p):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * p / 100
+    f = int(k)
+    c = min(f + 1, len(sorted_vals) - 1)
+    return sorted_vals[f] + (sorted_vals[c] - sorted_vals[f]) * (k - f)
+
+
+class Sampler:
+
+    def __init__(self, interval=1.0, retention=6 * 3600, disk_path="/", process_interval=5.0, disk_ignore=()):
+        cap                   = max(2, int(retention / interval))
+        self.interval         = interval
+        self.retention        = retention
+        self.disk_path        = disk_path
+        self.processes        = ProcessTracker()
+        self.disks            = DiskMonitor(disk_ignore)   # per-mount rows, read by the disks collector
+        self.process_interval = process_interval
+        self._ts              = RingBuffer(cap)
+        self._series          = {m: RingBuffer(cap) for m in METRICS}
+        self._net_prev        = None
+        self._task            = None
+        self._proc_job        = None   # ProcessTracker.sample() running in a thread
+        self.listeners        = []   # fn(ts, values) called on every sample
+
+    # ── lifecycle ─────────────────────────────────────────────────────────────
+
+    def start(self):
+        if self._task is None:
+            psutil.cpu_percent(interval=None)   # prime the delta
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        nxt  = loop.time()
+        while True:
+            try:
+                await self.disks.refresh(self.interval / 2)
+                self.sample()
+            except Exception as e:
+                print(f"sampler: {e}")
+            self._sample_processes()
+            nxt += self.interval
+            delay = nxt - loop.time()
+            if delay < 0:   # fell behind (suspended loop) — don't burst to catch up
+                nxt, delay = loop.time(), 0
+            await asyncio.sleep(delay)
+
+    # ── sampling ──────────────────────────────────────────────────────────────
+
+    def sample(self):
+        now = time.time()
+        n   = psutil.net_io_counters()
+        rx = tx = 0.0
+        if self._net_prev:
+            pt, pr, ps = self._net_prev
+            dt = now - pt
+            if dt > 0:
+                rx = max(0, n.bytes_recv - pr) / dt / 1024**2
+                tx = max(0, n.bytes_sent - ps) / dt / 1024**2
+        self._net_prev = (now, n.bytes_recv, n.bytes_sent)
+        rows = self.disks.rows   # refreshed off the loop by _run()
+        self.record(now, {
+            "cpu":  psutil.cpu_percent(interval=None),
+            "ram":  psutil.virtual_memory().percent,
+            "rx":   rx,
+            "tx":   tx,
+            **summary(rows),
+            **({} if rows else {"disk": psutil.disk_usage(self.disk_path).percent}),
+        })
+
+    def _sample_processes(self):
+        if not self.process_interval or (self._proc_job and not self._proc_job.done()):
+            return
+        if time.time() - self.processes.ts >= self.process_interval:
+            self._proc_job = asyncio.ensure_future(asyncio.to_thread(self.processes.sample))
+            self._proc_job.add_done_callback(_log_error)
+
+    def record(self, ts, values):
+        self._ts.append(ts)
+        for m, buf in self._series.items():
+            buf.append(values.get(m, 0.0))
+        for fn in self.listeners:
+            fn(ts, values)
+
+    # ── queries ───────────────────────────────────────────────────────────────
+
+    def latest(self, metric):
+        buf = self._series[metric]
+        return buf[len(buf) - 1] if len(buf) else None
+
+    def _count_since(self, t0):
+        """Number of newest samples with ts >= t0 (binary search over the ring)."""
+        lo, hi = 0, len(self._ts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._ts[mid] < t0: lo = mid + 1
+            else:                  hi = mid
+        return len(self._ts) - lo
+
+    def window(self, metric, seconds, now=None):
+        now = time.time() if now is None else now
+        return self._series[metric].last(self._count_since(now - seconds))
+
+    def stats(self, metric, seconds, now=None):
+        vals = self.window(metric, seconds, now)
+        if not vals:
+            return None
+        srt = sorted(vals)
+        return {
+            "n":   len(srt),
+            "min": srt[0],
+            "avg": sum(srt) / len(srt),
+            "p50": percentile(srt, 50),
+            "p95": percentile(srt, 95),
+            "p99": percentile(srt, 99),
+            "max": srt[-1],
+        }
+
+
+def parse_window(text):
+    """'90s' / '15m' / '6h' / '1d' / '1h30m' → seconds, or None."""
+    units, total, num = {"s": 1, "m": 60, "h": 3600, "d": 86400}, 0, ""
+    for ch in text.strip().lower():
+        if ch.isdigit():
+            num += ch
+        elif ch in units and num:
+            total, num = total + int(num) * units[ch], ""
+        else:
+            return None
+    if num:
+        total += int(num) * 60   # bare number = minutes
+    return total or None
+
+
+def format_window(seconds):
+    """3600 → '1h', 5400 → '1h30m', 45 → '45s'."""
+    out, rest = "", int(seconds)
+    for unit, n in (("d", 86400), ("h", 3600), ("m", 60), ("s", 1)):
+        if rest >= n:
+            out, rest = out + f"{rest // n}{unit}", rest % n
+    return out or "0s"
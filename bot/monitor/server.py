@@ -1,3 +1,8 @@
+"""
+Legacy synchronous monitor, kept as the baseline for bench/run.py.
+The bot uses bot.monitor.server_optimized.ServerMonitor (collector registry,
+async systemctl, /proc port scanner); nothing under bot/ imports this module.
+"""
 import psutil
 import subprocess
 import time
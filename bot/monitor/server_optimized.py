@@ -1,12 +1,20 @@
 """
 Оптимизированный ServerMonitor с ограничением использования ресурсов.
-Кеширует результаты, минимизирует системные вызовы, ограничивает нагрузку на CPU/RAM до 5-10%
+Кеширует результаты, минимизирует системные вызовы; бюджет CPU/RAM бота
+соблюдает Governor (bot.core.governor) — при превышении дорогие сборщики реже
 """
+import asyncio
 import psutil
-import subprocess
 import time
 from datetime import datetime, timedelta
-from functools import lru_cache
+
+from bot.core import proc
+from bot.monitor.collectors import CollectorRegistry
+from bot.monitor.disks import DiskMonitor
+from bot.monitor.ports import PortScanner
+from bot.monitor.processes import ProcessTracker
+from bot.monitor.services import ServiceInventory
+from bot.monitor.snapshot import MetricsSnapshot
 
 
 class ServerMonitor:
@@ -14,8 +22,10 @@ class ServerMonitor:
     Оптимизированный монитор сервера:
     - Кеширует CPU usage на 2+ секунды (не пересчитывает постоянно)
     - Батчит системные вызовы
-    - Использует non-blocking подход для systemctl и journalctl
+    - Запускает systemctl, journalctl и ping через асинхронный bot.core.proc
     - Ограничивает глубину сканирования портов и процессов
+    - Собирает метрики через CollectorRegistry: у каждого источника свой TTL,
+      оценка стоимости и бюджет CPU на проход
     """
     
     # Кеш для CPU с таймстампом
@@ -23,8 +33,51 @@ class ServerMonitor:
     _cpu_tick = 0.0
     _cache_ttl = 2.5  # Время жизни кеша в секундах
 
+    TOP_MAX = 25   # топ собирается один раз с запасом, collect() отдаёт срез
+
+    def __init__(self, sampler=None, services_ttl=60, budget=0.2, high_load=85, governor=None):
+        # Фоновый Sampler (bot.monitor.sampler) — если запущен, CPU берётся из него
+        self.sampler  = sampler
+        # Кеш systemd-юнитов; сбрасывается SystemController после действий над сервисами
+        self.services = ServiceInventory(self._list_services, services_ttl)
+        self.ports    = PortScanner()
+        # Топ процессов: сэмплер обновляет его в фоне, без сэмплера — по запросу
+        self.processes = sampler.processes if sampler is not None else ProcessTracker()
+        # Все точки монтирования: сэмплер снимает их каждую секунду (вместе с I/O)
+        self.disks     = sampler.disks if sampler is not None else DiskMonitor()
+        # Источники метрик: (имя, функция, TTL сек, стартовая оценка CPU сек, обязательный)
+        # load в ядре пересчитывается раз в 5 сек, uptime нужен с точностью до минуты
+        reg = self.registry = CollectorRegistry(budget, high_load)
+        reg.add("cpu",      self.get_cpu_usage,      0,  0.0001, essential=True)
+        reg.add("mem",      self.get_memory_usage,   0,  0.0001, essential=True)
+        reg.add("disks",    self.get_disks,          5,  0.0005)
+        reg.add("disk",     self.get_disk_usage,     5,  0.0001, deps=("disks",), essential=True)
+        reg.add("net",      self.get_network_stats,  0,  0.0001, essential=True)
+        reg.add("load",     self.get_load_average,   5,  0.0001, essential=True)
+        reg.add("uptime",   self.get_uptime,         60, 0.0001, essential=True)
+        reg.add("services", self.get_running_services, 0, 0.005)   # у ServiceInventory свой TTL
+        # обход /proc/*/fd (при смене набора сокетов) — в потоке, не на event loop
+        reg.add("ports",    lambda: asyncio.to_thread(self.get_open_ports), 30, 0.02)
+        reg.add("top",      lambda: self.get_top_processes(self.TOP_MAX), 5, 0.02)
+        # нагрузка хоста — по последнему CPU; при высокой дорогие сборщики реже
+        reg.pressure = lambda: reg.get("cpu")
+        # то же, когда сам бот вышел за свой бюджет CPU/RSS
+        self.governor = governor
+        if governor is not None:
+            reg.throttle = lambda: governor.over
+        self._self = None
+
+    def invalidate(self):
+        """После действий над сервисами/портами: перечитать их на следующем тике"""
+        self.services.invalidate()
+        self.registry.invalidate("services", "ports")
+
     def get_cpu_usage(self):
-        """Получить CPU с кешированием (обновляется максимум каждые 2.5 сек)"""
+        """Получить CPU: из фонового сэмплера, иначе с кешированием на 2.5 сек"""
+        if self.sampler is not None and self.sampler.running:
+            v = self.sampler.latest("cpu")
+            if v is not None:
+                return v
         now = time.monotonic()
         if now - self._cpu_tick > self._cache_ttl:
             # interval=0 — быстрый non-blocking вызов без ожидания
@@ -41,16 +94,29 @@ class ServerMonitor:
             "percent": m.percent
         }
 
-    def get_disk_usage(self, path="/"):
-        """Получить использование диска (кешированный результат)"""
+    def get_disk_usage(self, disks=None, path="/"):
+        """
+        Диск для строки DISK: самая заполненная точка монтирования — тот же
+        источник, что у метрики disk в алертах и истории; без списка — `path`
+        """
+        if disks:
+            d = max(disks, key=lambda r: r["percent"])
+            return {k: d[k] for k in ("total", "used", "free", "percent", "mount")}
         d = psutil.disk_usage(path)
         return {
             "total": d.total / 1024**3,
             "used": d.used / 1024**3,
             "free": d.free / 1024**3,
-            "percent": d.percent
+            "percent": d.percent,
+            "mount": path
         }
 
+    async def get_disks(self):
+        """Все точки монтирования: занятость, иноды, MB/s и IOPS устройства"""
+        if self.sampler is not None and self.sampler.running:
+            return self.disks.rows
+        return await self.disks.refresh()   # statvfs — в потоке; без сэмплера скорость I/O — между вызовами
+
     def get_network_stats(self):
         """Получить сетевую статистику (очень лёгкий вызов)"""
         n = psutil.net_io_counters()
@@ -82,40 +148,45 @@ class ServerMonitor:
         except Exception:
             return "N/A"
 
-    def get_running_services(self, timeout=8):
+    async def get_running_services(self):
         """
-        Получить список запущенных сервисов (оптимизировано).
-        timeout снижен с 10 до 8 секунд.
+        Список запущенных сервисов из кеша ServiceInventory.
+        По истечении TTL отдаются старые данные, а systemctl обновляет кеш в фоне
         """
-        try:
-            r = subprocess.run(
-                ["systemctl", "list-units", "--type=service", "--state=running",
-                 "--no-pager", "--no-legend", "--plain"],
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
-            services = []
-            for line in r.stdout.strip().splitlines():
-                if not line.strip():
-                    continue
-                parts = line.split()
-                if parts:
-                    services.append({
-                        "name": parts[0].replace(".service", ""),
-                        "status": "running"
-                    })
-            return services
-        except subprocess.TimeoutExpired:
-            return []  # Если зависает — вернём пусто, не всё сломается
-        except Exception:
-            return []
+        return await self.services.get()
+
+    async def _list_services(self, timeout=8):
+        """Прямой вызов systemctl list-units (асинхронно). Бросает исключение при ошибке"""
+        r = await proc.run(
+            ["systemctl", "list-units", "--type=service", "--state=running",
+             "--no-pager", "--no-legend", "--plain"],
+            timeout=timeout, low=True
+        )
+        if r.timed_out:
+            raise TimeoutError("systemctl list-units timeout")
+        services = []
+        for line in r.stdout.strip().splitlines():
+            if not line.strip():
+                continue
+            parts = line.split()
+            if parts:
+                services.append({
+                    "name": parts[0].replace(".service", ""),
+                    "status": "running"
+                })
+        return services
 
     def get_open_ports(self, max_ports=100):
         """
         Получить открытые порты (оптимизировано).
-        max_ports ограничивает результаты, чтобы не кушать память.
+        На Linux читаются только LISTEN-строки /proc/net/tcp{,6} (PortScanner),
+        без обхода всех соединений. max_ports ограничивает результаты.
         """
+        if self.ports.available:
+            try:
+                return self.ports.scan(max_ports)
+            except Exception:
+                pass
         try:
             seen, ports = set(), []
             for c in psutil.net_connections(kind="inet"):
@@ -138,18 +209,18 @@ class ServerMonitor:
         except Exception:
             return []
 
-    def ping_host(self, host, count=4, timeout=10):
+    async def ping_host(self, host, count=4, timeout=10):
         """
-        Пинг хоста (оптимизировано).
+        Пинг хоста (асинхронно).
         timeout снижен с 20 до 10 для быстрого отклика.
         """
         try:
-            r = subprocess.run(
+            r = await proc.run(
                 ["ping", "-c", str(count), "-W", "2", host],
-                capture_output=True,
-                text=True,
                 timeout=timeout
             )
+            if r.timed_out:
+                return {"host": host, "success": False, "error": "Timeout"}
             if r.returncode != 0:
                 return {"host": host, "success": False, "error": "Host unreachable"}
             
@@ -165,40 +236,73 @@ class ServerMonitor:
                             "max": float(parts[2])
                         }
             return {"host": host, "success": True}
-        except subprocess.TimeoutExpired:
-            return {"host": host, "success": False, "error": "Timeout"}
         except Exception as e:
             return {"host": host, "success": False, "error": str(e)[:50]}
 
-    def get_logs(self, service, lines=50, timeout=10):
+    async def get_logs(self, service, lines=50, timeout=10, limit=64 * 1024):
         """
-        Получить логи сервиса (оптимизировано).
-        timeout снижен с 15 до 10 для быстрого отклика.
+        Получить логи сервиса (асинхронно).
+        Вывод ограничен `limit` байтами с конца — старые строки отбрасываются.
         """
         try:
-            r = subprocess.run(
+            r = await proc.run(
                 ["journalctl", "-u", service, "-n", str(lines), "--no-pager"],
-                capture_output=True,
-                text=True,
-                timeout=timeout
+                timeout=timeout, limit=limit, keep="tail", low=True
             )
+            if r.timed_out:
+                return f"Logs timeout for {service}"
             return r.stdout.strip() or f"No logs for {service}"
-        except subprocess.TimeoutExpired:
-            return f"Logs timeout for {service}"
         except Exception as e:
             return f"Error: {str(e)[:100]}"
 
-    @staticmethod
-    def estimate_resource_usage():
+    def get_top_processes(self, n=10, by="cpu"):
+        """Топ-N процессов по CPU или RSS (из фонового ProcessTracker)"""
+        if self.sampler is None or not self.sampler.running:
+            if time.time() - self.processes.ts > 5:
+                self.processes.sample()
+        return self.processes.top(n, by)
+
+    async def collect(self, services=True, ports=True, top=0):
+        """
+        Снять все метрики за один проход.
+        Результат передаётся в MetricStore, format_status и алерты,
+        поэтому psutil и systemctl вызываются не чаще TTL своих сборщиков.
+        Сборщик, не уложившийся в бюджет, отдаёт последнее значение.
         """
-        Возвращает примерное использование ресурсов ботом.
-        Обычно это 2-5% CPU и 30-50MB RAM в idle режиме.
+        reg   = self.registry
+        names = ["cpu", "mem", "disk", "disks", "net", "load", "uptime"]
+        names += ["services"] * services + ["ports"] * ports + ["top"] * bool(top)
+        await reg.refresh(names)
+        return MetricsSnapshot(
+            ts=time.time(),
+            cpu=max(0.0, reg.get("cpu", 0.0)),
+            mem=reg.get("mem"),
+            disk=reg.get("disk"),
+            net=reg.get("net"),
+            load=reg.get("load", "N/A"),
+            uptime=reg.get("uptime", "N/A"),
+            services=reg.get("services") if services else None,
+            ports=reg.get("ports") if ports else None,
+            top=reg.get("top", [])[:top] if top else None,
+            disks=reg.get("disks"),
+        )
+
+    def estimate_resource_usage(self):
         """
+        Использование ресурсов ботом без блокировки.
+        С Governor — CPU (% одного ядра, среднее за минуту) и RSS вместе с
+        дочерними systemctl/journalctl; без него — только сам процесс, CPU
+        с момента прошлого вызова.
+        """
+        g = self.governor
+        if g is not None and g.samples:
+            return {"cpu_percent": g.cpu, "memory_mb": g.rss}
         try:
-            proc = psutil.Process()
+            if self._self is None:
+                self._self = psutil.Process()
             return {
-                "cpu_percent": proc.cpu_percent(interval=0.1),
-                "memory_mb": proc.memory_info().rss / 1024 / 1024,
+                "cpu_percent": self._self.cpu_percent(interval=None),
+                "memory_mb": self._self.memory_info().rss / 1024 / 1024,
             }
-        except:
+        except Exception:
             return {"cpu_percent": 0, "memory_mb": 0}
@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+
+class ServiceInventory:
+    """
+    TTL cache for the systemd unit list.
+    Stale data is served while a single background refresh runs; invalidate()
+    is called after actions that change units (start/stop/restart, SSH toggles).
+    A fetch that was already running when invalidate() came in may hold the
+    pre-action list: `_gen` tells, and such a result is followed by a fresh fetch.
+    `version` increments whenever the list actually changes.
+    """
+
+    def __init__(self, fetch, ttl=60):
+        self._fetch   = fetch        # async () -> list[dict]; raises on failure
+        self.ttl      = ttl
+        self.version  = 0
+        self._gen     = 0            # bumped by invalidate()
+        self._data    = None
+        self._ts      = 0.0
+        self._task    = None
+
+    @property
+    def stale(self):
+        return time.monotonic() - self._ts > self.ttl
+
+    async def get(self):
+        if self._data is None:
+            await self.refresh()
+        elif self.stale:
+            self._kick()
+        return self._data if self._data is not None else []
+
+    def invalidate(self):
+        self._ts   = 0.0
+        self._gen += 1
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._kick()
+
+    def _kick(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._refresh())
+
+    async def refresh(self):
+        """Refresh now (joins a refresh already in flight)."""
+        self._kick()
+        await asyncio.shield(self._task)
+
+    async def _refresh(self):
+        while True:
+            gen = self._gen
+            try:
+                data = await self._fetch()
+            except Exception as e:
+                print(f"services refresh: {e}")
+                return
+            if data != self._data:
+                self._data    = data
+                self.version += 1
+            if gen == self._gen:
+                self._ts = time.monotonic()
+                return
+            # invalidated mid-fetch: keep the list for now (stale), fetch again
@@ -0,0 +1,37 @@
+import time
+
+
+class MetricsSnapshot:
+    """
+    One collection of host metrics taken at `ts`.
+    Built once per tick by ServerMonitor.collect() and shared by stats
+    recording, alerts and every rendered view.
+    `disk` is the fullest mount (with its `mount`), `disks` every mount
+    (see bot/monitor/disks.py).
+    `services` / `ports` / `top` / `disks` are None when they were not collected.
+    """
+    __slots__ = ("ts", "cpu", "mem", "disk", "net", "load", "uptime", "services", "ports", "top", "disks")
+
+    def __init__(self, ts, cpu, mem, disk, net, load, uptime, services=None, ports=None, top=None, disks=None):
+        self.ts       = ts
+        self.cpu      = cpu
+        self.mem      = mem
+        self.disk     = disk
+        self.net      = net
+        self.load     = load
+        self.uptime   = uptime
+        self.services = services
+        self.ports    = ports
+        self.top      = top
+        self.disks    = disks
+
+    @property
+    def age(self):
+        return time.time() - self.ts
+
+    def as_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**{k: d.get(k) for k in cls.__slots__})
@@ -0,0 +1,175 @@
+"""
+Tiered on-disk time-series store (SQLite, WAL mode).
+Every record() writes the raw point and rolls it up into 1-minute and
+1-hour buckets in the same transaction; prune() applies per-tier retention.
+Reports and charts read the smallest tier that covers the requested range.
+"""
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from bot.monitor.disks import summary
+
+RAW, MINUTE, HOUR = 0, 60, 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS points (
+    res    INTEGER NOT NULL,
+    metric TEXT    NOT NULL,
+    ts     INTEGER NOT NULL,
+    min    REAL, max REAL, sum REAL, cnt INTEGER, last REAL,
+    PRIMARY KEY (res, metric, ts)
+) WITHOUT ROWID;
+"""
+
+_UPSERT = """
+INSERT INTO points (res, metric, ts, min, max, sum, cnt, last)
+VALUES (?, ?, ?, ?, ?, ?, 1, ?)
+ON CONFLICT (res, metric, ts) DO UPDATE SET
+    min  = min(points.min, excluded.min),
+    max  = max(points.max, excluded.max),
+    sum  = points.sum + excluded.sum,
+    cnt  = points.cnt + 1,
+    last = excluded.last
+"""
+
+
+class MetricStore:
+
+    def __init__(self, path="metrics.db", raw_hours=48, minute_days=14, hour_days=365):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.retention = {RAW: raw_hours * 3600, MINUTE: minute_days * 86400, HOUR: hour_days * 86400}
+        self.version   = 0        # bumped on every write; used as a cache key by readers
+        self._net_prev = None
+        self._pruned   = 0.0
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    # ── writes ────────────────────────────────────────────────────────────────
+
+    def record(self, snap):
+        """
+        Store one MetricsSnapshot. Network is kept as per-tick MB deltas (reboot-safe).
+        With per-mount data "disk" is the fullest mount and each mount is also
+        kept as "disk:<mount>"; I/O rates are stored as they were sampled.
+        """
+        values = {"cpu": snap.cpu, "ram": snap.mem["percent"], "disk": snap.disk["percent"]}
+        if snap.disks:
+            values.update(summary(snap.disks))
+            values.update((f"disk:{d['mount']}", d["percent"]) for d in snap.disks)
+        recv, sent = snap.net["recv"], snap.net["sent"]
+        if self._net_prev:
+            values["rx"] = max(0.0, recv - self._net_prev[0])
+            values["tx"] = max(0.0, sent - self._net_prev[1])
+        self._net_prev = (recv, sent)
+        self.write(snap.ts, values)
+
+    def write(self, ts, values):
+        ts   = int(ts)
+        rows = []
+        for m, v in values.items():
+            for res in (RAW, MINUTE, HOUR):
+                rows.append((res, m, ts - ts % res if res else ts, v, v, v, v))
+        with self._db:
+            self._db.executemany(_UPSERT, rows)
+        self.version += 1
+        if ts - self._pruned > 3600:
+            self.prune(ts)
+
+    def import_daily(self, days):
+        """
+        Legacy StatusStore daily_stats ({date: {cpu_max, ..., net_recv_start, ...}})
+        → one point per day (at noon, so any zone offset stays inside the day) in
+        the minute and hour tiers, which are the ones reports read.
+        """
+        rows = []
+        for date, d in days.items():
+            try:
+                ts = int(datetime.strptime(date, "%Y-%m-%d").timestamp()) + 12 * 3600
+            except (TypeError, ValueError):
+                continue
+            values = {
+                "cpu":  d.get("cpu_max", 0),
+                "ram":  d.get("ram_max", 0),
+                "disk": d.get("disk_max", 0),
+                "rx":   max(0.0, d.get("net_recv_last", 0) - d.get("net_recv_start", 0)),
+                "tx":   max(0.0, d.get("net_sent_last", 0) - d.get("net_sent_start", 0)),
+            }
+            for m, v in values.items():
+                for res in (MINUTE, HOUR):
+                    rows.append((res, m, ts - ts % res, v, v, v, v))
+        with self._db:
+            self._db.executemany(_UPSERT, rows)
+        self.version += 1
+        return len(days)
+
+    def prune(self, now=None):
+        now = int(now or time.time())
+        with self._db:
+            for res, keep in self.retention.items():
+                self._db.execute("DELETE FROM points WHERE res = ? AND ts < ?", (res, now - keep))
+        self._pruned = now
+
+    # ── reads ─────────────────────────────────────────────────────────────────
+
+    def pick_resolution(self, start, end, now=None):
+        """Finest tier still holding `start` and yielding a sensible point count."""
+        now = now or time.time()
+        for res in (RAW, MINUTE, HOUR):
+            if start >= now - self.retention[res] and (res or 30) * 2000 >= end - start:
+                return res
+        return HOUR
+
+    def query(self, metric, start, end, res=None):
+        """[(ts, min, avg, max, last), ...] for start <= ts < end."""
+        res = self.pick_resolution(start, end) if res is None else res
+        cur = self._db.execute(
+            "SELECT ts, min, sum / cnt, max, last FROM points "
+            "WHERE res = ? AND metric = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (res, metric, int(start), int(end)))
+        return cur.fetchall()
+
+    def rates(self, metric, start, end):
+        """[(ts, per-second rate), ...] of a delta metric (rx/tx MB → MB/s), minute tier or coarser."""
+        res = max(self.pick_resolution(start, end), MINUTE)
+        cur = self._db.execute(
+            "SELECT ts, sum FROM points WHERE res = ? AND metric = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (res, metric, int(start), int(end)))
+        return [(ts, total / res) for ts, total in cur]
+
+    def summary(self, start, end):
+        """{metric: (max, total)} over [start, end); minute tier while retained, else hourly."""
+        res = MINUTE if start >= time.time() - self.retention[MINUTE] else HOUR
+        cur = self._db.execute(
+            "SELECT metric, max(max), sum(sum) FROM points "
+            "WHERE res = ? AND ts >= ? AND ts < ? GROUP BY metric",
+            (res, int(start), int(end)))
+        return {m: (mx, tot) for m, mx, tot in cur}
+
+    def get_daily_stats(self, date=None):
+        """Per-day maxima and traffic totals in MB, or None if nothing was recorded."""
+        day   = datetime.strptime(date, "%Y-%m-%d") if date else \
+                datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = day.timestamp()
+        s     = self.summary(start, (day + timedelta(days=1)).timestamp())
+        if not s:
+            return None
+        return {
+            "cpu_max":    s.get("cpu",    (0, 0))[0],
+            "ram_max":    s.get("ram",    (0, 0))[0],
+            "disk_max":   s.get("disk",   (0, 0))[0],
+            "inodes_max": s.get("inodes", (0, 0))[0],
+            "io_r_max":   s.get("io_r",   (0, 0))[0],
+            "io_w_max":   s.get("io_w",   (0, 0))[0],
+            "iops_max":   s.get("iops",   (0, 0))[0],
+            "net_recv":   s.get("rx",     (0, 0))[1],
+            "net_sent":   s.get("tx",     (0, 0))[1],
+            "mounts":     {m[5:]: mx for m, (mx, _) in s.items() if m.startswith("disk:")},
+        }
@@ -1,6 +1,7 @@
+import asyncio
 import json
 import os
-from datetime import datetime
+import time
 
 DEFAULT_SETTINGS = {
     "services_blacklist": [
@@ -12,6 +13,13 @@ DEFAULT_SETTINGS = {
     "ports_blacklist":          [],
     "show_services":            True,
     "show_ports":               True,
+    "show_fleet":               True,         # agents section in channel status (fleet mode)
+    "show_top":                 False,        # top processes section in status
+    "show_disks":               True,         # every mount: usage, inodes, I/O
+    "max_disks":                8,
+    "compact":                  False,        # resources as a single line
+    "lang":                     "ru",         # status text language: ru | en
+    "max_top":                  5,
     "services_mode":            "filtered",   # all | filtered | custom
     "max_services":             10,
     "max_ports":                15,
@@ -19,42 +27,187 @@ DEFAULT_SETTINGS = {
     "alert_cpu":                80,
     "alert_ram":                85,
     "alert_disk":               90,
+    "alert_for":                300,          # sec a threshold must hold before firing
+    "alert_hysteresis":         5,            # clear at threshold minus this
+    "alert_cooldown":           1800,         # sec before the same rule notifies again
+    "alert_rules":              [],           # extra rules, see bot/monitor/alerts.py
     "daily_report_enabled":     False,
     "daily_report_time":        "09:00",
+    "report_charts":            True,         # attach a PNG chart of the last 24 h
     "auto_reboot_enabled":      False,
     "auto_reboot_time":         "04:00",
+    "update_interval":          0,            # sec, fixed mode; 0 = UPDATE_INTERVAL from .env
+    "update_adaptive":          True,         # pick the interval from how fast metrics move
+    "update_min":               10,           # adaptive range, sec
+    "update_max":               120,
+    "bot_cpu_budget":           5,            # % of one core; slower pushes + throttled collectors above it
+    "bot_rss_budget":           200,          # MB incl. children (journalctl -f, ...)
+    "edit_max_staleness":       300,          # sec; re-edit even if nothing changed
+    "edit_thresholds":          {},           # over dedup.DEFAULT_THRESHOLDS, e.g. {"cpu": 5, "net": 2}
+}
+
+# settings a channel profile may override (sections, limits, filters, language) → type
+PROFILE_KEYS = {
+    "show_services":      bool,
+    "show_ports":         bool,
+    "show_top":           bool,
+    "show_fleet":         bool,
+    "show_disks":         bool,
+    "compact":            bool,
+    "max_services":       int,
+    "max_ports":          int,
+    "max_top":            int,
+    "max_disks":          int,
+    "services_mode":      str,
+    "services_filter":    list,
+    "services_blacklist": list,
+    "ports_filter":       list,
+    "ports_blacklist":    list,
+    "lang":               str,
 }
 
 
 class StatusStore:
-    def __init__(self, filename="status_messages.json"):
-        self.filename = filename
-        self._data    = self._load()
+    """
+    Channels + settings persisted as JSON.
+    Mutations only mark the state dirty; a debounced flush writes it
+    atomically (tmp + fsync + rename) at most once per `flush_delay` seconds.
+    Call flush() on shutdown.
+    """
+
+    def __init__(self, filename="status_messages.json", flush_delay=5.0):
+        self.filename    = filename
+        self.flush_delay = flush_delay
+        self._dirty      = False
+        self._pending    = None
+        self._data       = self._load()
 
     def _load(self):
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename) as f:
-                    return json.load(f)
-            except Exception:
-                pass
-        return {}
+        if not os.path.exists(self.filename):
+            return {}
+        try:
+            with open(self.filename) as f:
+                return json.load(f)
+        except Exception as e:
+            # keep the broken file for inspection instead of silently dropping it
+            bad = f"{self.filename}.corrupt-{int(time.time())}"
+            os.replace(self.filename, bad)
+            print(f"store: {self.filename} unreadable ({e}), moved to {bad}")
+            return {}
 
     def _save(self):
-        with open(self.filename, "w") as f:
+        self._dirty = True
+        if self._pending is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()   # no event loop (scripts, startup) — write now
+            return
+        self._pending = loop.call_later(self.flush_delay, self.flush)
+
+    def flush(self):
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        if not self._dirty:
+            return
+        path = os.path.abspath(self.filename)
+        tmp  = f"{path}.tmp"
+        with open(tmp, "w") as f:
             json.dump(self._data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        try:
+            fd = os.open(os.path.dirname(path), os.O_RDONLY)
+            try:     os.fsync(fd)
+            finally: os.close(fd)
+        except OSError:
+            pass
+        self._dirty = False
 
     # ── channels ──────────────────────────────────────────────────────────────
 
     def add_channel(self, chat_id, msg_id):
-        self._data.setdefault("channels", {})[str(chat_id)] = msg_id
-        self._save()
+        ch = self._data.setdefault("channels", {})
+        if ch.get(str(chat_id)) != msg_id:
+            ch[str(chat_id)] = msg_id
+            self._save()
 
     def get_channels(self):
         return {int(k): v for k, v in self._data.get("channels", {}).items()}
 
     def remove_channel(self, chat_id):
-        self._data.get("channels", {}).pop(str(chat_id), None)
+        if self._data.get("channels", {}).pop(str(chat_id), None) is not None:
+            self._data.get("channel_profiles", {}).pop(str(chat_id), None)
+            self._save()
+
+    # ── profiles ──────────────────────────────────────────────────────────────
+    # A profile is a set of PROFILE_KEYS overrides on top of the global
+    # settings; channels without one use the global settings.
+
+    def get_profiles(self):
+        return {k: dict(v) for k, v in self._data.get("profiles", {}).items()}
+
+    def set_profile(self, name, **kw):
+        cur = self._data.setdefault("profiles", {}).setdefault(name, {})
+        cur.update((k, v) for k, v in kw.items() if k in PROFILE_KEYS)
+        self._save()
+
+    def delete_profile(self, name):
+        if self._data.get("profiles", {}).pop(name, None) is None:
+            return False
+        cp = self._data.get("channel_profiles", {})
+        for cid in [c for c, p in cp.items() if p == name]:
+            del cp[cid]
+        self._save()
+        return True
+
+    def assign_profile(self, chat_id, name):
+        """Use profile `name` for the channel; None = back to the global settings."""
+        cp = self._data.setdefault("channel_profiles", {})
+        if name is None:
+            if cp.pop(str(chat_id), None) is not None:
+                self._save()
+        elif cp.get(str(chat_id)) != name:
+            cp[str(chat_id)] = name
+            self._save()
+
+    def channel_profile(self, chat_id):
+        return self._data.get("channel_profiles", {}).get(str(chat_id))
+
+    def profile_settings(self, name=None):
+        s = self.get_settings()
+        s.update(self._data.get("profiles", {}).get(name, {}) if name else {})
+        return s
+
+    def channel_groups(self):
+        """{profile name or None: {chat_id: message_id}} for all linked channels."""
+        cp, out = self._data.get("channel_profiles", {}), {}
+        for k, mid in self._data.get("channels", {}).items():
+            p = cp.get(k)
+            out.setdefault(p if p in self._data.get("profiles", {}) else None, {})[int(k)] = mid
+        return out
+
+    # ── legacy stats ──────────────────────────────────────────────────────────
+    # per-day stats moved to MetricStore (bot/storage/metric_store.py); the old
+    # key is kept until main has imported it with MetricStore.import_daily()
+
+    def legacy_daily_stats(self):
+        return dict(self._data.get("daily_stats") or {})
+
+    def drop_legacy_daily_stats(self):
+        if self._data.pop("daily_stats", None) is not None:
+            self._save()
+
+    # ── scheduler ─────────────────────────────────────────────────────────────
+
+    def get_last_run(self, job):
+        return self._data.get("last_run", {}).get(job)
+
+    def set_last_run(self, job, ts):
+        self._data.setdefault("last_run", {})[job] = ts
         self._save()
 
     # ── settings ──────────────────────────────────────────────────────────────
@@ -65,31 +218,7 @@ class StatusStore:
         return s
 
     def update_settings(self, **kw):
-        self._data.setdefault("settings", {}).update(kw)
-        self._save()
-
-    # ── stats ─────────────────────────────────────────────────────────────────
-
-    def record_stats(self, cpu, ram, disk, recv, sent):
-        today = datetime.now().strftime("%Y-%m-%d")
-        self._data.setdefault("daily_stats", {})
-        d = self._data["daily_stats"].get(today, {
-            "cpu_max": 0, "ram_max": 0, "disk_max": 0,
-            "net_recv_start": recv, "net_sent_start": sent,
-            "net_recv_last":  recv, "net_sent_last":  sent,
-        })
-        d["cpu_max"]       = max(d["cpu_max"],  cpu)
-        d["ram_max"]       = max(d["ram_max"],  ram)
-        d["disk_max"]      = max(d["disk_max"], disk)
-        d["net_recv_last"] = recv
-        d["net_sent_last"] = sent
-        self._data["daily_stats"][today] = d
-        # keep last 7 days
-        for k in sorted(self._data["daily_stats"])[:-7]:
-            del self._data["daily_stats"][k]
-        self._save()
-
-    def get_daily_stats(self, date=None):
-        if date is None:
-            date = datetime.now().strftime("%Y-%m-%d")
-        return self._data.get("daily_stats", {}).get(date)
+        cur = self._data.setdefault("settings", {})
+        if any(k not in cur or cur[k] != v for k, v in kw.items()):
+            cur.update(kw)
+            self._save()
@@ -0,0 +1,223 @@
+"""
+PNG charts for reports, drawn without third-party deps (zlib + struct).
+Canvas is a bytearray of RGB pixels with rect/line/text primitives and a
+3×5 bitmap font. ChartCache renders each (chart, window, MetricStore.version)
+once and remembers the Telegram file_id of the first upload, so fanning a
+chart out to many channels costs one render and one upload.
+"""
+import asyncio
+import struct
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+
+from bot.storage.metric_store import MINUTE
+
+WHITE = (255, 255, 255)
+INK   = (60, 60, 60)
+GRID  = (225, 225, 225)
+RED   = (220, 60, 50)
+BLUE  = (40, 110, 220)
+GREEN = (40, 160, 80)
+AMBER = (230, 140, 20)
+
+# panel → (title, [(metric, color), ...], ymax or None for auto, plot per-second rate of a delta metric)
+PANELS = {
+    "cpu":  ("CPU %",       [("cpu", RED)],               100,  False),
+    "ram":  ("RAM %",       [("ram", BLUE)],              100,  False),
+    "disk": ("DISK %",      [("disk", GREEN)],            100,  False),
+    "net":  ("NET MB/S",    [("rx", BLUE), ("tx", AMBER)], None, True),
+}
+CHARTS  = {**{k: [k] for k in PANELS}, "all": list(PANELS)}
+WINDOWS = {"day": 86400, "week": 7 * 86400}
+
+WIDTH, PANEL_H = 800, 220
+_L, _R, _T, _B = 56, 14, 26, 22   # plot margins inside a panel
+
+_FONT = {
+    "0": "111101101101111", "1": "010110010010111", "2": "111001111100111",
+    "3": "111001011001111", "4": "101101111001001", "5": "111100111001111",
+    "6": "111100111101111", "7": "111001001010010", "8": "111101111101111",
+    "9": "111101111001111", "%": "101001010100101", ":": "000010000010000",
+    ".": "000000000000010", "/": "001001010100100", "-": "000000111000000",
+    "A": "010101111101101", "B": "110101110101110", "C": "011100100100011",
+    "D": "110101101101110", "E": "111100110100111", "F": "111100110100100",
+    "G": "011100101101011", "H": "101101111101101", "I": "111010010010111",
+    "K": "101101110101101", "L": "100100100100111", "M": "101111111101101",
+    "N": "110101101101101", "O": "010101101101010", "P": "110101110100100",
+    "R": "110101110101101", "S": "011100010001110", "T": "111010010010010",
+    "U": "101101101101111", "V": "101101101101010", "W": "101101111111101",
+    "X": "101101010101101", "Y": "101101010010010",
+}
+
+
+def _tint(c, k=0.25):
+    return tuple(int(255 - (255 - v) * k) for v in c)
+
+
+class Canvas:
+
+    def __init__(self, w, h, bg=WHITE):
+        self.w, self.h = w, h
+        self.px = bytearray(bytes(bg) * (w * h))
+
+    def rect(self, x0, y0, x1, y1, c):
+        """Fill [x0, x1) × [y0, y1)."""
+        x0, x1 = max(0, x0), min(self.w, x1)
+        y0, y1 = max(0, y0), min(self.h, y1)
+        if x0 >= x1:
+            return
+        row = bytes(c) * (x1 - x0)
+        for y in range(y0, y1):
+            i = (y * self.w + x0) * 3
+            self.px[i:i + len(row)] = row
+
+    def dot(self, x, y, c):
+        if 0 <= x < self.w and 0 <= y < self.h:
+            i = (y * self.w + x) * 3
+            self.px[i:i + 3] = bytes(c)
+
+    def line(self, x0, y0, x1, y1, c, width=2):
+        if abs(x1 - x0) <= 1:   # dense series: one vertical run per column
+            self.rect(x0, y0, x0 + 1, y0 + width, c)
+            self.rect(x1, min(y0, y1), x1 + 1, max(y0, y1) + width, c)
+            return
+        dx, dy = abs(x1 - x0), -abs(y1 - y0)
+        sx, sy = (1 if x0 < x1 else -1), (1 if y0 < y1 else -1)
+        err = dx + dy
+        while True:
+            for k in range(width):
+                self.dot(x0, y0 + k, c)
+            if x0 == x1 and y0 == y1:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy; x0 += sx
+            if e2 <= dx:
+                err += dx; y0 += sy
+
+    def text(self, x, y, s, c, scale=2):
+        for ch in s.upper():
+            g = _FONT.get(ch)
+            if g:
+                for i, bit in enumerate(g):
+                    if bit == "1":
+                        self.rect(x + i % 3 * scale, y + i // 3 * scale,
+                                  x + (i % 3 + 1) * scale, y + (i // 3 + 1) * scale, c)
+            x += 4 * scale
+
+    def png(self):
+        stride = self.w * 3
+        mv     = memoryview(self.px)
+        raw    = b"".join(b"\x00" + mv[y * stride:(y + 1) * stride] for y in range(self.h))
+
+        def chunk(tag, data):
+            return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+        return (b"\x89PNG\r\n\x1a\n"
+                + chunk(b"IHDR", struct.pack(">IIBBBBB", self.w, self.h, 8, 2, 0, 0, 0))
+                + chunk(b"IDAT", zlib.compress(raw, 6))
+                + chunk(b"IEND", b""))
+
+
+def text_width(s, scale=2):
+    return len(s) * 4 * scale
+
+
+def _panel(cv, top, title, series, start, end, ymax):
+    """series: [(color, [(ts, lo, avg, hi), ...], gap_seconds), ...]"""
+    x0, x1 = _L, cv.w - _R
+    y0, y1 = top + _T, top + PANEL_H - _B
+    if ymax is None:
+        peak = max((p[3] for _, pts, _ in series for p in pts), default=0)
+        ymax = max(peak * 1.15, 0.01)
+    cv.text(x0, top + 8, title, INK)
+    for i in range(5):
+        y   = y1 - (y1 - y0) * i // 4
+        lbl = f"{ymax * i / 4:.{0 if ymax >= 10 else 2}f}"
+        cv.rect(x0, y, x1, y + 1, GRID)
+        cv.text(x0 - 6 - text_width(lbl), y - 5, lbl, INK)
+    span = end - start
+    step = 3 * 3600 if span <= 86400 else 86400
+    fmt  = "%H:%M" if span <= 86400 else "%d.%m"
+    t    = start - start % step + step
+    while t < end:
+        x   = x0 + int((t - start) / span * (x1 - x0))
+        lbl = datetime.fromtimestamp(t).strftime(fmt)
+        cv.rect(x, y0, x + 1, y1, GRID)
+        cv.text(x - text_width(lbl) // 2, y1 + 6, lbl, INK)
+        t  += step
+    sy = lambda v: y1 - int(min(max(v, 0), ymax) / ymax * (y1 - y0))
+    for color, pts, gap in series:
+        band, prev = _tint(color), None
+        for ts, lo, avg, hi in pts:
+            x = x0 + int((ts - start) / span * (x1 - x0))
+            if lo != hi:
+                cv.rect(x, sy(hi), x + 1, sy(lo) + 1, band)
+            if prev and ts - prev[0] <= gap:
+                cv.line(prev[1], prev[2], x, sy(avg), color)
+            prev = (ts, x, sy(avg))
+    cv.rect(x0, y1, x1, y1 + 1, INK)
+
+
+def draw(chart, window, data, start, end):
+    """data: {metric: [(ts, lo, avg, hi), ...]} → PNG bytes."""
+    names = CHARTS[chart]
+    cv    = Canvas(WIDTH, PANEL_H * len(names))
+    for i, name in enumerate(names):
+        title, metrics, ymax, _ = PANELS[name]
+        gap    = 3 * (MINUTE if window == "day" else 3600)
+        series = [(color, data.get(m, []), gap) for m, color in metrics]
+        label  = f"{title} - {window}"
+        _panel(cv, i * PANEL_H, label, series, start, end, ymax)
+        if len(metrics) > 1:   # legend
+            x = cv.w - _R
+            for m, color in reversed(metrics):
+                x -= text_width(m) + 24
+                cv.rect(x, i * PANEL_H + 10, x + 12, i * PANEL_H + 18, color)
+                cv.text(x + 16, i * PANEL_H + 8, m, INK)
+    return cv.png()
+
+
+class ChartCache:
+
+    def __init__(self, store, size=16):
+        self.store = store
+        self.size  = size
+        self._png  = OrderedDict()   # (chart, window, version) → png
+        self._fids = {}              # same key → Telegram file_id
+
+    def _fetch(self, chart, window, start, end):
+        data = {}
+        for name in CHARTS[chart]:
+            _, metrics, _, rate = PANELS[name]
+            for m, _ in metrics:
+                if rate:
+                    data[m] = [(ts, v, v, v) for ts, v in self.store.rates(m, start, end)]
+                else:
+                    data[m] = [(ts, lo, avg, hi) for ts, lo, avg, hi, _ in self.store.query(m, start, end)]
+        return data
+
+    async def get(self, chart, window, now=None):
+        """(key, png) for chart over the last `window`; rendered at most once per store version."""
+        key = (chart, window, self.store.version)
+        png = self._png.get(key)
+        if png is None:
+            end   = now or time.time()
+            start = end - WINDOWS[window]
+            data  = self._fetch(chart, window, start, end)   # sqlite stays on the loop thread
+            png   = await asyncio.to_thread(draw, chart, window, data, start, end)
+            self._png[key] = png
+            while len(self._png) > self.size:
+                old, _ = self._png.popitem(last=False)
+                self._fids.pop(old, None)
+        self._png.move_to_end(key)
+        return key, png
+
+    def file_id(self, key):
+        return self._fids.get(key)
+
+    def remember(self, key, file_id):
+        if key in self._png:
+            self._fids[key] = file_id
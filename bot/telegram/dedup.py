@@ -0,0 +1,70 @@
+"""
+Skip no-op status edits.
+The rendered status is fingerprinted without its volatile header (clock,
+uptime) and without the metered sections (resources, disks), whose numbers
+move on every tick. Those are covered by metric values instead: a metric
+counts as changed once it moved more than its threshold since the channel's
+last edit (0 = any visible change). Thresholds from /set_edit_policy are
+applied on top of DEFAULT_THRESHOLDS. A channel is edited when the
+fingerprint changes, a metric moved past its threshold or max_staleness
+has passed.
+"""
+import hashlib
+import time
+
+VOLATILE = {"header"}
+METERED  = {"resources", "disks"}   # covered by metric values, not the fingerprint
+DEFAULT_THRESHOLDS = {"cpu": 2.0, "ram": 1.0, "disk": 0.5, "net": 1.0}   # points; net in MB/s
+
+
+def metric_values(snap):
+    """Metric values at the precision they are displayed with ("disk" = fullest mount)."""
+    return {
+        "cpu":  round(snap.cpu, 1),
+        "ram":  round(snap.mem["percent"], 1),
+        "disk": round(snap.disk["percent"], 1),
+    }
+
+
+def fingerprint(sections):
+    h = hashlib.blake2b(digest_size=16)
+    for name, text in sections:
+        if name in VOLATILE or name in METERED:
+            continue
+        h.update(name.encode())
+        h.update(text.encode())
+    return h.digest()
+
+
+class EditDeduper:
+
+    def __init__(self):
+        self._last = {}     # chat_id → (message_id, fingerprint, monotonic ts, metric values)
+        self._net  = None   # (snapshot ts, cumulative MB) of the previous values() call
+
+    def values(self, snap):
+        """metric_values() plus "net": MB/s since the previous render, not the cumulative total."""
+        vals  = metric_values(snap)
+        total = snap.net["recv"] + snap.net["sent"]
+        prev, self._net = self._net, (snap.ts, total)
+        dt    = snap.ts - prev[0] if prev else 0
+        vals["net"] = round(max(0.0, total - prev[1]) / dt, 1) if dt > 0 else 0.0
+        return vals
+
+    def due(self, cid, mid, fp, values, thresholds, max_staleness, now=None):
+        """Whether channel `cid` needs an edit for this render."""
+        prev = self._last.get(cid)
+        if prev is None:
+            return True
+        pmid, pfp, pts, pvals = prev
+        now = time.monotonic() if now is None else now
+        if pmid != mid or pfp != fp or now - pts >= max_staleness:
+            return True
+        # only metrics with a threshold count; DEFAULT_THRESHOLDS is applied by the caller
+        return any(abs(values[m] - pvals.get(m, 0)) > t for m, t in thresholds.items() if m in values)
+
+    def mark(self, cid, mid, fp, values, now=None):
+        self._last[cid] = (mid, fp, time.monotonic() if now is None else now, values)
+
+    def forget(self, cid):
+        self._last.pop(cid, None)
@@ -0,0 +1,123 @@
+"""
+Concurrent, rate-limit-aware delivery to many chats.
+Bounded concurrency plus token buckets that follow Telegram's limits:
+~30 messages/s per bot, 1/s per private chat, 20/min per group or channel.
+RetryAfter pauses the affected chat and the send is retried.
+"""
+import asyncio
+import time
+
+from telegram.error import RetryAfter
+
+GLOBAL_RATE = 25          # msg/s, a little under Telegram's 30
+PRIVATE     = (1.0, 1)    # (rate per second, burst)
+GROUP       = (20 / 60, 3)
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "_tokens", "_ts", "_blocked")
+
+    def __init__(self, rate, burst=1):
+        self.rate     = rate
+        self.burst    = burst
+        self._tokens  = float(burst)
+        self._ts      = time.monotonic()
+        self._blocked = 0.0   # monotonic time until which the bucket is paused
+
+    def pause(self, seconds):
+        self._blocked = max(self._blocked, time.monotonic() + seconds)
+        self._tokens  = 0.0
+
+    def reserve(self):
+        """Take one token; return how long the caller must wait before using it."""
+        now          = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._ts) * self.rate)
+        self._ts     = now
+        self._tokens -= 1
+        wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        return max(wait, self._blocked - now)
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class FanoutResult:
+    __slots__ = ("ok", "failed", "results", "elapsed", "latencies", "retries")
+
+    def __init__(self):
+        self.ok, self.failed, self.results = 0, {}, {}
+        self.elapsed, self.latencies, self.retries = 0.0, [], 0
+
+    def pct(self, p):
+        if not self.latencies:
+            return 0.0
+        srt = sorted(self.latencies)
+        return srt[min(len(srt) - 1, int(len(srt) * p / 100))]
+
+    def summary(self):
+        return (f"{self.ok}/{self.ok + len(self.failed)} ok in {self.elapsed:.2f}s, "
+                f"p50 {self.pct(50):.2f}s p95 {self.pct(95):.2f}s, retries {self.retries}")
+
+
+class FanOut:
+
+    def __init__(self, concurrency=8, global_rate=GLOBAL_RATE, max_retries=3):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.inflight    = 0
+        self.last        = {}   # job name → FanoutResult of its latest round
+        self._global     = TokenBucket(global_rate, max(1, int(global_rate)))
+        self._chats      = {}
+
+    def _bucket(self, cid):
+        b = self._chats.get(cid)
+        if b is None:
+            rate, burst = PRIVATE if cid > 0 else GROUP
+            b = self._chats[cid] = TokenBucket(rate, burst)
+        return b
+
+    async def send(self, cid, fn, res=None):
+        """Run one rate-limited call fn(cid), retrying on RetryAfter."""
+        bucket = self._bucket(cid)
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            await self._global.acquire()
+            try:
+                return await fn(cid)
+            except RetryAfter as e:
+                delay = e.retry_after.total_seconds() if hasattr(e.retry_after, "total_seconds") \
+                        else float(e.retry_after)
+                bucket.pause(delay)
+                if attempt == self.max_retries:
+                    raise
+                if res is not None:
+                    res.retries += 1
+
+    async def run(self, name, chat_ids, fn):
+        """
+        Deliver fn(cid) to every chat with bounded concurrency.
+        Never raises: per-chat errors are collected in result.failed.
+        """
+        res   = FanoutResult()
+        sem   = asyncio.Semaphore(self.concurrency)
+        start = time.monotonic()
+
+        async def one(cid):
+            async with sem:
+                t0 = time.monotonic()
+                self.inflight += 1
+                try:
+                    res.results[cid] = await self.send(cid, fn, res)
+                    res.ok += 1
+                except Exception as e:
+                    res.failed[cid] = e
+                finally:
+                    self.inflight -= 1
+                    res.latencies.append(time.monotonic() - t0)
+
+        await asyncio.gather(*(one(cid) for cid in chat_ids))
+        res.elapsed     = time.monotonic() - start
+        self.last[name] = res
+        return res
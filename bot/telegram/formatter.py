@@ -1,3 +1,7 @@
+"""
+Legacy formatter that collects from the monitor itself; bench/run.py
+baseline only. The bot renders MetricsSnapshots with formatter_optimized.
+"""
 from datetime import datetime
 
 # Status indicators
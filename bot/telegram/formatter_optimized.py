@@ -2,40 +2,87 @@
 Оптимизированный форматер вывода с эмодзи
 Снижает нагрузку на систему кешированием и минимизирует объёмы передачи данных
 """
+from collections import OrderedDict
 from datetime import datetime
-from functools import lru_cache
+
+from bot.monitor.sampler import METRICS
 
 # ============================================================================
 # Status indicators с эмодзи для лучшей визуализации
 # ============================================================================
 
-@lru_cache(maxsize=1)
+# Пороги: (верхняя граница, эмодзи); последний — для всего, что выше
+_LEVELS = {
+    "cpu":    ((50, "🟢"), (75, "🟡"), (90, "🟠"), (None, "🔴")),
+    "memory": ((60, "🟢"), (80, "🟡"), (None, "🔴")),
+    "disk":   ((70, "🟢"), (85, "🟡"), (95, "🟠"), (None, "🔴")),
+}
+
+
+def _table(levels):
+    # пороги целые, поэтому v < порог ⇔ int(v) < порог — хватает 101 ячейки
+    return tuple(next(e for t, e in levels if t is None or i < t) for i in range(101))
+
+
+_EMOJI = {k: _table(v) for k, v in _LEVELS.items()}
+_BARS  = {}   # width → готовые бары для 0..width заполненных клеток
+
+
 def _get_status_emoji(metric_type: str, value: float) -> str:
-    """Кешированное получение эмодзи в зависимости от метрики"""
-    if metric_type == "cpu":
-        if value < 50:  return "🟢"      # зелёный — нормально
-        if value < 75:  return "🟡"      # жёлтый — внимание
-        if value < 90:  return "🟠"      # оранжевый — критично
-        return "🔴"                      # красный — опасно
-    
-    elif metric_type == "memory":
-        if value < 60:  return "🟢"
-        if value < 80:  return "🟡"
-        return "🔴"
-    
-    elif metric_type == "disk":
-        if value < 70:  return "🟢"
-        if value < 85:  return "🟡"
-        if value < 95:  return "🟠"
-        return "🔴"
-    
-    return "⚪"
+    """Эмодзи по метрике из таблицы (без ветвлений и кеша на каждый вызов)"""
+    t = _EMOJI.get(metric_type)
+    return t[min(100, max(0, int(value)))] if t else "⚪"
 
 
 def _bar(p, width=8):
     """ASCII прогресс-бар: [████░░░░]"""
-    filled = round(p / 100 * width)
-    return "[" + "█" * filled + "░" * (width - filled) + "]"
+    t = _BARS.get(width)
+    if t is None:
+        t = _BARS[width] = tuple("[" + "█" * f + "░" * (width - f) + "]" for f in range(width + 1))
+    return t[min(width, max(0, round(p / 100 * width)))]
+
+
+class SectionCache:
+    """
+    Готовые тексты секций статуса.
+    Ключ — (секция, настройки, влияющие на вид); текст переиспользуется, пока
+    входные данные те же: списки сервисов/портов из кешей монитора приходят
+    тем же объектом, пока не изменились, поэтому проверка — обычно `is`.
+    """
+
+    def __init__(self, size=128):
+        self.size   = size
+        self.hits   = self.misses = 0
+        self._d     = OrderedDict()   # (name, key) → (data, text)
+
+    def get(self, name, key, data, render):
+        slot = (name, key)
+        hit  = self._d.get(slot)
+        if hit is not None and (hit[0] is data or hit[0] == data):
+            self._d.move_to_end(slot)
+            self.hits += 1
+            return hit[1]
+        text = render()
+        self._d[slot] = (data, text)
+        self._d.move_to_end(slot)
+        while len(self._d) > self.size:
+            self._d.popitem(last=False)
+        self.misses += 1
+        return text
+
+    def clear(self):
+        self._d.clear()
+
+
+SECTIONS = SectionCache()
+
+# Тексты статуса по языку профиля (ru — исторический вид)
+LANGS = {
+    "ru": {"title": "SERVER STATUS", "services": "SERVICES", "svc_more": "более",
+           "ports": "PORTS", "open": "открыто", "more": "ещё", "top": "TOP", "disks": "DISKS"},
+    "en": {"title": "SERVER STATUS", "services": "SERVICES", "svc_more": "more",
+           "ports": "PORTS", "open": "open", "more": "more", "top": "TOP", "disks": "DISKS"},
+}
 
 
 def _flt_svc(svcs, s):
@@ -63,59 +110,164 @@ def _flt_ports(ports, s):
 # Основные форматеры
 # ============================================================================
 
-def format_status(monitor, settings=None):
+def status_sections(snap, settings=None):
     """
-    Основной статус сервера с эмодзи и оптимизированным форматом.
-    Минимизирует размер и улучшает читаемость
+    Статус сервера по секциям: [(имя, текст), ...].
+    header — волатильная часть (часы, uptime), остальное — содержимое,
+    по которому считается отпечаток для пропуска лишних правок.
+    Секции берутся из SECTIONS: заново рендерится только та, чьи входы изменились
     """
     s   = settings or {}
-    cpu = max(0.0, monitor.get_cpu_usage())
-    mem = monitor.get_memory_usage()
-    dsk = monitor.get_disk_usage()
-    net = monitor.get_network_stats()
-
-    # Основная статистика с эмодзи
-    lines = [
-        "📊 *SERVER STATUS*",
-        f"🕐 `{datetime.now().strftime('%H:%M:%S')}`  ⏱ {monitor.get_uptime()}",
-        "",
-    ]
-
-    # CPU с цветным индикатором
-    cpu_emoji = _get_status_emoji("cpu", cpu)
-    lines.append(f"{cpu_emoji} CPU {_bar(cpu)} `{cpu:.1f}%` • load `{monitor.get_load_average()}`")
-    
-    # RAM с цветным индикатором
-    mem_emoji = _get_status_emoji("memory", mem['percent'])
-    lines.append(f"{mem_emoji} RAM {_bar(mem['percent'])} `{mem['percent']:.1f}%` • `{mem['used']:.1f}/{mem['total']:.1f}GB`")
-    
-    # Disk с цветным индикатором
-    dsk_emoji = _get_status_emoji("disk", dsk['percent'])
-    lines.append(f"{dsk_emoji} DISK {_bar(dsk['percent'])} `{dsk['percent']:.1f}%` • `{dsk['used']:.1f}/{dsk['total']:.1f}GB`")
-    
-    # Сеть (без цветов, просто информация)
-    lines.append(f"🌐 Net ↓`{net['recv']:.0f}MB` ↑`{net['sent']:.0f}MB`")
+    lng = s.get("lang") if s.get("lang") in LANGS else "ru"
+    t   = LANGS[lng]
+    cpu = snap.cpu
+    mem = snap.mem
+    dsk = snap.disk
+    net = snap.net
+    # DISK — самая заполненная точка монтирования (как у алертов); не корень — подписываем
+    where = "" if dsk.get("mount", "/") == "/" else f" `{dsk['mount']}`"
+
+    sections = [("header", "\n".join([
+        f"📊 *{t['title']}*",
+        f"🕐 `{datetime.fromtimestamp(snap.ts).strftime('%H:%M:%S')}`  ⏱ {snap.uptime}",
+    ]))]
+
+    # CPU / RAM / Disk с цветным индикатором, сеть — просто информация
+    def resources():
+        cpu_emoji = _get_status_emoji("cpu", cpu)
+        mem_emoji = _get_status_emoji("memory", mem['percent'])
+        dsk_emoji = _get_status_emoji("disk", dsk['percent'])
+        return "\n".join([
+            f"{cpu_emoji} CPU {_bar(cpu)} `{cpu:.1f}%` • load `{snap.load}`",
+            f"{mem_emoji} RAM {_bar(mem['percent'])} `{mem['percent']:.1f}%` • `{mem['used']:.1f}/{mem['total']:.1f}GB`",
+            f"{dsk_emoji} DISK {_bar(dsk['percent'])} `{dsk['percent']:.1f}%` • `{dsk['used']:.1f}/{dsk['total']:.1f}GB`{where}",
+            f"🌐 Net ↓`{net['recv']:.0f}MB` ↑`{net['sent']:.0f}MB`",
+        ])
+    def compact():
+        worst = max(cpu, mem['percent'], dsk['percent'])
+        return (f"{_get_status_emoji('cpu', worst)} CPU `{cpu:.0f}%` • RAM `{mem['percent']:.0f}%` • "
+                f"DISK `{dsk['percent']:.0f}%`{where} • load `{snap.load}`")
+    compact_ = bool(s.get("compact"))
+    sections.append(("resources", SECTIONS.get("resources", compact_, (
+        cpu, snap.load, mem['percent'], mem['used'], mem['total'],
+        dsk['percent'], dsk['used'], dsk['total'], where, net['recv'], net['sent']), compact if compact_ else resources)))
+
+    # Все точки монтирования: занятость, иноды, I/O (compact — только строка ресурсов)
+    if s.get("show_disks", True) and snap.disks and not s.get("compact"):
+        sections.append(("disks", SECTIONS.get("disks", (lng, s.get("max_disks", 8)), snap.disks,
+                                               lambda: format_disks(snap.disks, s.get("max_disks", 8), t))))
 
     # Сервисы
-    if s.get("show_services", True):
-        svcs = _flt_svc(monitor.get_running_services(), s)
-        n    = s.get("max_services", 8)
-        mode = {"all": "all", "filtered": "sys-off", "custom": "custom"}.get(
-            s.get("services_mode", "filtered"), "")
-        lines += ["", f"⚙️  SERVICES [{min(len(svcs), n)}/{len(svcs)}] _{mode}_"]
-        lines += [f"  ✓ `{x['name']}`" for x in svcs[:n]]
-        if len(svcs) > n:
-            lines.append(f"  _…+{len(svcs) - n} более_")
+    if s.get("show_services", True) and snap.services is not None:
+        def services():
+            svcs = _flt_svc(snap.services, s)
+            n    = s.get("max_services", 8)
+            mode = {"all": "all", "filtered": "sys-off", "custom": "custom"}.get(
+                s.get("services_mode", "filtered"), "")
+            lines  = [f"⚙️  {t['services']} [{min(len(svcs), n)}/{len(svcs)}] _{mode}_"]
+            lines += [f"  ✓ `{x['name']}`" for x in svcs[:n]]
+            if len(svcs) > n:
+                lines.append(f"  _…+{len(svcs) - n} {t['svc_more']}_")
+            return "\n".join(lines)
+        key = (lng, s.get("services_mode", "filtered"), s.get("max_services", 8),
+               tuple(s.get("services_blacklist", ())), tuple(s.get("services_filter", ())))
+        sections.append(("services", SECTIONS.get("services", key, snap.services, services)))
 
     # Порты
-    if s.get("show_ports", True):
-        ports = _flt_ports(monitor.get_open_ports(), s)
-        n     = s.get("max_ports", 12)
-        lines += ["", f"🔌 PORTS [{len(ports)} открыто]"]
-        lines += [f"  • `{p['port']}` {p['process']}" for p in ports[:n]]
-        if len(ports) > n:
-            lines.append(f"  _…+{len(ports) - n} ещё_")
+    if s.get("show_ports", True) and snap.ports is not None:
+        def ports():
+            rows = _flt_ports(snap.ports, s)
+            n    = s.get("max_ports", 12)
+            lines  = [f"🔌 {t['ports']} [{len(rows)} {t['open']}]"]
+            lines += [f"  • `{p['port']}` {p['process']}" for p in rows[:n]]
+            if len(rows) > n:
+                lines.append(f"  _…+{len(rows) - n} {t['more']}_")
+            return "\n".join(lines)
+        key = (lng, s.get("max_ports", 12), tuple(s.get("ports_blacklist", ())),
+               tuple(s.get("ports_filter", ())))
+        sections.append(("ports", SECTIONS.get("ports", key, snap.ports, ports)))
+
+    # Топ процессов
+    if s.get("show_top", False) and snap.top:
+        rows = snap.top[:s.get("max_top", 5)]
+        sections.append(("top", SECTIONS.get("top", lng, rows, lambda: format_top(
+            rows, title=f"🔥 {t['top']} [{len(rows)}]"))))
+
+    return sections
+
+
+def join_sections(sections, profile=None):
+    """
+    Склейка секций. Тело без заголовка склеивается заново, только если
+    какая-то секция сменилась; склейки хранятся в SECTIONS по профилю,
+    так что каналы с разными профилями не вытесняют друг друга.
+    """
+    head, *rest = sections
+    if not rest:
+        return head[1]
+    texts = tuple(text for _, text in rest)   # сравнение кортежей строк — сначала по идентичности
+    body  = SECTIONS.get("body", (profile, tuple(name for name, _ in rest)), texts,
+                         lambda: "\n\n".join(texts))
+    return head[1] + "\n\n" + body
+
+
+def format_status(snap, settings=None):
+    """
+    Основной статус сервера с эмодзи и оптимизированным форматом.
+    Рендерит готовый MetricsSnapshot — никаких системных вызовов здесь нет
+    """
+    return join_sections(status_sections(snap, settings))
+
+
+def format_fleet(rows, limit=25, t=None):
+    """
+    Сводка по агентам: rows = [(имя, MetricsSnapshot | None, online)].
+    Сначала офлайн, затем самые нагруженные; остальное сворачивается.
+    t — строки языка профиля из LANGS
+    """
+    t = t or LANGS["ru"]
+    def load(r):
+        snap = r[1]
+        return max(snap.cpu, snap.mem["percent"], snap.disk["percent"]) if snap else 0
+
+    rows   = sorted(rows, key=lambda r: (r[2] and r[1] is not None, -load(r), r[0]))
+    online = sum(1 for r in rows if r[2])
+    lines  = [f"🛰 FLEET [{online}/{len(rows)} online]"]
+    for name, snap, up in rows[:limit]:
+        if not up or snap is None:
+            lines.append(f"  ⚫ `{name}` offline")
+            continue
+        worst = _get_status_emoji("cpu", load((name, snap, up)))
+        lines.append(f"  {worst} `{name}` CPU `{snap.cpu:.0f}%` RAM `{snap.mem['percent']:.0f}%` "
+                     f"DISK `{snap.disk['percent']:.0f}%`")
+    if len(rows) > limit:
+        lines.append(f"  _…+{len(rows) - limit} {t['more']}_")
+    return "\n".join(lines)
+
 
+def format_disks(rows, limit=8, t=None):
+    """Точки монтирования: занятость, иноды и I/O устройства"""
+    t     = t or LANGS["ru"]
+    lines = [f"💽 {t['disks']} [{len(rows)}]"]
+    for r in rows[:limit]:
+        emoji = _get_status_emoji("disk", max(r["percent"], r["inodes"]))
+        line  = (f"  {emoji} `{r['mount']}` {_bar(r['percent'])} `{r['percent']:.0f}%` "
+                 f"`{r['used']:.0f}/{r['total']:.0f}GB` • inodes `{r['inodes']:.0f}%`")
+        if r["iops"] >= 0.5:
+            line += f"\n      `{r['device']}` ↓`{r['read_mb']:.1f}` ↑`{r['write_mb']:.1f}` MB/s • `{r['iops']:.0f}` IOPS"
+        lines.append(line)
+    if len(rows) > limit:
+        lines.append(f"  _…+{len(rows) - limit} {t['more']}_")
+    return "\n".join(lines)
+
+
+def format_top(rows, by="cpu", title=None):
+    """Топ процессов: CPU% (на ядро, как в top) и RSS"""
+    lines = [title or f"🔥 TOP PROCESSES by {'CPU' if by == 'cpu' else 'RAM'}"]
+    for r in rows:
+        lines.append(f"  `{r['cpu']:5.1f}%` `{r['rss_mb']:6.0f}MB` `{r['name']}` {r['pid']}")
+    if not rows:
+        lines.append("  _none_")
     return "\n".join(lines)
 
 
@@ -139,6 +291,12 @@ def format_ports(ports):
     return "\n".join(lines)
 
 
+def format_logs(service, lines, note=""):
+    """Страница логов journalctl в блоке кода"""
+    body = "\n".join(lines).replace("`", "'") or "no entries"
+    return f"*Logs {service}:*{note}\n```\n{body}\n```"
+
+
 def format_ping(r):
     """Результат ping с эмодзи"""
     if r["success"]:
@@ -158,15 +316,36 @@ def format_daily_report(stats, date=None):
         return "📋 *Daily Report*\n\n📭 Нет данных"
     if date is None:
         date = datetime.now().strftime("%Y-%m-%d")
-    recv = stats.get("net_recv_last", 0) - stats.get("net_recv_start", 0)
-    sent = stats.get("net_sent_last", 0) - stats.get("net_sent_start", 0)
-    return "\n".join([
+    recv = stats.get("net_recv", 0)
+    sent = stats.get("net_sent", 0)
+    lines = [
         f"📋 *DAILY REPORT*  `{date}`",
         "",
         f"🟢 CPU  max {_bar(stats.get('cpu_max',  0))} `{stats.get('cpu_max',  0):.1f}%`",
         f"🟢 RAM  max {_bar(stats.get('ram_max',  0))} `{stats.get('ram_max',  0):.1f}%`",
         f"🟢 Disk max {_bar(stats.get('disk_max', 0))} `{stats.get('disk_max', 0):.1f}%`",
-        f"🌐 Traffic ↓`{recv:.0f}MB` ↑`{sent:.0f}MB`",
+    ]
+    mounts = stats.get("mounts") or {}
+    if len(mounts) > 1:
+        lines += [f"   {_get_status_emoji('disk', v)} `{m}` max `{v:.1f}%`" for m, v in sorted(mounts.items())]
+    if stats.get("inodes_max"):
+        lines.append(f"🗂 Inodes max `{stats['inodes_max']:.1f}%`")
+    if stats.get("iops_max"):
+        lines.append(f"💽 I/O peak ↓`{stats.get('io_r_max', 0):.1f}` ↑`{stats.get('io_w_max', 0):.1f}` MB/s "
+                     f"• `{stats['iops_max']:.0f}` IOPS")
+    lines.append(f"🌐 Traffic ↓`{recv:.0f}MB` ↑`{sent:.0f}MB`")
+    return "\n".join(lines)
+
+
+def format_history(metric, label, window, st):
+    """Статистика метрики из кольцевого буфера сэмплера"""
+    if not st:
+        return f"📈 *HISTORY* `{metric}` {window}\n\n📭 Нет данных"
+    return "\n".join([
+        f"📈 *HISTORY* {label}  `{window}`  _{st['n']} samples_",
+        "",
+        f"min `{st['min']:.1f}`  avg `{st['avg']:.1f}`  max `{st['max']:.1f}`",
+        f"p50 `{st['p50']:.1f}`  p95 `{st['p95']:.1f}`  p99 `{st['p99']:.1f}`",
     ])
 
 
@@ -190,6 +369,109 @@ def format_alert(issues: list) -> str:
     return "*🚨 ALERT — High Load*\n\n" + "\n".join(issues)
 
 
+def format_alert_events(events, disks=None):
+    """
+    Срабатывания и восстановления правил алертов одним сообщением.
+    Для правил по диску/инодам (самая заполненная точка) — какие это точки
+    """
+    parts = []
+    for kind, title in (("fire", "*🚨 ALERT*"), ("clear", "*✅ RESOLVED*")):
+        lines = [f"{METRICS.get(r.metric, r.metric)} `{v:.1f}` — {r.describe()}"
+                 for k, r, v, _ in events if k == kind]
+        if lines:
+            parts.append(title + "\n" + "\n".join(lines))
+    if disks and any(k == "fire" and r.metric in ("disk", "inodes") for k, r, _, _ in events):
+        top = sorted(disks, key=lambda d: -max(d["percent"], d["inodes"]))[:3]
+        parts.append("\n".join(f"  `{d['mount']}` `{d['percent']:.1f}%` • inodes `{d['inodes']:.1f}%`"
+                               for d in top))
+    return "\n\n".join(parts)
+
+
+def format_alert_rules(rules, enabled=True):
+    """Список правил с текущим состоянием"""
+    mark  = {"ok": "○", "pending": "◐", "firing": "●"}
+    lines = [f"*🚨 Alert rules* ({'on' if enabled else 'off'})", ""]
+    for i, r in enumerate(rules):
+        val = "—" if r.value is None else f"{r.value:.1f}"
+        lines.append(f"{mark[r.state]} `{i}` {r.describe()} · now `{val}`")
+    return "\n".join(lines)
+
+
+def format_perf(rows, gauges, peaks, uptime, limit=25, collectors=None, spent=0.0, loaded=False):
+    """Задержки обработчиков/API (p50/p95/p99, мс), глубина очередей и сборщики метрик"""
+    ms    = lambda v: f"{v * 1000:.0f}" if v >= 0.01 else f"{v * 1000:.1f}"
+    lines = [f"*⏱ PERF* (up {uptime // 3600}h{uptime % 3600 // 60:02d}m)", "```",
+             f"{'name':<24}{'n':>6}{'p50':>7}{'p95':>7}{'p99':>7}{'max':>7} err/429"]
+    for name, h in rows[:limit]:
+        lines.append(f"{name[:23]:<24}{h.n:>6}{ms(h.quantile(.5)):>7}{ms(h.quantile(.95)):>7}"
+                     f"{ms(h.quantile(.99)):>7}{ms(h.max):>7} {h.errors}/{h.retries}")
+    if len(rows) > limit:
+        lines.append(f"… +{len(rows) - limit} more")
+    lines.append("```")
+    if gauges:
+        lines.append("*Queues* (now / peak)")
+        lines += [f"  {k}: `{v}` / `{peaks.get(k, v)}`" for k, v in gauges.items()]
+    if collectors:
+        lines.append(f"*Collectors* last pass `{ms(spent)}ms` CPU{' • ⚠️ throttled' if loaded else ''}")
+        lines.append("```")
+        lines.append(f"{'name':<10}{'cost':>7}{'ttl':>5}{'age':>6}{'runs':>7} defer/err")
+        for name, c in collectors:
+            age = f"{c.age:.0f}" if c.age is not None else "-"
+            lines.append(f"{name:<10}{ms(c.cost):>7}{c.ttl:>5g}{age:>6}{c.runs:>7} {c.deferred}/{c.errors}")
+        lines.append("```")
+    return "\n".join(lines)
+
+
+def format_budget_events(events):
+    """Выход бота за собственный бюджет CPU/RSS и возврат в норму"""
+    lines = []
+    for kind, cpu, rss, (cpu_max, rss_max), ts in events:
+        t = datetime.fromtimestamp(ts).strftime("%H:%M")
+        if kind == "over":
+            lines.append(f"⚠️ *Bot over its budget* `{t}`\n"
+                         f"CPU `{cpu:.1f}%` (budget {cpu_max:g}%) • RSS `{rss:.0f}MB` (budget {rss_max:g}MB)\n"
+                         "_Ports, services and top are collected less often until it recovers._")
+        else:
+            lines.append(f"✅ *Bot back within budget* `{t}`\nPeak CPU `{cpu:.1f}%` • RSS `{rss:.0f}MB`")
+    return "\n\n".join(lines)
+
+
+def format_pacing(pacer, s):
+    """Интервал обновления статуса: режим, текущее значение и почему"""
+    if not s["update_adaptive"]:
+        return f"*⏱ Status interval*\nFixed: every `{s['update_interval']}s`\n\nChange: `/set_interval 30`"
+    cpu = f"`{pacer.bot_cpu:.1f}%`" if pacer.bot_cpu is not None else "—"
+    return "\n".join([
+        "*⏱ Status interval* — adaptive",
+        f"Range: `{s['update_min']}–{s['update_max']}s`, bot budget `{s['bot_cpu_budget']:g}%` CPU, `{s['bot_rss_budget']:g}MB`",
+        f"Now: every `{pacer.interval:g}s` ({pacer.reason})",
+        f"Last move: `{pacer.change:.1f}` pts • bot CPU {cpu}",
+        "",
+        "Change: `/set_interval auto 10 120 cpu=5 rss=200`",
+    ])
+
+
+def format_profiles(profiles, groups, only=None):
+    """Профили каналов: переопределённые настройки и каналы, которые их используют"""
+    def val(v):
+        if isinstance(v, bool): return "on" if v else "off"
+        if isinstance(v, list): return ",".join(map(str, v)) or "—"
+        return v
+
+    names = [only] if only else sorted(profiles)
+    lines = ["*▦ Channel profiles*", ""]
+    for name in names:
+        over = " ".join(f"{k}=`{val(v)}`" for k, v in sorted(profiles.get(name, {}).items())) or "_no overrides_"
+        chans = " ".join(f"`{c}`" for c in groups.get(name, {})) or "—"
+        lines += [f"*{name}*: {over}", f"  channels: {chans}"]
+    if not only:
+        lines.append("*default* (global settings): "
+                     + (" ".join(f"`{c}`" for c in groups.get(None, {})) or "—"))
+    lines += ["", "Edit: `/profile <name> services=off ports=off compact=on lang=en`",
+              "Assign: `/profile use <name|default> [chat_id]`"]
+    return "\n".join(lines)
+
+
 def format_reboot_notification() -> str:
     """Уведомление о перезагрузке"""
     return "🔄 Server rebooting. Back in ~1 min."
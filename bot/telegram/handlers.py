@@ -1,7 +1,8 @@
 import os
-from datetime import datetime
+import time
 
 from telegram import Update
+from telegram.error import RetryAfter
 from telegram.ext import (
     Application, CallbackQueryHandler, CommandHandler,
     ContextTypes, MessageHandler, filters,
@@ -9,31 +10,117 @@ from telegram.ext import (
 
 from bot.config import ADMIN_IDS
 from bot.core.controller import SystemController
-from bot.monitor.server import ServerMonitor
-from bot.storage.status_store import StatusStore
+from bot.core.pacer import FLOOR, step
+from bot.core.scheduler import to_cron
+from bot.fleet.agent import ACTIONS as FLEET_ACTIONS
+from bot.monitor.alerts import parse_rule, rules_from_settings
+from bot.monitor.journal import fit, read_page, search
+from bot.monitor.sampler import METRICS, parse_window
+from bot.storage.status_store import PROFILE_KEYS, StatusStore
+from bot.telegram.charts import CHARTS, WINDOWS
+from bot.telegram.dedup import DEFAULT_THRESHOLDS, fingerprint, metric_values
 from bot.telegram.formatter_optimized import (
-    format_daily_report, format_ping, format_ports,
-    format_services, format_status,
+    LANGS, format_alert_events, format_alert_rules, format_budget_events, format_daily_report,
+    format_fleet, format_history, format_logs, format_pacing, format_perf, format_ping,
+    format_ports, format_profiles, format_services, format_status, format_top,
+    join_sections, status_sections,
 )
 from bot.telegram.keyboards import (
-    back_home, clear_logs_keyboard, confirm_keyboard,
-    main_menu_keyboard, security_keyboard, services_keyboard,
+    back_home, clear_logs_keyboard, confirm_keyboard, logs_keyboard,
+    main_menu_keyboard, search_keyboard, security_keyboard, services_keyboard,
     settings_keyboard, ssh_keyboard,
 )
 
-BOT_SVC = "tg-control-agent"
+BOT_SVC      = "tg-control-agent"
+VIEW_MAX_AGE = 5   # seconds a snapshot may be reused by interactive views
+LOG_PAGE     = 50  # journal entries per /logs page
+SEARCH_PAGE  = 20  # matches per /logsearch page
+LOG_BUDGET   = 3800
+PROFILE_ALIAS = {"services": "show_services", "ports": "show_ports", "top": "show_top",
+                 "fleet": "show_fleet", "disks": "show_disks", "mode": "services_mode"}
 
 def _admin(uid): return not ADMIN_IDS or uid in ADMIN_IDS
 def _g(ctx, k):  return ctx.bot_data[k]
 
+
+async def _snapshot(context, max_age=None, services=False, ports=False, top=0):
+    """Latest MetricsSnapshot; collected anew if older than max_age (None = always)."""
+    s     = _g(context, "store").get_settings()
+    svc   = services or s["show_services"]
+    prt   = ports    or s["show_ports"]
+    top   = max(top, s["max_top"] if s["show_top"] else 0)
+    snap  = context.bot_data.get("snapshot")
+    if (snap is None or max_age is None or snap.age > max_age
+            or (svc and snap.services is None) or (prt and snap.ports is None)
+            or (top and snap.top is None)):
+        snap = await _g(context, "monitor").collect(services=svc, ports=prt, top=top)
+        context.bot_data["snapshot"] = snap
+    return snap
+
+async def _broadcast(context, name, text, **kw):
+    """Send `text` to every linked chat through the rate-limited fan-out engine."""
+    res = await _g(context, "fanout").run(
+        name, list(_g(context, "store").get_channels()),
+        lambda cid: context.bot.send_message(cid, text, **kw))
+    for cid, e in res.failed.items():
+        print(f"{name} {cid}: {e}")
+    return res
+
+
+def _log_view(jf, svc, entries, keep="tail", note="", follow=False):
+    """Fit a journal page into one message; paging buttons carry cursor tokens."""
+    shown = fit(entries, LOG_BUDGET, keep)
+    older = jf.cursors.put(svc, shown[0][0]) if shown else None
+    newer = jf.cursors.put(svc, shown[-1][0]) if shown and not follow else None
+    return format_logs(svc, [t for _, t in shown], note), logs_keyboard(older, newer, follow)
+
+
+async def _search_page(context, cid):
+    """Next page of the chat's /logsearch, resuming from its cached cursor."""
+    st = _g(context, "log_search").get(cid)
+    if st is None:
+        return "Search expired — run /logsearch again", back_home()
+    fwd     = bool(st["since"])   # --since reads forward, otherwise newest match first
+    entries = await search(st["service"], st["pattern"], SEARCH_PAGE, st["cursor"], st["since"], fwd)
+    shown   = fit(entries, LOG_BUDGET, "head" if fwd else "tail")
+    note    = f" `{st['pattern'].replace('`', '')}` page {st['page'] + 1}"
+    if not shown:
+        return format_logs(st["service"], [], note + " _no more matches_"), back_home()
+    st["cursor"] = shown[-1][0] if fwd else shown[0][0]
+    st["page"]  += 1
+    return format_logs(st["service"], [t for _, t in shown], note), search_keyboard()
+
+
+async def _send_chart(context, chat_ids, chart, window, caption=None):
+    """Render once, upload once, then fan the same Telegram file_id out to the rest."""
+    cc       = _g(context, "charts")
+    key, png = await cc.get(chart, window)
+
+    async def deliver(cid):
+        fid  = cc.file_id(key)
+        sent = await context.bot.send_photo(cid, fid or png, caption=caption,
+                                            filename=None if fid else f"{chart}-{window}.png")
+        if not fid:
+            cc.remember(key, sent.photo[-1].file_id)
+        return sent
+
+    fan = _g(context, "fanout")
+    res = await fan.run("chart", chat_ids[:1], deliver)
+    if len(chat_ids) > 1:
+        more = await fan.run("chart", chat_ids[1:], deliver)
+        res.failed.update(more.failed)
+    for cid, e in res.failed.items():
+        print(f"chart {cid}: {e}")
+    return res
+
+
 async def _no_access(update):
     m = update.message or (update.callback_query.message if update.callback_query else None)
     if m: await m.reply_text("No access.")
 
 async def _home(update, context):
-    mon  = _g(context, "monitor")
     sto  = _g(context, "store")
-    text = format_status(mon, sto.get_settings())
+    text = format_status(await _snapshot(context, VIEW_MAX_AGE), sto.get_settings())
     kb   = main_menu_keyboard()
     if update.callback_query:
         try:
@@ -57,7 +144,7 @@ async def cmd_ping(update, context):
     host = context.args[0]
     await update.message.reply_text(f"Pinging `{host}`...", parse_mode="Markdown")
     await update.message.reply_text(
-        format_ping(_g(context, "monitor").ping_host(host)),
+        format_ping(await _g(context, "monitor").ping_host(host)),
         parse_mode="Markdown", reply_markup=back_home())
 
 
@@ -65,16 +152,24 @@ async def cmd_services(update, context):
     sto = _g(context, "store")
     s   = sto.get_settings()
     await update.message.reply_text(
-        format_services(_g(context, "monitor").get_running_services(), s),
+        format_services((await _snapshot(context, VIEW_MAX_AGE, services=True)).services, s),
         parse_mode="Markdown", reply_markup=services_keyboard(s["services_mode"]))
 
 
 async def cmd_ports(update, context):
     await update.message.reply_text(
-        format_ports(_g(context, "monitor").get_open_ports()),
+        format_ports((await _snapshot(context, VIEW_MAX_AGE, ports=True)).ports),
         parse_mode="Markdown", reply_markup=back_home())
 
 
+async def cmd_top(update, context):
+    args = context.args or []
+    by   = "mem" if any(a in ("mem", "ram", "rss") for a in args) else "cpu"
+    n    = next((min(int(a), 50) for a in args if a.isdigit()), 10)
+    rows = _g(context, "monitor").get_top_processes(n, "cpu" if by == "cpu" else "rss")
+    await update.message.reply_text(format_top(rows, by), parse_mode="Markdown", reply_markup=back_home())
+
+
 async def _confirm(update, cb, msg, danger=False):
     await update.message.reply_text(
         msg, reply_markup=confirm_keyboard(cb, danger), parse_mode="Markdown")
@@ -105,15 +200,61 @@ async def cmd_reboot(update, context):
 
 async def cmd_logs(update, context):
     if not _admin(update.effective_user.id): await _no_access(update); return
-    if not context.args:
-        await update.message.reply_text("Usage: `/logs <service> [lines]`", parse_mode="Markdown"); return
-    svc   = context.args[0]
-    lines = int(context.args[1]) if len(context.args) > 1 and context.args[1].isdigit() else 50
-    logs  = _g(context, "monitor").get_logs(svc, lines)
-    if len(logs) > 3800: logs = logs[-3800:]
-    await update.message.reply_text(
-        f"*Logs {svc}:*\n```\n{logs}\n```",
-        parse_mode="Markdown", reply_markup=back_home())
+    args   = [a for a in context.args or [] if a not in ("--follow", "-f")]
+    follow = len(args) != len(context.args or [])
+    if not args:
+        await update.message.reply_text("Usage: `/logs <service> [lines] [--follow]`", parse_mode="Markdown"); return
+    svc     = args[0]
+    lines   = min(int(args[1]), 1000) if len(args) > 1 and args[1].isdigit() else LOG_PAGE
+    jf      = _g(context, "journal")
+    entries = await read_page(svc, lines)
+    if not entries and not follow:
+        await update.message.reply_text(f"No logs for `{svc}`", parse_mode="Markdown", reply_markup=back_home()); return
+    text, kb = _log_view(jf, svc, entries, note=" _following…_" if follow else "", follow=follow)
+    sent = await update.message.reply_text(text, parse_mode="Markdown", reply_markup=kb)
+    if follow:
+        jf.subscribe(svc, sent.chat_id, sent.message_id, entries)
+
+
+async def cmd_logsearch(update, context):
+    if not _admin(update.effective_user.id): await _no_access(update); return
+    args, since, it = [], None, iter(context.args or [])
+    for a in it:
+        if a == "--since":             since = next(it, None)
+        elif a.startswith("--since="): since = a[8:]
+        else:                          args.append(a)
+    if len(args) < 2:
+        await update.message.reply_text(
+            "Usage: `/logsearch <service> <pattern> [--since 2h]`", parse_mode="Markdown"); return
+    if since and parse_window(since):
+        since = f"-{parse_window(since)}s"   # journalctl relative time
+    _g(context, "log_search")[update.effective_chat.id] = {
+        "service": args[0], "pattern": " ".join(args[1:]), "since": since, "cursor": None, "page": 0}
+    text, kb = await _search_page(context, update.effective_chat.id)
+    await update.message.reply_text(text, parse_mode="Markdown", reply_markup=kb)
+
+
+async def flush_log_follow(app, service, entries, targets, live):
+    """JournalFollower callback: one batched edit per following message."""
+    jf   = app.bot_data["journal"]
+    text, kb = _log_view(jf, service, entries, note=" _following…_" if live else " _stopped_", follow=live)
+    mids = {}
+    for cid, mid in targets:
+        mids.setdefault(cid, []).append(mid)
+
+    async def deliver(cid):
+        for mid in mids[cid]:
+            try:
+                await app.bot.edit_message_text(
+                    chat_id=cid, message_id=mid, text=text, parse_mode="Markdown", reply_markup=kb)
+            except RetryAfter:
+                raise
+            except Exception as e:
+                if "message is not modified" not in str(e).lower():
+                    jf.unsubscribe(cid, mid)   # deleted or no longer editable
+                    print(f"logs {service} {cid}: {e}")
+
+    await app.bot_data["fanout"].run("logs", list(mids), deliver)
 
 
 async def cmd_close_port(update, context):
@@ -138,7 +279,7 @@ async def cmd_link_channel(update, context):
     sto = _g(context, "store")
     try:
         sent = await context.bot.send_message(
-            cid, format_status(_g(context, "monitor"), sto.get_settings()), parse_mode="Markdown")
+            cid, format_status(await _snapshot(context, VIEW_MAX_AGE), sto.get_settings()), parse_mode="Markdown")
         sto.add_channel(cid, sent.message_id)
         await update.message.reply_text(f"Channel `{cid}` linked!", parse_mode="Markdown")
     except Exception as e:
@@ -146,6 +287,68 @@ async def cmd_link_channel(update, context):
             f"Failed: `{e}`\nMake sure bot is admin with post permission.", parse_mode="Markdown")
 
 
+def _parse_profile(args):
+    """['services=off', 'max_ports=5', 'ports_filter=80,443', ...] → overrides; ValueError if bad."""
+    out = {}
+    for a in args:
+        k, sep, v = a.partition("=")
+        k    = PROFILE_ALIAS.get(k, k)
+        kind = PROFILE_KEYS.get(k)
+        if not sep or kind is None:
+            raise ValueError(a)
+        if kind is bool:
+            if v.lower() not in ("on", "off", "1", "0", "true", "false"): raise ValueError(a)
+            out[k] = v.lower() in ("on", "1", "true")
+        elif kind is list:
+            items  = [x for x in v.split(",") if x]
+            out[k] = [int(x) for x in items] if k.startswith("ports") else items
+        else:
+            out[k] = kind(v)
+    if out.get("lang", "ru") not in LANGS or out.get("services_mode", "all") not in ("all", "filtered", "custom"):
+        raise ValueError("lang / mode")
+    return out
+
+
+async def cmd_profiles(update, context):
+    sto = _g(context, "store")
+    await update.message.reply_text(
+        format_profiles(sto.get_profiles(), sto.channel_groups()),
+        parse_mode="Markdown", reply_markup=back_home())
+
+
+async def cmd_profile(update, context):
+    if not _admin(update.effective_user.id): await _no_access(update); return
+    sto, args = _g(context, "store"), context.args or []
+    usage = ("Usage:\n`/profile <name> services=off ports=off compact=on lang=en` — create / edit\n"
+             "`/profile use <name|default> [chat_id]` — assign to a linked channel (this chat by default)\n"
+             "`/profile del <name>`\n\n"
+             "Keys: services, ports, top, fleet, disks, compact, mode, lang (ru|en), "
+             "max_services, max_ports, max_top, max_disks, services_filter, services_blacklist, "
+             "ports_filter, ports_blacklist (comma lists)")
+    if args and args[0] == "use" and len(args) in (2, 3):
+        name = None if args[1] == "default" else args[1]
+        cid  = int(args[2]) if len(args) == 3 and args[2].lstrip("-").isdigit() else update.effective_chat.id
+        if name and name not in sto.get_profiles():
+            await update.message.reply_text(f"Unknown profile `{name}`", parse_mode="Markdown"); return
+        if cid not in sto.get_channels():
+            await update.message.reply_text(f"`{cid}` is not a linked channel", parse_mode="Markdown"); return
+        sto.assign_profile(cid, name)
+        await update.message.reply_text(f"Channel `{cid}` → profile `{args[1]}`", parse_mode="Markdown"); return
+    if args and args[0] == "del" and len(args) == 2:
+        ok = sto.delete_profile(args[1])
+        await update.message.reply_text(
+            f"Profile `{args[1]}` deleted" if ok else f"Unknown profile `{args[1]}`", parse_mode="Markdown"); return
+    if not args or args[0] in ("use", "del", "default"):
+        await update.message.reply_text(usage, parse_mode="Markdown"); return
+    try:
+        over = _parse_profile(args[1:])
+    except ValueError:
+        await update.message.reply_text(usage, parse_mode="Markdown"); return
+    sto.set_profile(args[0], **over)
+    await update.message.reply_text(
+        format_profiles(sto.get_profiles(), sto.channel_groups(), only=args[0]), parse_mode="Markdown")
+
+
 async def cmd_broadcast(update, context):
     if not _admin(update.effective_user.id): await _no_access(update); return
     if not context.args:
@@ -153,33 +356,144 @@ async def cmd_broadcast(update, context):
     text     = " ".join(context.args)
     channels = _g(context, "store").get_channels()
     if not channels: await update.message.reply_text("No linked channels"); return
-    ok = 0
-    for cid in channels:
-        try: await context.bot.send_message(cid, f"[broadcast] {text}"); ok += 1
-        except Exception as e: print(f"broadcast {cid}: {e}")
-    await update.message.reply_text(f"Sent to {ok} chat(s)")
+    res = await _broadcast(context, "broadcast", f"[broadcast] {text}")
+    await update.message.reply_text(f"Sent to {res.ok} chat(s) in {res.elapsed:.1f}s")
 
 
 async def cmd_report(update, context):
     await update.message.reply_text(
-        format_daily_report(_g(context, "store").get_daily_stats()),
+        format_daily_report(_g(context, "metrics").get_daily_stats()),
         parse_mode="Markdown", reply_markup=back_home())
+    if _g(context, "store").get_settings()["report_charts"]:
+        await _send_chart(context, [update.effective_chat.id], "all", "day")
 
 
-async def cmd_set_report_time(update, context):
+async def cmd_chart(update, context):
+    args   = context.args or []
+    chart  = next((a for a in args if a in CHARTS), "all")
+    window = next((a for a in args if a in WINDOWS), "day")
+    if any(a not in CHARTS and a not in WINDOWS for a in args):
+        await update.message.reply_text(
+            f"Usage: `/chart [{'|'.join(CHARTS)}] [{'|'.join(WINDOWS)}]`", parse_mode="Markdown"); return
+    await _send_chart(context, [update.effective_chat.id], chart, window)
+
+
+async def cmd_history(update, context):
+    usage = "Usage: `/history <metric> <window>`\nMetrics: " + ", ".join(METRICS) + \
+            "\nExample: `/history cpu 15m`"
+    if not context.args or context.args[0] not in METRICS:
+        await update.message.reply_text(usage, parse_mode="Markdown"); return
+    metric  = context.args[0]
+    window  = context.args[1] if len(context.args) > 1 else "1h"
+    seconds = parse_window(window)
+    if not seconds:
+        await update.message.reply_text(usage, parse_mode="Markdown"); return
+    st = _g(context, "sampler").stats(metric, seconds)
+    await update.message.reply_text(
+        format_history(metric, METRICS[metric], window, st),
+        parse_mode="Markdown", reply_markup=back_home())
+
+
+async def cmd_fleet(update, context):
+    hub = context.bot_data.get("fleet")
+    if not hub:
+        await update.message.reply_text(
+            "Fleet mode is off. Set `FLEET_LISTEN` and `FLEET_TOKEN` in .env", parse_mode="Markdown"); return
+    if not hub.agents:
+        await update.message.reply_text("No agents connected yet"); return
+    await update.message.reply_text(
+        format_fleet(hub.rows(), limit=50, t=LANGS.get(_g(context, "store").get_settings()["lang"], LANGS["ru"])),
+        parse_mode="Markdown", reply_markup=back_home())
+
+
+async def cmd_fleet_action(update, context):
     if not _admin(update.effective_user.id): await _no_access(update); return
-    if not context.args:
-        await update.message.reply_text("Usage: `/set_report_time 09:00`", parse_mode="Markdown"); return
-    _g(context, "store").update_settings(daily_report_time=context.args[0])
-    await update.message.reply_text(f"Report time: `{context.args[0]}`", parse_mode="Markdown")
+    hub = context.bot_data.get("fleet")
+    if not hub or len(context.args) < 2 or context.args[1] not in FLEET_ACTIONS:
+        await update.message.reply_text(
+            "Usage: `/fleet_action <agent> <action> [arg]`\n"
+            "Actions: " + ", ".join(FLEET_ACTIONS) + "\nExample: `/fleet_action web1 restart nginx`",
+            parse_mode="Markdown"); return
+    agent, action, *rest = context.args
+    if agent not in hub.agents:
+        await update.message.reply_text(f"Unknown agent `{agent}`", parse_mode="Markdown"); return
+    arg = rest[0] if rest else ""
+    cmd = f"{action} {arg}".strip()
+    tok = hub.pending.put(agent, (action, arg))   # agent names and args can't fit in 64 bytes of callback_data
+    await _confirm(update, f"fleet:{tok}", f"Run `{cmd}` on `{agent}`?", danger=True)
+
+
+async def _set_schedule(update, context, cmd, job, key, label, example):
+    if not _admin(update.effective_user.id): await _no_access(update); return
+    spec = " ".join(context.args or [])
+    try:
+        to_cron(spec)   # before update_settings: a spec that never fires must not be stored
+    except ValueError as e:
+        await update.message.reply_text(
+            f"Usage: `/{cmd} {example}`\n"
+            f"or a cron expression: `0 9 * * 1-5`\n\n`{e}`", parse_mode="Markdown"); return
+    _g(context, "store").update_settings(**{key: spec})
+    nxt = _g(context, "scheduler").reschedule(job, spec)
+    await update.message.reply_text(
+        f"{label}: `{spec}`\nNext: {nxt:%Y-%m-%d %H:%M %Z}", parse_mode="Markdown")
+
+
+async def cmd_set_report_time(update, context):
+    await _set_schedule(update, context, "set_report_time", "daily_report", "daily_report_time", "Report time", "09:00")
 
 
 async def cmd_set_reboot_time(update, context):
+    await _set_schedule(update, context, "set_reboot_time", "auto_reboot", "auto_reboot_time", "Auto-reboot", "04:00")
+
+
+async def cmd_set_edit_policy(update, context):
     if not _admin(update.effective_user.id): await _no_access(update); return
-    if not context.args:
-        await update.message.reply_text("Usage: `/set_reboot_time 04:00`", parse_mode="Markdown"); return
-    _g(context, "store").update_settings(auto_reboot_time=context.args[0])
-    await update.message.reply_text(f"Auto-reboot: `{context.args[0]}`", parse_mode="Markdown")
+    if not context.args or not context.args[0].isdigit():
+        await update.message.reply_text(
+            "Usage: `/set_edit_policy <max_staleness_sec> [cpu=2 ram=1 disk=0.5 net=1]`\n"
+            "Channel edits are skipped until content changes, a metric moves past "
+            "its threshold (net in MB/s, 0 = any change) or max staleness passes.",
+            parse_mode="Markdown"); return
+    thr = {}
+    for a in context.args[1:]:
+        k, _, v = a.partition("=")
+        try:
+            if k not in DEFAULT_THRESHOLDS: raise ValueError
+            thr[k] = float(v)
+        except ValueError:
+            await update.message.reply_text(f"Bad threshold: `{a}`", parse_mode="Markdown"); return
+    _g(context, "store").update_settings(edit_max_staleness=int(context.args[0]), edit_thresholds=thr)
+    desc = " ".join(f"{k}>{v:g}" for k, v in (DEFAULT_THRESHOLDS | thr).items())
+    await update.message.reply_text(
+        f"Edits: on {desc}, at least every {context.args[0]}s", parse_mode="Markdown")
+
+
+async def cmd_set_interval(update, context):
+    if not _admin(update.effective_user.id): await _no_access(update); return
+    args, sto = context.args or [], _g(context, "store")
+    try:
+        if args and args[0] == "auto":
+            kw  = dict(a.split("=", 1) for a in args[1:] if "=" in a)
+            num = [int(a) for a in args[1:] if "=" not in a]
+            lo  = num[0] if num else sto.get_settings()["update_min"]
+            hi  = num[1] if len(num) > 1 else sto.get_settings()["update_max"]
+            if lo < FLOOR or hi < lo: raise ValueError
+            upd = {"update_adaptive": True, "update_min": lo, "update_max": hi}
+            if "cpu" in kw: upd["bot_cpu_budget"] = float(kw["cpu"])
+            if "rss" in kw: upd["bot_rss_budget"] = float(kw["rss"])
+            sto.update_settings(**upd)
+        elif len(args) == 1 and int(args[0]) >= FLOOR:
+            sto.update_settings(update_adaptive=False, update_interval=int(args[0]))
+        else:
+            raise ValueError
+    except ValueError:
+        await update.message.reply_text(
+            "Usage:\n`/set_interval 30` — fixed, seconds\n"
+            "`/set_interval auto 10 120 cpu=5 rss=200` — adaptive between 10 and 120 s; "
+            f"bot budget 5% CPU, 200 MB RSS\n\nMinimum {FLOOR}s.", parse_mode="Markdown"); return
+    await _repace(context)
+    await update.message.reply_text(
+        format_pacing(_g(context, "pacer"), sto.get_settings()), parse_mode="Markdown")
 
 
 async def cmd_set_alerts(update, context):
@@ -189,11 +503,60 @@ async def cmd_set_alerts(update, context):
             "Usage: `/set_alerts <cpu> <ram> <disk>`\nExample: `/set_alerts 80 85 90`",
             parse_mode="Markdown"); return
     cpu, ram, disk = int(context.args[0]), int(context.args[1]), int(context.args[2])
-    _g(context, "store").update_settings(alert_cpu=cpu, alert_ram=ram, alert_disk=disk)
+    sto = _g(context, "store")
+    sto.update_settings(alert_cpu=cpu, alert_ram=ram, alert_disk=disk)
+    _g(context, "alerts").load(rules_from_settings(sto.get_settings()))
     await update.message.reply_text(
         f"Thresholds: CPU>{cpu}% RAM>{ram}% Disk>{disk}%", parse_mode="Markdown")
 
 
+async def cmd_alerts(update, context):
+    s = _g(context, "store").get_settings()
+    await update.message.reply_text(
+        format_alert_rules(_g(context, "alerts").rules, s["alerts_enabled"]),
+        parse_mode="Markdown", reply_markup=back_home())
+
+
+async def cmd_alert_rule(update, context):
+    if not _admin(update.effective_user.id): await _no_access(update); return
+    sto   = _g(context, "store")
+    s     = sto.get_settings()
+    rules = list(s["alert_rules"])
+    args  = context.args or []
+    if len(args) == 2 and args[0] == "del" and args[1].isdigit():
+        i = int(args[1]) - 3   # 0-2 are the built-in /set_alerts rules
+        if not 0 <= i < len(rules):
+            await update.message.reply_text("Only custom rules (index 3+) can be deleted"); return
+        rules.pop(i)
+    else:
+        r = parse_rule(" ".join(args))
+        if r is None:
+            await update.message.reply_text(
+                "Usage:\n`/alert_rule cpu>90 5m clear=70 cooldown=30m`\n`/alert_rule del <n>`\n\n"
+                f"Metrics: {', '.join(METRICS)}. Ops: `>` `<`", parse_mode="Markdown"); return
+        rules.append(r)
+    sto.update_settings(alert_rules=rules)
+    eng = _g(context, "alerts")
+    eng.load(rules_from_settings(sto.get_settings()))
+    await update.message.reply_text(
+        format_alert_rules(eng.rules, s["alerts_enabled"]), parse_mode="Markdown")
+
+
+async def cmd_perf(update, context):
+    if not _admin(update.effective_user.id): await _no_access(update); return
+    tm     = _g(context, "telemetry")
+    reg    = _g(context, "monitor").registry
+    prefix = context.args[0] if context.args else ""   # e.g. api, cb, job, /
+    gauges = {}
+    for k, fn in tm.gauges.items():
+        try:    gauges[k] = fn()
+        except Exception: pass
+    await update.message.reply_text(
+        format_perf(tm.rows(prefix), gauges, tm.peaks, int(time.time() - tm.started),
+                    collectors=None if prefix else reg.rows(), spent=reg.spent, loaded=reg.loaded),
+        parse_mode="Markdown", reply_markup=back_home())
+
+
 async def cmd_add_ssh_key(update, context):
     if not _admin(update.effective_user.id): await _no_access(update); return
     if not context.args:
@@ -251,9 +614,12 @@ TIPS = {
 TOGGLES = {
     "settings:toggle_services": "show_services",
     "settings:toggle_ports":    "show_ports",
+    "settings:toggle_top":      "show_top",
     "settings:toggle_alerts":   "alerts_enabled",
     "settings:toggle_report":   "daily_report_enabled",
+    "settings:toggle_charts":   "report_charts",
     "settings:toggle_reboot":   "auto_reboot_enabled",
+    "settings:toggle_adaptive": "update_adaptive",
 }
 
 
@@ -262,7 +628,6 @@ async def handle_callbacks(update, context):
     await q.answer()
     d   = q.data
     ctl = _g(context, "controller")
-    mon = _g(context, "monitor")
     sto = _g(context, "store")
 
     async def edit(text, kb_=None, md=True):
@@ -274,15 +639,16 @@ async def handle_callbacks(update, context):
 
     if d == "cancel":               await edit("Cancelled", md=False); return
     if d == "cmd:home":             await _home(update, context);       return
-    if d == "cmd:refresh":          await edit(format_status(mon, sto.get_settings()), main_menu_keyboard()); return
+    if d == "cmd:refresh":          await edit(format_status(await _snapshot(context, 1), sto.get_settings()), main_menu_keyboard()); return
     if d in TIPS:                   await edit(TIPS[d], back_home());   return
 
     if d == "cmd:services":
         s = sto.get_settings()
-        await edit(format_services(mon.get_running_services(), s), services_keyboard(s["services_mode"])); return
+        svcs = (await _snapshot(context, VIEW_MAX_AGE, services=True)).services
+        await edit(format_services(svcs, s), services_keyboard(s["services_mode"])); return
 
     if d == "cmd:autostart":
-        svcs = ctl.get_autostart_services()
+        svcs = await ctl.get_autostart_services()
         text = "*⚙ Autostart*\n\n" + "\n".join(f"  + `{s}`" for s in svcs) if svcs else "None"
         await edit(text, back_home()); return
 
@@ -290,10 +656,11 @@ async def handle_callbacks(update, context):
         mode = d.split(":", 1)[1]
         sto.update_settings(services_mode=mode)
         s = sto.get_settings()
-        await edit(format_services(mon.get_running_services(), s), services_keyboard(mode)); return
+        svcs = (await _snapshot(context, VIEW_MAX_AGE, services=True)).services
+        await edit(format_services(svcs, s), services_keyboard(mode)); return
 
     if d == "cmd:ports":
-        await edit(format_ports(mon.get_open_ports()), back_home()); return
+        await edit(format_ports((await _snapshot(context, VIEW_MAX_AGE, ports=True)).ports), back_home()); return
 
     if d == "cmd:reboot":
         await edit("↻ Reboot server?", confirm_keyboard("reboot_server", danger=True)); return
@@ -305,17 +672,14 @@ async def handle_callbacks(update, context):
         await edit(f"*≡ Settings*\n\nLinked: {len(ch)}\n{ids}", settings_keyboard(s)); return
 
     if d == "cmd:ssh_menu":
-        import subprocess
-        active = subprocess.run(
-            ["systemctl", "is-active", "ssh"],
-            capture_output=True, text=True).stdout.strip() == "active"
+        active = await ctl.ssh_active()
         await edit(f"*⚿ SSH*\n\nStatus: {'active' if active else 'stopped'}", ssh_keyboard(active)); return
 
     if d == "cmd:security":
         await edit("*⛨ Security*", security_keyboard()); return
 
     if d == "ssh:start":
-        ok, msg = ctl.ssh_enable()
+        ok, msg = await ctl.ssh_enable()
         await edit(f"{'✓' if ok else '✕'} {msg}", back_home()); return
 
     if d == "ssh:stop":
@@ -324,7 +688,7 @@ async def handle_callbacks(update, context):
             confirm_keyboard("ssh:stop_confirm", danger=True)); return
 
     if d == "ssh:stop_confirm":
-        ok, msg = ctl.ssh_disable()
+        ok, msg = await ctl.ssh_disable()
         await edit(f"{'✓' if ok else '✕'} {msg}", back_home()); return
 
     if d == "ssh:add_key":
@@ -344,29 +708,41 @@ async def handle_callbacks(update, context):
         key = TOGGLES[d]
         s   = sto.get_settings()
         sto.update_settings(**{key: not s[key]})
+        if key == "update_adaptive":
+            await _repace(context)
+        await edit("*≡ Settings*", settings_keyboard(sto.get_settings())); return
+
+    if d in ("settings:interval_up", "settings:interval_down"):
+        s, up = sto.get_settings(), d.endswith("up")
+        if s["update_adaptive"]:
+            sto.update_settings(update_max=max(step(s["update_max"], up), s["update_min"]))
+        else:
+            sto.update_settings(update_interval=step(s["update_interval"], up))
+        await _repace(context)
         await edit("*≡ Settings*", settings_keyboard(sto.get_settings())); return
 
+    if d == "settings:interval_info":
+        await edit(format_pacing(_g(context, "pacer"), sto.get_settings()), back_home()); return
+
     if d == "settings:send_status":
         channels = sto.get_channels()
         if not channels:
             await edit("No linked channels. Use 'Link this chat' or `/link_channel <ID>`",
                        settings_keyboard(sto.get_settings())); return
-        text    = format_status(mon, sto.get_settings())
-        ok_n    = 0
-        errors  = []
-        for cid in list(channels):
-            try:
-                sent = await context.bot.send_message(cid, text, parse_mode="Markdown")
-                sto.add_channel(cid, sent.message_id)
-                ok_n += 1
-            except Exception as e:
-                errors.append(f"`{cid}`: {e}")
-        result = f"✓ Sent to {ok_n} chat(s)"
-        if errors: result += "\n\nErrors:\n" + "\n".join(errors)
+        _, views = await _views(context, VIEW_MAX_AGE)
+        text     = {cid: body for _, _, body, chans in views for cid in chans}
+        res      = await _g(context, "fanout").run(
+            "send_status", list(channels),
+            lambda cid: context.bot.send_message(cid, text[cid], parse_mode="Markdown"))
+        for cid, sent in res.results.items():
+            sto.add_channel(cid, sent.message_id)
+        result = f"✓ Sent to {res.ok} chat(s)"
+        if res.failed:
+            result += "\n\nErrors:\n" + "\n".join(f"`{c}`: {e}" for c, e in res.failed.items())
         await edit(result, settings_keyboard(sto.get_settings())); return
 
     if d == "settings:add_channel":
-        text = format_status(mon, sto.get_settings())
+        text = format_status(await _snapshot(context, VIEW_MAX_AGE), sto.get_settings())
         sent = await context.bot.send_message(q.message.chat_id, text, parse_mode="Markdown")
         sto.add_channel(q.message.chat_id, sent.message_id)
         await edit(f"✓ Chat `{q.message.chat_id}` linked!", settings_keyboard(sto.get_settings())); return
@@ -381,6 +757,7 @@ async def handle_callbacks(update, context):
 
     if d == "settings:remove_channel":
         sto.remove_channel(q.message.chat_id)
+        _g(context, "dedup").forget(q.message.chat_id)
         await edit("Unlinked.", settings_keyboard(sto.get_settings())); return
 
     if d == "settings:blacklist_info":
@@ -390,35 +767,71 @@ async def handle_callbacks(update, context):
     if d.startswith("restart_service:"):
         name = d.split(":", 1)[1]
         await edit(f"Restarting `{name}`...")
-        ok, msg = ctl.service_action("restart", name)
+        ok, msg = await ctl.service_action("restart", name)
         await edit(f"{'✓' if ok else '✕'} {msg}", back_home()); return
 
     if d.startswith("stop_service:"):
         name = d.split(":", 1)[1]
         await edit(f"Stopping `{name}`...")
-        ok, msg = ctl.service_action("stop", name)
+        ok, msg = await ctl.service_action("stop", name)
         await edit(f"{'✓' if ok else '✕'} {msg}", back_home()); return
 
     if d == "reboot_server":
         ok, _ = ctl.reboot_server()
         if ok:
-            for cid in sto.get_channels():
-                try: await context.bot.send_message(cid, "↻ Server rebooting. Back in ~1 min.")
-                except Exception: pass
+            await _broadcast(context, "reboot", "↻ Server rebooting. Back in ~1 min.")
             await edit("Rebooting in 5 sec...")
         else:
             await edit("✕ Reboot failed")
         return
 
+    if d == "logs:stop":
+        await _g(context, "journal").release(q.message.chat_id, q.message.message_id); return
+
+    if d == "logs:more":
+        await edit(*await _search_page(context, q.message.chat_id)); return
+
+    if d.startswith("logs:"):
+        _, way, tok = d.split(":", 2)
+        jf  = _g(context, "journal")
+        ref = jf.cursors.get(tok)
+        if not ref:
+            await edit("Page expired — run /logs again", back_home()); return
+        svc, cur = ref
+        older    = way == "old"
+        entries  = await read_page(svc, LOG_PAGE, before=cur if older else None, after=None if older else cur)
+        if entries:
+            text, kb_ = _log_view(jf, svc, entries, "tail" if older else "head")
+        else:
+            text = format_logs(svc, [], " _no older entries_" if older else " _no newer entries_")
+            kb_  = logs_keyboard(newer=tok) if older else logs_keyboard(older=tok)
+        if jf.following(q.message.chat_id, q.message.message_id):   # keep the live message live
+            await context.bot.send_message(q.message.chat_id, text, parse_mode="Markdown", reply_markup=kb_)
+        else:
+            await edit(text, kb_)
+        return
+
+    if d.startswith("fleet:"):
+        hub = context.bot_data.get("fleet")
+        if not hub:
+            await edit("Fleet mode is off", back_home()); return
+        ref = hub.pending.get(d.split(":", 1)[1])
+        if not ref:
+            await edit("Confirmation expired — run /fleet_action again", back_home()); return
+        agent, (action, arg) = ref
+        await edit(f"`{agent}`: {action} {arg}...")
+        ok, msg = await hub.action(agent, action, [arg] if arg else [])
+        await edit(f"{'✓' if ok else '✕'} `{agent}`: {msg}", back_home()); return
+
     if d == "clear_journalctl":
         await edit("Clearing logs...")
-        ok, msg = ctl.clear_journal()
+        ok, msg = await ctl.clear_journal()
         await edit(f"{'✓' if ok else '✕'} {msg}", back_home()); return
 
     if d.startswith("close_port:"):
         port = int(d.split(":", 1)[1])
         await edit(f"Closing port {port}...")
-        ok, msg = ctl.close_port(port)
+        ok, msg = await ctl.close_port(port)
         await edit(f"{'✓' if ok else '✕'} {msg}", back_home()); return
 
 
@@ -428,7 +841,7 @@ async def handle_new_member(update, context):
     for m in update.message.new_chat_members:
         if m.id == context.bot.id:
             sto  = _g(context, "store")
-            text = format_status(_g(context, "monitor"), sto.get_settings())
+            text = format_status(await _snapshot(context, VIEW_MAX_AGE), sto.get_settings())
             sent = await context.bot.send_message(
                 update.effective_chat.id, text, parse_mode="Markdown")
             sto.add_channel(update.effective_chat.id, sent.message_id)
@@ -442,128 +855,219 @@ async def handle_document(update, context):
 
 # ── Background jobs ───────────────────────────────────────────────────────────
 
+async def _views(context, max_age=None):
+    """
+    (snapshot, [(settings, sections, text, {chat_id: message_id})]) per channel profile.
+    One collection covers every profile's sections; each distinct profile is
+    rendered once however many channels use it.
+    """
+    sto    = _g(context, "store")
+    groups = [(p, sto.profile_settings(p), chans) for p, chans in sto.channel_groups().items()]
+    snap   = await _snapshot(context, max_age,
+                             services=any(s["show_services"] for _, s, _ in groups),
+                             ports=any(s["show_ports"] for _, s, _ in groups),
+                             top=max((s["max_top"] for _, s, _ in groups if s["show_top"]), default=0))
+    hub    = context.bot_data.get("fleet")
+    rows   = hub.rows() if hub and hub.agents and any(s["show_fleet"] for _, s, _ in groups) else None
+    fleets = {}   # lang → fleet section, rendered once per language
+    views  = []
+    for p, s, chans in groups:
+        sections = status_sections(snap, s)
+        if rows and s["show_fleet"]:
+            lng = s["lang"] if s["lang"] in LANGS else "ru"
+            if lng not in fleets:
+                fleets[lng] = format_fleet(rows, t=LANGS[lng])
+            sections.append(("fleet", fleets[lng]))
+        views.append((s, sections, join_sections(sections, p), chans))
+    return snap, views
+
+
 async def _push_status(context):
-    mon = _g(context, "monitor")
-    sto = _g(context, "store")
-    s   = sto.get_settings()
-    # collect metrics once
-    cpu = max(0.0, mon.get_cpu_usage())
-    mem = mon.get_memory_usage()
-    dsk = mon.get_disk_usage()
-    net = mon.get_network_stats()
-    sto.record_stats(cpu, mem["percent"], dsk["percent"], net["recv"], net["sent"])
-    text = format_status(mon, s)
-    for cid, mid in list(sto.get_channels().items()):
+    sto  = _g(context, "store")
+    snap, views = await _views(context)   # one collection per tick
+    _g(context, "metrics").record(snap)
+    # skip channels whose content did not change since their last edit
+    s        = sto.get_settings()
+    ddp      = _g(context, "dedup")
+    thr      = DEFAULT_THRESHOLDS | s["edit_thresholds"]
+    vals     = ddp.values(snap)
+    channels, text, due = {}, {}, []
+    for _, sections, body, chans in views:
+        fp = fingerprint(sections)
+        for cid, mid in chans.items():
+            channels[cid], text[cid] = mid, (body, fp)
+            if ddp.due(cid, mid, fp, vals, thr, s["edit_max_staleness"]):
+                due.append(cid)
+
+    async def deliver(cid):
+        mid      = channels[cid]
+        body, fp = text[cid]
         try:
             await context.bot.edit_message_text(
-                chat_id=cid, message_id=mid, text=text, parse_mode="Markdown")
+                chat_id=cid, message_id=mid, text=body, parse_mode="Markdown")
+        except RetryAfter:
+            raise
         except Exception as e:
-            if any(x in str(e).lower() for x in [
+            err = str(e).lower()
+            if "message is not modified" in err:
+                pass
+            elif any(x in err for x in [
                 "message to edit not found", "can't be edited",
                 "chat not found", "bot was blocked",
             ]):
-                try:
-                    sent = await context.bot.send_message(cid, text, parse_mode="Markdown")
-                    sto.add_channel(cid, sent.message_id)
-                    print(f"Re-sent to {cid}")
-                except Exception as e2:
-                    print(f"{cid}: {e2}")
+                sent = await context.bot.send_message(cid, body, parse_mode="Markdown")
+                sto.add_channel(cid, sent.message_id)
+                mid  = sent.message_id
+                print(f"Re-sent to {cid}")
             else:
-                print(f"{cid}: {e}")
-
-
-async def job_update_status(context): await _push_status(context)
-
-_alerted: set = set()
-
+                raise
+        ddp.mark(cid, mid, fp, vals)
+
+    res = await _g(context, "fanout").run("push", due, deliver)
+    for cid, e in res.failed.items():
+        print(f"{cid}: {e}")
+    if res.elapsed > _g(context, "pacer").interval / 2:
+        print(f"push slow: {res.summary()}")
+
+
+async def _next_push(context):
+    """Delay before the next status push: fixed, or adaptive within [update_min, update_max]."""
+    s     = _g(context, "store").get_settings()
+    pacer = _g(context, "pacer")
+    if not s["update_adaptive"]:
+        return pacer.fixed(s["update_interval"])
+    snap  = context.bot_data.get("snapshot")
+    usage = _g(context, "monitor").estimate_resource_usage()
+    return pacer.next(metric_values(snap) if snap else {}, bool(_g(context, "alerts").firing),
+                      usage["cpu_percent"], s["update_min"], s["update_max"], s["bot_cpu_budget"])
+
+
+def _schedule_push(jq, delay, callback=None):
+    """(Re)arm the single `update_status` run_once job."""
+    jobs = jq.get_jobs_by_name("update_status")
+    for j in jobs:
+        j.schedule_removal()
+    callback = callback or (jobs[0].callback if jobs else None)
+    if callback:
+        jq.run_once(callback, delay, name="update_status")
+
+
+async def _repace(context):
+    """Apply interval settings now instead of after the pending push."""
+    s     = _g(context, "store").get_settings()
+    pacer = _g(context, "pacer")
+    if s["update_adaptive"]:
+        pacer.interval = min(max(pacer.interval, s["update_min"]), s["update_max"])
+    else:
+        pacer.fixed(s["update_interval"])
+    jobs = context.job_queue.get_jobs_by_name("update_status")
+    if jobs and jobs[0].next_t and jobs[0].next_t.timestamp() - time.time() > pacer.interval:
+        _schedule_push(context.job_queue, pacer.interval)
+
+
+async def job_update_status(context):
+    """Push the status, then schedule the next push (a run_once chain, see _next_push)."""
+    try:
+        await _push_status(context)
+    finally:
+        _schedule_push(context.job_queue, await _next_push(context), context.job.callback)
 
 async def job_alerts(context):
-    sto = _g(context, "store")
-    s   = sto.get_settings()
-    if not s["alerts_enabled"]: return
-    mon = _g(context, "monitor")
-    cpu = max(0.0, mon.get_cpu_usage())
-    mem = mon.get_memory_usage()
-    dsk = mon.get_disk_usage()
-    hits = []
-    if cpu            > s["alert_cpu"]:  hits.append(f"CPU `{cpu:.1f}%` > {s['alert_cpu']}%")
-    if mem["percent"] > s["alert_ram"]:  hits.append(f"RAM `{mem['percent']:.1f}%` > {s['alert_ram']}%")
-    if dsk["percent"] > s["alert_disk"]: hits.append(f"Disk `{dsk['percent']:.1f}%` > {s['alert_disk']}%")
-    key = str(sorted(hits))
-    if not hits: _alerted.discard(key); return
-    if key in _alerted: return
-    _alerted.add(key)
-    text = "*⚠ ALERT — High load*\n\n" + "\n".join(hits)
-    for cid in sto.get_channels():
-        try: await context.bot.send_message(cid, text, parse_mode="Markdown")
-        except Exception as e: print(f"alert {cid}: {e}")
-
-
-_report_at = _reboot_at = None
+    """Deliver fire/clear events queued by the AlertEngine (fed by the sampler)."""
+    events = _g(context, "alerts").drain()
+    if not events or not _g(context, "store").get_settings()["alerts_enabled"]: return
+    await _broadcast(context, "alert", format_alert_events(events, _g(context, "sampler").disks.rows),
+                     parse_mode="Markdown")
+
+
+async def job_governor(context):
+    """Tell admins when the bot crosses its own CPU/RSS budget, and when it is back."""
+    events = _g(context, "governor").drain()
+    if not events: return
+    text = format_budget_events(events)
+    print(text.replace("*", "").replace("`", ""))
+    if not ADMIN_IDS: return
+    res = await _g(context, "fanout").run(
+        "governor", ADMIN_IDS, lambda cid: context.bot.send_message(cid, text, parse_mode="Markdown"))
+    for cid, e in res.failed.items():
+        print(f"governor {cid}: {e}")
 
 
 async def job_daily_report(context):
-    global _report_at
+    """Fired by the Scheduler at daily_report_time."""
     sto = _g(context, "store")
     s   = sto.get_settings()
     if not s["daily_report_enabled"]: return
-    now = datetime.now().strftime("%H:%M")
-    if now != s["daily_report_time"] or _report_at == now: return
-    _report_at = now
-    text = format_daily_report(sto.get_daily_stats())
-    for cid in sto.get_channels():
-        try: await context.bot.send_message(cid, text, parse_mode="Markdown")
-        except Exception as e: print(f"report {cid}: {e}")
+    text = format_daily_report(_g(context, "metrics").get_daily_stats())
+    await _broadcast(context, "report", text, parse_mode="Markdown")
+    if s["report_charts"] and sto.get_channels():
+        await _send_chart(context, list(sto.get_channels()), "all", "day")
 
 
 async def job_auto_reboot(context):
-    global _reboot_at
+    """Fired by the Scheduler at auto_reboot_time."""
     sto = _g(context, "store")
     s   = sto.get_settings()
     if not s["auto_reboot_enabled"]: return
-    now = datetime.now().strftime("%H:%M")
-    if now != s["auto_reboot_time"] or _reboot_at == now: return
-    _reboot_at = now
-    for cid in sto.get_channels():
-        try: await context.bot.send_message(
-            cid, f"↻ Auto-reboot at {s['auto_reboot_time']}. Back in ~1 min.")
-        except Exception: pass
+    await _broadcast(context, "auto_reboot", f"↻ Auto-reboot at {s['auto_reboot_time']}. Back in ~1 min.")
     _g(context, "controller").reboot_server()
 
 
 async def job_on_startup(context):
     sto = _g(context, "store")
     if not sto.get_channels(): return
-    for cid in sto.get_channels():
-        try: await context.bot.send_message(cid, "✓ Bot online. Server started.")
-        except Exception as e: print(f"startup {cid}: {e}")
+    await _broadcast(context, "startup", "✓ Bot online. Server started.")
 
 
 # ── Register ──────────────────────────────────────────────────────────────────
 
+_CB_SUBKEY = {"cmd", "settings", "ssh", "svcmode", "logs"}   # second part is a fixed name
+
+
+def _callback_name(update):
+    """Telemetry label for a callback: 'settings:toggle_top', 'fleet', 'close_port', ..."""
+    parts = (update.callback_query.data or "").split(":")
+    return ":".join(parts[:2]) if parts[0] in _CB_SUBKEY else parts[0]
+
+
 def register_handlers(app):
+    tm = app.bot_data["telemetry"]
     for name, fn in [
         ("start",           cmd_start),
         ("menu",            cmd_menu),
         ("status",          cmd_status),
         ("services",        cmd_services),
         ("ports",           cmd_ports),
+        ("top",             cmd_top),
         ("ping",            cmd_ping),
         ("restart_service", cmd_restart_service),
         ("stop_service",    cmd_stop_service),
         ("reboot",          cmd_reboot),
         ("logs",            cmd_logs),
+        ("logsearch",       cmd_logsearch),
         ("close_port",      cmd_close_port),
         ("link_channel",    cmd_link_channel),
         ("broadcast",       cmd_broadcast),
+        ("profile",         cmd_profile),
+        ("profiles",        cmd_profiles),
         ("report",          cmd_report),
+        ("chart",           cmd_chart),
+        ("history",         cmd_history),
+        ("fleet",           cmd_fleet),
+        ("fleet_action",    cmd_fleet_action),
         ("set_report_time", cmd_set_report_time),
         ("set_reboot_time", cmd_set_reboot_time),
+        ("set_interval",    cmd_set_interval),
         ("set_alerts",      cmd_set_alerts),
+        ("alerts",          cmd_alerts),
+        ("alert_rule",      cmd_alert_rule),
+        ("set_edit_policy", cmd_set_edit_policy),
         ("add_ssh_key",     cmd_add_ssh_key),
         ("upload",          cmd_upload_file),
+        ("perf",            cmd_perf),
     ]:
-        app.add_handler(CommandHandler(name, fn))
-    app.add_handler(CallbackQueryHandler(handle_callbacks))
-    app.add_handler(MessageHandler(filters.Document.ALL, handle_document))
-    app.add_handler(MessageHandler(filters.StatusUpdate.NEW_CHAT_MEMBERS, handle_new_member))
+        app.add_handler(CommandHandler(name, tm.wrap(f"/{name}", fn)))
+    app.add_handler(CallbackQueryHandler(tm.wrap("cb", handle_callbacks, _callback_name)))
+    app.add_handler(MessageHandler(filters.Document.ALL, tm.wrap("document", handle_document)))
+    app.add_handler(MessageHandler(filters.StatusUpdate.NEW_CHAT_MEMBERS,
+                                   tm.wrap("new_member", handle_new_member)))
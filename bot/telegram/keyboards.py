@@ -30,13 +30,20 @@ def settings_keyboard(s):
     t = lambda f, on, off: on if f else off
     return kb([
         [b(t(s["show_services"], "Svcs ●", "Svcs ○"), "settings:toggle_services"),
-         b(t(s["show_ports"],    "Ports ●", "Ports ○"), "settings:toggle_ports")],
+         b(t(s["show_ports"],    "Ports ●", "Ports ○"), "settings:toggle_ports"),
+         b(t(s["show_top"],      "Top ●",   "Top ○"),   "settings:toggle_top")],
+        [b(t(s["update_adaptive"], "Auto ●", "Auto ○"), "settings:toggle_adaptive"),
+         b("−", "settings:interval_down"),
+         b(t(s["update_adaptive"], f"⏱ {s['update_min']}–{s['update_max']}s",
+             f"⏱ {s['update_interval']}s"), "settings:interval_info"),
+         b("+", "settings:interval_up")],
         [b("↑ Send status to channels", "settings:send_status")],
         [b("+ Link this chat",  "settings:add_channel"),
          b("- Unlink chat",     "settings:remove_channel")],
         [b("⊕ Link channel by ID", "settings:add_by_id")],
         [b(t(s["alerts_enabled"],          "Alerts ●",     "Alerts ○"),     "settings:toggle_alerts")],
-        [b(t(s["daily_report_enabled"],    "Report ●",     "Report ○"),     "settings:toggle_report")],
+        [b(t(s["daily_report_enabled"],    "Report ●",     "Report ○"),     "settings:toggle_report"),
+         b(t(s["report_charts"],           "Charts ●",     "Charts ○"),     "settings:toggle_charts")],
         [b(t(s["auto_reboot_enabled"],     "AutoReboot ●", "AutoReboot ○"), "settings:toggle_reboot")],
         [b("▤ Hidden services", "settings:blacklist_info")],
         [b("← Home",            "cmd:home")],
@@ -75,3 +82,16 @@ def back_home():
 
 def clear_logs_keyboard():
     return kb([[b("Clear journalctl", "clear_journalctl"), b("✕ Cancel", "cancel")]])
+
+
+def logs_keyboard(older=None, newer=None, follow=False):
+    """Paging by journal cursor tokens; `follow` adds the stop button."""
+    nav = ([b("◀ Older", f"logs:old:{older}")] if older else []) + \
+          ([b("Newer ▶", f"logs:new:{newer}")] if newer else [])
+    return kb(([nav] if nav else []) +
+              ([[b("■ Stop following", "logs:stop")]] if follow else []) +
+              [[b("← Home", "cmd:home")]])
+
+
+def search_keyboard():
+    return kb([[b("▶ Next matches", "logs:more")], [b("← Home", "cmd:home")]])
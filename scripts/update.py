@@ -21,9 +21,33 @@ FILES = [
     "bot/config.py",
     "bot/main.py",
     "bot/core/controller.py",
+    "bot/core/governor.py",
+    "bot/core/pacer.py",
+    "bot/core/proc.py",
+    "bot/core/scheduler.py",
+    "bot/core/telemetry.py",
+    "bot/fleet/agent.py",
+    "bot/fleet/hub.py",
+    "bot/fleet/protocol.py",
+    "bot/monitor/alerts.py",
+    "bot/monitor/collectors.py",
+    "bot/monitor/disks.py",
+    "bot/monitor/journal.py",
+    "bot/monitor/ports.py",
+    "bot/monitor/prometheus.py",
+    "bot/monitor/processes.py",
+    "bot/monitor/sampler.py",
     "bot/monitor/server.py",
+    "bot/monitor/server_optimized.py",
+    "bot/monitor/services.py",
+    "bot/monitor/snapshot.py",
+    "bot/storage/metric_store.py",
     "bot/storage/status_store.py",
+    "bot/telegram/charts.py",
+    "bot/telegram/dedup.py",
+    "bot/telegram/fanout.py",
     "bot/telegram/formatter.py",
+    "bot/telegram/formatter_optimized.py",
     "bot/telegram/handlers.py",
     "bot/telegram/keyboards.py",
     "install.sh",
@@ -103,7 +127,7 @@ def main():
         os.chmod(sh, 0o755)
 
     # touch __init__ files just in case
-    for pkg in ["bot", "bot/core", "bot/monitor", "bot/storage", "bot/telegram"]:
+    for pkg in ["bot", "bot/core", "bot/fleet", "bot/monitor", "bot/storage", "bot/telegram"]:
         init = os.path.join(BOT_DIR, pkg, "__init__.py")
         if not os.path.exists(init):
             open(init, "w").close()